@@ -0,0 +1,175 @@
+"""Baseline checks for the ``pytest-benchmark`` suite.
+
+Every benchmark runs through the ``measure`` fixture, which records the median time and the
+``tracemalloc`` peak of one extra call, and fails the test when the peak is larger than in the
+committed ``baseline.json`` by more than the tolerance. Times depend on the machine, so they're
+only checked with ``--check-time``, after scaling the baseline by a calibration loop timed in
+the same session. ``--update-baseline`` rewrites the file.
+"""
+
+import json
+import os
+import statistics
+import time
+import tracemalloc
+
+import pytest
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# Growth below this is allocator noise, whatever the tolerance.
+MEMORY_SLACK_KIB = 16
+
+# Baseline entry holding the calibration loop's median time on the machine that wrote the file.
+CALIBRATION_KEY = "_calibration"
+
+# Test name -> {"median_s": ..., "peak_kib": ...} of this session.
+RESULTS = {}
+
+_calibration = []
+
+
+def _calibration_workload():
+    # Plain interpreter work (strings, dicts, sorting), like the code under benchmark.
+    words = [f"issue-{n % 977}-label" for n in range(20_000)]
+    counts = {}
+    for word in words:
+        counts[word] = counts.get(word, 0) + 1
+    return sorted(counts, key=counts.get)
+
+
+def calibration_time():
+    """Median time of the calibration loop in this session, measured on first use."""
+    if not _calibration:
+        timings = []
+        for _ in range(21):
+            started = time.perf_counter()
+            _calibration_workload()
+            timings.append(time.perf_counter() - started)
+        _calibration.append(statistics.median(timings))
+    return _calibration[0]
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("baseline", "benchmark baseline")
+    group.addoption(
+        "--baseline", default=BASELINE_PATH, help="baseline file to compare the results with"
+    )
+    group.addoption(
+        "--update-baseline",
+        action="store_true",
+        help="write this session's results to the baseline file instead of comparing",
+    )
+    group.addoption(
+        "--check-time",
+        action="store_true",
+        help="also fail on median times slower than the calibrated baseline",
+    )
+    group.addoption(
+        "--time-tolerance",
+        type=float,
+        default=0.5,
+        help="allowed slowdown of the median time, as a fraction of the baseline",
+    )
+    group.addoption(
+        "--memory-tolerance",
+        type=float,
+        default=0.2,
+        help="allowed growth of the peak memory, as a fraction of the baseline",
+    )
+
+
+def _load_baseline(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def _speed_factor(baseline):
+    """How much slower this machine runs the calibration loop than the baseline's machine."""
+    expected = baseline.get(CALIBRATION_KEY)
+    if not expected:
+        return 1.0
+    return calibration_time() / expected["median_s"]
+
+
+def _regressions(name, result, baseline, time_tolerance, memory_tolerance):
+    """Describe how ``result`` is worse than the baseline; ``time_tolerance`` None skips time."""
+    expected = baseline.get(name)
+    if not expected:
+        return []
+    regressions = []
+    median = result.get("median_s")
+    if time_tolerance is not None and median is not None:
+        limit = expected["median_s"] * _speed_factor(baseline)
+        if median > limit * (1 + time_tolerance):
+            regressions.append(
+                f"median time {median * 1000:.2f}ms exceeds calibrated baseline "
+                f"{limit * 1000:.2f}ms by more than {time_tolerance:.0%}"
+            )
+    peak_limit = max(
+        expected["peak_kib"] * (1 + memory_tolerance), expected["peak_kib"] + MEMORY_SLACK_KIB
+    )
+    if result["peak_kib"] > peak_limit:
+        regressions.append(
+            f"peak memory {result['peak_kib']:.0f}KiB exceeds baseline "
+            f"{expected['peak_kib']:.0f}KiB by more than {memory_tolerance:.0%}"
+        )
+    return regressions
+
+
+@pytest.fixture
+def measure(benchmark, request):
+    """Benchmark ``func(*args)``, record its peak memory and compare them with the baseline."""
+    config = request.config
+
+    def run(func, *args):
+        result = benchmark(func, *args)
+
+        tracemalloc.start()
+        try:
+            func(*args)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        benchmark.extra_info["peak_kib"] = round(peak / 1024, 1)
+
+        # No timings with --benchmark-disable; the memory is still checked.
+        stats = benchmark.stats.stats if benchmark.stats else None
+        measured = {"median_s": stats.median if stats else None, "peak_kib": peak / 1024}
+        RESULTS[request.node.name] = measured
+        if not config.getoption("update_baseline"):
+            regressions = _regressions(
+                request.node.name,
+                measured,
+                _load_baseline(config.getoption("baseline")),
+                config.getoption("time_tolerance") if config.getoption("check_time") else None,
+                config.getoption("memory_tolerance"),
+            )
+            if regressions:
+                pytest.fail("; ".join(regressions))
+        return result
+
+    return run
+
+
+def pytest_sessionfinish(session):
+    config = session.config
+    if not config.getoption("update_baseline") or not RESULTS:
+        return
+    path = config.getoption("baseline")
+    baseline = _load_baseline(path)
+    # Medians are stored as measured; the calibration time lets other machines scale them.
+    baseline[CALIBRATION_KEY] = {"median_s": float(f"{calibration_time():.6g}")}
+    for name, result in RESULTS.items():
+        if result["median_s"] is None:
+            continue
+        baseline[name] = {
+            "median_s": float(f"{result['median_s']:.6g}"),
+            "peak_kib": round(result["peak_kib"], 1),
+        }
+    with open(path, "w") as f:
+        json.dump(dict(sorted(baseline.items())), f, indent=2)
+        f.write("\n")
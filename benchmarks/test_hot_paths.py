@@ -0,0 +1,201 @@
+import contextlib
+import datetime
+import io
+import random
+
+import pytest
+
+from src.core.github_client import GitHubClient
+from src.core.issue_record import IssueRecord
+from src.core.issue_service import IssueProcessor
+from src.core.settings import Config
+from src.core.tokens import estimate_tokens
+
+ISSUES = 10_000
+LABELS = [f"area/component-{n}" for n in range(300)]
+BODY_SIZE = 1024 * 1024
+PROMPT = "Improve this title: {original_title}\n\n{issue_body}"
+
+
+class FakeRepo:
+    full_name = "owner/repo"
+
+
+class FakeResponse:
+    def __init__(self, payload, next_url):
+        self.payload = payload
+        self.links = {"next": {"url": next_url}} if next_url else {}
+
+    def raise_for_status(self):
+        return
+
+    def json(self):
+        return self.payload
+
+
+class FakeSession:
+    """Serves REST issue payloads in pages of 100, as the listing endpoint does."""
+
+    def __init__(self, payloads):
+        self.payloads = payloads
+
+    def get(self, url, params=None, timeout=None):
+        page = int(url.rpartition("page=")[2]) if "page=" in url else 1
+        start = (page - 1) * 100
+        next_url = f"{url.partition('?')[0]}?page={page + 1}"
+        more = start + 100 < len(self.payloads)
+        return FakeResponse(self.payloads[start : start + 100], next_url if more else None)
+
+
+class FakeAIClient:
+    def generate_content(self, prompt):
+        return "Improved title"
+
+
+class FakeGitHubClient:
+    def update_issue_title(self, issue, title):
+        return True
+
+    def add_issue_comment(self, issue, comment):
+        return True
+
+    def add_issue_label(self, issue, label):
+        return True
+
+
+def make_body(rng, size):
+    words = ["crash", "when", "saving", "settings", "after", "upgrade", "parser", "fails"]
+    lines = []
+    length = 0
+    while length < size:
+        line = " ".join(rng.choice(words) for _ in range(12))
+        if rng.random() < 0.05:
+            line = f"## {line}"
+        lines.append(line)
+        length += len(line) + 1
+    return "\n".join(lines)[:size]
+
+
+@pytest.fixture(scope="module")
+def issues():
+    """10k issues, newest first, with up to 40 of 300 labels each."""
+    rng = random.Random(0)
+    now = datetime.datetime.now()
+    return [
+        IssueRecord(
+            number,
+            f"Issue {number}",
+            make_body(rng, rng.randint(50, 2000)),
+            rng.sample(LABELS, rng.randint(0, 40)),
+            now - datetime.timedelta(seconds=ISSUES - number),
+            "owner/repo",
+        )
+        for number in range(ISSUES, 0, -1)
+    ]
+
+
+@pytest.fixture(scope="module")
+def payloads(issues):
+    """The REST listing payloads of ``issues``."""
+    return [
+        {
+            "number": issue.number,
+            "node_id": f"I_{issue.number}",
+            "title": issue.title,
+            "body": issue.body,
+            "labels": [{"id": 1, "name": name, "color": "ededed"} for name in issue.label_names],
+            "created_at": issue.created_at.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "user": {"login": "octocat", "id": 1},
+            "state": "open",
+        }
+        for issue in issues
+    ]
+
+
+@pytest.fixture(scope="module")
+def large_issue():
+    rng = random.Random(1)
+    return IssueRecord(1, "Crash", make_body(rng, BODY_SIZE), [], None, "owner/repo")
+
+
+def make_processor(**kwargs):
+    return IssueProcessor(FakeAIClient(), FakeGitHubClient(), PROMPT, "titled", **kwargs)
+
+
+def quietly(func, *args):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args)
+
+
+def test_get_recent_issues(measure, payloads):
+    client = GitHubClient("token")
+    client.session = FakeSession(payloads)
+
+    def select():
+        return client.get_recent_issues(
+            FakeRepo(), days_to_scan=7, limit=ISSUES, required_labels=LABELS[:5]
+        )
+
+    selected = measure(select)
+
+    assert 0 < len(selected) < ISSUES
+
+
+def test_hold_issue_records(measure, payloads):
+    # The peak is what holding a record of every listed issue costs.
+    records = measure(lambda: [IssueRecord.from_rest(data, "owner/repo") for data in payloads])
+
+    assert len(records) == ISSUES
+
+
+def test_render_prompt_large_body(measure, large_issue):
+    processor = make_processor()
+
+    title = measure(processor.generate_improved_title, large_issue.title, large_issue.body)
+
+    assert title == "Improved title"
+
+
+def test_truncate_large_body(measure, large_issue):
+    def prepare():
+        # A fresh processor, so the truncation notice is printed on every call.
+        return make_processor(max_body_tokens=2000).prepare_body(large_issue)
+
+    body = measure(quietly, prepare)
+
+    assert estimate_tokens(body) <= 2000
+
+
+def test_retrieve_prompt_includes(measure, monkeypatch):
+    monkeypatch.delenv("INPUT_PROMPT", raising=False)
+    monkeypatch.setenv("INPUT_STYLE", "summary")
+    config = Config.__new__(Config)
+
+    prompt = measure(config._retrieve_prompt)
+
+    assert "{include:" not in prompt
+
+
+def test_process_style_file_many_includes(measure, tmp_path):
+    include_files = [f"_part{n}.md" for n in range(200)]
+    for name in include_files:
+        (tmp_path / name).write_text(f"Shared instructions from {name}\n" * 20)
+    style = tmp_path / "style.md"
+    style.write_text("\n".join(f"Rule {name}\n{{include:{name}}}" for name in include_files))
+    config = Config.__new__(Config)
+
+    prompt = measure(config._process_style_file, str(style), include_files, str(tmp_path))
+
+    assert "{include:" not in prompt
+
+
+def test_process_issue_overhead(measure, issues):
+    processor = make_processor()
+    batch = issues[:1000]
+
+    def process():
+        return [processor.process_issue(issue, auto_update=True) for issue in batch]
+
+    results = measure(quietly, process)
+
+    assert all("error" not in result for result in results)
@@ -0,0 +1,117 @@
+"""Command line entry point: ``PYTHONPATH=src python -m bench --issues 200``."""
+
+import argparse
+import json
+import sys
+
+from .harness import run_benchmark
+
+
+def _range(value):
+    low, _, high = value.partition(":")
+    return int(low), int(high or low)
+
+
+def _input(value):
+    name, separator, setting = value.partition("=")
+    if not separator:
+        raise argparse.ArgumentTypeError(f"expected name=value, got {value!r}")
+    return name, setting
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m bench",
+        description="Benchmark the action against local fake GitHub and model servers.",
+    )
+    parser.add_argument("--issues", type=int, default=100, help="number of synthetic issues")
+    parser.add_argument(
+        "--mode",
+        choices=("scan", "event"),
+        default="scan",
+        help="one scheduled scan, or one issue event run per issue",
+    )
+    parser.add_argument(
+        "--input",
+        dest="inputs",
+        type=_input,
+        action="append",
+        default=[],
+        metavar="NAME=VALUE",
+        help="action input, e.g. --input max-concurrency=8 (repeatable)",
+    )
+    parser.add_argument(
+        "--body-size", type=_range, default=(200, 2000), metavar="MIN:MAX", help="issue body length"
+    )
+    parser.add_argument(
+        "--labels", default="bug,enhancement", help="comma-separated labels issues may carry"
+    )
+    parser.add_argument(
+        "--label-rate", type=float, default=0.3, help="probability of each label per issue"
+    )
+    parser.add_argument(
+        "--labeled-fraction",
+        type=float,
+        default=0.0,
+        help="share of issues that already carry the skip label",
+    )
+    parser.add_argument("--github-latency-ms", type=float, default=0.0)
+    parser.add_argument("--llm-latency-ms", type=float, default=200.0)
+    parser.add_argument(
+        "--llm-jitter", type=float, default=0.0, help="latency variation, as a fraction"
+    )
+    parser.add_argument(
+        "--llm-error-rate", type=float, default=0.0, help="share of model requests failing with 500"
+    )
+    parser.add_argument(
+        "--llm-429-rate", type=float, default=0.0, help="share of model requests rate limited"
+    )
+    parser.add_argument("--llm-retry-after", type=int, default=1, help="Retry-After of 429s")
+    parser.add_argument(
+        "--llm-word-ms",
+        type=float,
+        default=5.0,
+        help="time between the words of a streamed answer",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--show-output", action="store_true", help="print the action's log")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    github_options = {
+        "body_size": args.body_size,
+        "labels": tuple(label.strip() for label in args.labels.split(",") if label.strip()),
+        "label_rate": args.label_rate,
+        "labeled_fraction": args.labeled_fraction,
+        "latency": args.github_latency_ms / 1000,
+        "seed": args.seed,
+    }
+    llm_options = {
+        "latency": args.llm_latency_ms / 1000,
+        "jitter": args.llm_jitter,
+        "error_rate": args.llm_error_rate,
+        "rate_limit_rate": args.llm_429_rate,
+        "retry_after": args.llm_retry_after,
+        "word_latency": args.llm_word_ms / 1000,
+        "seed": args.seed,
+    }
+    result = run_benchmark(
+        args.issues,
+        args.mode,
+        dict(args.inputs),
+        github_options,
+        llm_options,
+        quiet=not args.show_output,
+    )
+    if args.json:
+        print(json.dumps(result.to_dict(), indent=2))
+    else:
+        print(result.format())
+    return 1 if result.failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""Runs the action against the fake servers and measures it."""
+
+import contextlib
+import io
+import json
+import math
+import os
+import tempfile
+import time
+
+from .servers import FakeGitHub, FakeLLM, Recorder
+
+REPO_NAME = "owner/repo"
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of sorted ``values``, 0 when there are none."""
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(fraction * len(values)) - 1)]
+
+
+@contextlib.contextmanager
+def environment(variables):
+    """Set environment variables for the duration of the block, restoring the old values after."""
+    saved = {name: os.environ.get(name) for name in variables}
+    os.environ.update({name: value for name, value in variables.items() if value is not None})
+    for name, value in variables.items():
+        if value is None:
+            os.environ.pop(name, None)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+class BenchmarkResult:
+    def __init__(self, mode, issues, elapsed, recorder, failures=0, output=""):
+        self.mode = mode
+        self.issues = issues
+        self.elapsed = elapsed
+        self.latencies = recorder.latencies()
+        self.processed = len(self.latencies)
+        self.requests = dict(sorted(recorder.counts.items()))
+        self.failures = failures
+        self.output = output
+
+    @property
+    def issues_per_second(self):
+        return self.processed / self.elapsed if self.elapsed else 0.0
+
+    def to_dict(self):
+        return {
+            "mode": self.mode,
+            "issues": self.issues,
+            "processed": self.processed,
+            "failed_runs": self.failures,
+            "elapsed_s": round(self.elapsed, 3),
+            "issues_per_s": round(self.issues_per_second, 2),
+            "latency_p50_s": round(percentile(self.latencies, 0.5), 3),
+            "latency_p95_s": round(percentile(self.latencies, 0.95), 3),
+            "requests": self.requests,
+        }
+
+    def format(self):
+        data = self.to_dict()
+        lines = [
+            f"Issues:      {data['processed']} of {data['issues']} processed in "
+            f"{data['elapsed_s']:.2f}s ({data['mode']})",
+            f"Throughput:  {data['issues_per_s']:.2f} issues/s",
+            f"Latency:     p50 {data['latency_p50_s']:.3f}s, p95 {data['latency_p95_s']:.3f}s",
+        ]
+        if self.failures:
+            lines.append(f"Failed runs: {self.failures}")
+        lines.append("Requests:")
+        width = max((len(name) for name in self.requests), default=0)
+        lines.extend(f"  {name:<{width}}  {count}" for name, count in self.requests.items())
+        return "\n".join(lines)
+
+
+def _run_action(quiet):
+    """Run the action once in-process, returning whether it succeeded and what it printed."""
+    # Imported here so the environment of the run is in place before the action's modules load.
+    import main
+
+    output = io.StringIO()
+    redirect = contextlib.redirect_stdout(output) if quiet else contextlib.nullcontext()
+    with redirect:
+        try:
+            main.run()
+        except SystemExit as exit_status:
+            return exit_status.code in (None, 0), output.getvalue()
+    return True, output.getvalue()
+
+
+def _event_runs(numbers, quiet):
+    """Run the action once per issue, like the ``issues: opened`` trigger does."""
+    failures = 0
+    outputs = []
+    with tempfile.TemporaryDirectory() as directory:
+        event_path = os.path.join(directory, "event.json")
+        for number in numbers:
+            with open(event_path, "w") as f:
+                json.dump({"action": "opened", "issue": {"number": number}}, f)
+            with environment({"GITHUB_EVENT_NAME": "issues", "GITHUB_EVENT_PATH": event_path}):
+                succeeded, output = _run_action(quiet)
+            failures += not succeeded
+            outputs.append(output)
+    return failures, "".join(outputs)
+
+
+def run_benchmark(
+    issues=100,
+    mode="scan",
+    inputs=None,
+    github_options=None,
+    llm_options=None,
+    quiet=True,
+):
+    """Run the action against fake GitHub and model servers and return a ``BenchmarkResult``.
+
+    ``mode`` is "scan" for one scheduled run over all issues, or "event" for one run per issue.
+    ``inputs`` maps action input names (``max-concurrency``) to values; ``github_options`` and
+    ``llm_options`` are passed to ``FakeGitHub`` and ``FakeLLM``.
+    """
+    recorder = Recorder()
+    github = FakeGitHub(issues, repo_name=REPO_NAME, recorder=recorder, **(github_options or {}))
+    llm = FakeLLM(recorder=recorder, **(llm_options or {}))
+    with github, llm:
+        variables = {
+            "INPUT_GITHUB-TOKEN": "bench-token",
+            "GITHUB_REPOSITORY": REPO_NAME,
+            "GITHUB_API_URL": github.url,
+            "GITHUB_GRAPHQL_URL": f"{github.url}/graphql",
+            "GITHUB_EVENT_NAME": None,
+            "GITHUB_EVENT_PATH": None,
+            "INPUT_AI-PROVIDER": "openai",
+            "INPUT_OPENAI-API-KEY": "bench-key",
+            "INPUT_MODEL": "bench-model",
+            "OPENAI_BASE_URL": f"{llm.url}/v1",
+            "INPUT_MAX-ISSUES": str(issues),
+            "NO_PROXY": "127.0.0.1",
+        }
+        variables.update({f"INPUT_{name.upper()}": value for name, value in (inputs or {}).items()})
+        with environment(variables):
+            start = time.perf_counter()
+            if mode == "event":
+                failures, output = _event_runs(sorted(github.issues), quiet)
+            else:
+                succeeded, output = _run_action(quiet)
+                failures = int(not succeeded)
+            elapsed = time.perf_counter() - start
+    return BenchmarkResult(mode, issues, elapsed, recorder, failures, output)
@@ -0,0 +1,477 @@
+"""Local stand-ins for the GitHub API and an OpenAI-compatible model API.
+
+Both run on ``127.0.0.1`` in a background thread, so benchmarks exercise the real clients,
+connection pools, rate limiters and retries without tokens or network access.
+"""
+
+import datetime
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+TITLE_MARKER = re.compile(r"bench-issue-(\d+)")
+BATCH_NUMBER = re.compile(r'"issue_number": (\d+)')
+
+WORDS = (
+    "crash when saving settings after upgrade the parser fails on empty input and the log shows a "
+    "stack trace from the worker thread while the dashboard keeps loading forever"
+).split()
+
+
+class Recorder:
+    """Request counts and per-issue timelines shared by the fake servers.
+
+    An issue's timeline starts when a model request mentioning it arrives and ends with the last
+    model response or GitHub write for it.
+    """
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.counts = Counter()
+        self.timelines = {}
+        self._lock = threading.Lock()
+
+    def count(self, name):
+        with self._lock:
+            self.counts[name] += 1
+
+    def mark(self, number, start=False):
+        now = self.clock()
+        with self._lock:
+            timeline = self.timelines.get(number)
+            if timeline is None:
+                if not start:
+                    # A write for an issue the model never saw, e.g. a blocked title edit.
+                    return
+                self.timelines[number] = [now, now]
+            else:
+                timeline[1] = max(timeline[1], now)
+
+    def latencies(self):
+        with self._lock:
+            return sorted(end - start for start, end in self.timelines.values())
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # Keep-alive, like the real APIs, so the clients' connection pools are exercised.
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; don't let Nagle hold the body back.
+    disable_nagle_algorithm = True
+    fake = None
+
+    def log_message(self, format, *args):  # noqa: A002
+        return
+
+    def _dispatch(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        url = urlsplit(self.path)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        status, headers, payload = self.fake.handle(self.command, url.path, query, body)
+        try:
+            if hasattr(payload, "__next__"):
+                self._send_chunked(status, headers, payload)
+            else:
+                self._send(status, headers, payload)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client stopped reading, e.g. a streamed title that was complete.
+            self.close_connection = True
+            if hasattr(payload, "close"):
+                payload.close()
+
+    def _send(self, status, headers, payload):
+        data = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(0 if self.command == "HEAD" else len(data)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(data)
+
+    def _send_chunked(self, status, headers, chunks):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for chunk in chunks:
+            self.wfile.write(f"{len(chunk):X}\r\n".encode() + chunk + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+    do_GET = do_POST = do_PATCH = do_HEAD = do_DELETE = _dispatch  # noqa: N815
+
+
+class _FakeServer:
+    def __init__(self, latency=0.0, recorder=None, seed=0):
+        self.latency = latency
+        self.recorder = recorder or Recorder()
+        self.random = random.Random(seed)  # noqa: S311
+        self._lock = threading.Lock()
+        handler = type("Handler", (_Handler,), {"fake": self})
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}"
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _sleep(self, latency):
+        if latency > 0:
+            time.sleep(latency)
+
+    def handle(self, method, path, query, body):
+        raise NotImplementedError
+
+
+class FakeGitHub(_FakeServer):
+    """GitHub REST and GraphQL stand-in seeded with ``issues`` synthetic issues.
+
+    Issue bodies are between ``body_size`` characters long. Each issue gets each of ``labels``
+    with probability ``label_rate``, and ``skip_label`` with probability ``labeled_fraction``.
+    Every response takes ``latency`` seconds and reports a healthy rate limit.
+    """
+
+    def __init__(
+        self,
+        issues=100,
+        body_size=(200, 2000),
+        labels=("bug", "enhancement"),
+        label_rate=0.3,
+        labeled_fraction=0.0,
+        skip_label="titled",
+        repo_name="owner/repo",
+        latency=0.0,
+        recorder=None,
+        seed=0,
+    ):
+        super().__init__(latency, recorder, seed)
+        self.repo_name = repo_name
+        self.skip_label = skip_label
+        now = datetime.datetime.now(datetime.UTC).replace(tzinfo=None)
+        self.issues = {}
+        for number in range(1, issues + 1):
+            issue_labels = [label for label in labels if self.random.random() < label_rate]
+            if self.random.random() < labeled_fraction:
+                issue_labels.append(skip_label)
+            length = self.random.randint(*body_size)
+            self.issues[number] = {
+                "number": number,
+                "title": f"bench-issue-{number} {self.random.choice(WORDS)} broken",
+                "body": self._body(length),
+                "labels": issue_labels,
+                # Newer issues have higher numbers, like on GitHub.
+                "created_at": now - datetime.timedelta(minutes=issues - number + 1),
+                "comments": [],
+            }
+
+    def _body(self, length):
+        words = []
+        while sum(len(word) + 1 for word in words) < length:
+            words.append(self.random.choice(WORDS))
+        return " ".join(words)[:length]
+
+    def _issue_json(self, issue):
+        number = issue["number"]
+        created_at = issue["created_at"].strftime("%Y-%m-%dT%H:%M:%SZ")
+        return {
+            "number": number,
+            "title": issue["title"],
+            "body": issue["body"],
+            "state": "open",
+            "labels": [{"name": name} for name in issue["labels"]],
+            "created_at": created_at,
+            "updated_at": created_at,
+            "url": f"{self.url}/repos/{self.repo_name}/issues/{number}",
+            "node_id": f"I_{number}",
+            "comments": len(issue["comments"]),
+        }
+
+    def _graphql_node(self, issue):
+        return {
+            "id": f"I_{issue['number']}",
+            "number": issue["number"],
+            "title": issue["title"],
+            "body": issue["body"],
+            "createdAt": issue["created_at"].strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "labels": {"nodes": [{"name": name} for name in issue["labels"]]},
+        }
+
+    def _newest_first(self, include_labeled=True):
+        issues = sorted(self.issues.values(), key=lambda issue: issue["number"], reverse=True)
+        if include_labeled:
+            return issues
+        return [issue for issue in issues if self.skip_label not in issue["labels"]]
+
+    def _page(self, path, query, items):
+        per_page = int(query.get("per_page", 30))
+        page = int(query.get("page", 1))
+        start = (page - 1) * per_page
+        headers = {}
+        if start + per_page < len(items):
+            next_query = urlencode({**query, "page": page + 1})
+            headers["Link"] = f'<{self.url}{path}?{next_query}>; rel="next"'
+        return headers, items[start : start + per_page]
+
+    def handle(self, method, path, query, body):
+        self._sleep(self.latency)
+        headers = {
+            "Content-Type": "application/json",
+            "x-ratelimit-limit": "5000",
+            "x-ratelimit-remaining": "4999",
+            "x-ratelimit-reset": str(int(time.time()) + 3600),
+        }
+        status, route, extra_headers, payload = self._route(method, path, query, body)
+        self.recorder.count(f"github {method} {route}")
+        return status, {**headers, **extra_headers}, payload
+
+    def _route(self, method, path, query, body):
+        repo_path = f"/repos/{self.repo_name}"
+        if path == "/graphql" and method == "POST":
+            return self._graphql(json.loads(body))
+        if path == "/search/issues":
+            items = [self._issue_json(issue) for issue in self._newest_first(False)]
+            headers, page = self._page(path, query, items)
+            return 200, "/search/issues", headers, {"total_count": len(items), "items": page}
+        if path == repo_path:
+            return 200, "/repos/:repo", {}, self._repo_json()
+        if path == f"{repo_path}/labels" and method == "POST":
+            name = json.loads(body)["name"]
+            return 201, "/repos/:repo/labels", {}, {"name": name, "node_id": f"LA_{name}"}
+        if path == f"{repo_path}/issues":
+            items = [self._issue_json(issue) for issue in self._newest_first()]
+            headers, page = self._page(path, query, items)
+            return 200, "/repos/:repo/issues", headers, page
+        match = re.fullmatch(rf"{re.escape(repo_path)}/issues/(\d+)(/comments|/labels)?", path)
+        if match and int(match.group(1)) in self.issues:
+            return self._issue_route(method, int(match.group(1)), match.group(2), body)
+        return 404, path, {}, {"message": "Not Found"}
+
+    def _repo_json(self):
+        owner, name = self.repo_name.split("/")
+        return {
+            "id": 1,
+            "name": name,
+            "full_name": self.repo_name,
+            "owner": {"login": owner},
+            "url": f"{self.url}/repos/{self.repo_name}",
+        }
+
+    def _issue_route(self, method, number, sub_resource, body):
+        issue = self.issues[number]
+        route = f"/repos/:repo/issues/:number{sub_resource or ''}"
+        data = json.loads(body) if body else None
+        if sub_resource == "/comments" and method == "POST":
+            with self._lock:
+                issue["comments"].append(data["body"])
+            self.recorder.mark(number)
+            return 201, route, {}, {"id": len(issue["comments"]), "body": data["body"]}
+        if sub_resource == "/labels" and method == "POST":
+            # The client sends a ``labels`` object; GitHub also accepts a plain list.
+            names = data["labels"] if isinstance(data, dict) else data
+            self._add_labels(issue, names)
+            self.recorder.mark(number)
+            return 200, route, {}, [{"name": name} for name in issue["labels"]]
+        if sub_resource is None and method == "PATCH":
+            with self._lock:
+                issue["title"] = data.get("title", issue["title"])
+            self.recorder.mark(number)
+        return 200, route, {}, self._issue_json(issue)
+
+    def _add_labels(self, issue, names):
+        with self._lock:
+            for name in names:
+                if name not in issue["labels"]:
+                    issue["labels"].append(name)
+
+    def _graphql(self, request):
+        query = request["query"]
+        variables = request.get("variables") or {}
+        if "RecentIssues" in query:
+            offset = int(variables.get("cursor") or 0)
+            issues = self._newest_first()
+            nodes = [self._graphql_node(issue) for issue in issues[offset : offset + 100]]
+            has_next = offset + 100 < len(issues)
+            connection = {
+                "pageInfo": {"hasNextPage": has_next, "endCursor": str(offset + 100)},
+                "nodes": nodes,
+            }
+            return 200, "graphql RecentIssues", {}, {"data": {"repository": {"issues": connection}}}
+        if "LabelId" in query:
+            label = {"id": f"LA_{variables['label']}"}
+            return 200, "graphql LabelId", {}, {"data": {"repository": {"label": label}}}
+        if "WriteBack" in query:
+            return 200, "graphql WriteBack", {}, {"data": self._write_back(query, variables)}
+        return 200, "graphql", {}, {"errors": [{"message": "Unknown query"}]}
+
+    def _write_back(self, query, variables):
+        data = {}
+        for n, field in re.findall(r"w(\d+): (\w+)\(", query):
+            number = int(variables[f"id{n}"].removeprefix("I_"))
+            value = variables[f"value{n}"]
+            issue = self.issues[number]
+            if field == "updateIssue":
+                with self._lock:
+                    issue["title"] = value
+            elif field == "addComment":
+                with self._lock:
+                    issue["comments"].append(value)
+            else:
+                self._add_labels(issue, [value.removeprefix("LA_")])
+            self.recorder.mark(number)
+            data[f"w{n}"] = {"clientMutationId": None}
+        return data
+
+
+# What a chatty model adds after the title line when it's asked for the title only.
+STREAM_EXPLANATION = (
+    "\n\nThe new title names the failing component and the symptom, so the issue is easier to "
+    "find in search and can be triaged without opening it. It also drops the vague wording of the "
+    "original title."
+)
+
+
+class FakeLLM(_FakeServer):
+    """OpenAI-compatible chat completions stand-in.
+
+    Every completion takes ``latency`` seconds, varied by up to ``jitter`` (a fraction of it).
+    A share of ``rate_limit_rate`` requests is answered with 429 and a ``Retry-After`` of
+    ``retry_after`` seconds, and ``error_rate`` with 500. Titles are rewritten deterministically,
+    and batch prompts get a JSON list with one title per issue. Streamed titles are followed by
+    an explanation, sent one word every ``word_latency`` seconds, so a client that stops after the
+    title line saves time; such streams are counted as ``llm stream stopped early``.
+    """
+
+    def __init__(
+        self,
+        latency=0.2,
+        jitter=0.0,
+        error_rate=0.0,
+        rate_limit_rate=0.0,
+        retry_after=1,
+        word_latency=0.005,
+        recorder=None,
+        seed=0,
+    ):
+        super().__init__(latency, recorder, seed)
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.word_latency = word_latency
+
+    def handle(self, method, path, query, body):
+        if method != "POST" or not path.endswith("/chat/completions"):
+            # Connection warm-up requests.
+            self.recorder.count(f"llm {method}")
+            return 200, {}, {}
+
+        with self._lock:
+            draw = self.random.random()
+            latency = self.latency * (1 + self.random.uniform(-self.jitter, self.jitter))
+        if draw < self.rate_limit_rate:
+            self.recorder.count("llm 429")
+            error = {"error": {"message": "Rate limit reached", "type": "rate_limit_error"}}
+            return 429, {"Retry-After": str(self.retry_after)}, error
+        if draw < self.rate_limit_rate + self.error_rate:
+            self.recorder.count("llm 500")
+            return 500, {}, {"error": {"message": "Internal error", "type": "server_error"}}
+
+        self.recorder.count("llm completion")
+        request = json.loads(body)
+        prompt = request["messages"][-1]["content"]
+        numbers = self._issue_numbers(prompt)
+        for number in numbers:
+            self.recorder.mark(number, start=True)
+        self._sleep(latency)
+        content = self._answer(prompt, numbers)
+        for number in numbers:
+            self.recorder.mark(number)
+        if request.get("stream"):
+            if "issues_json" not in prompt:
+                content += STREAM_EXPLANATION
+            return 200, {"Content-Type": "text/event-stream"}, self._stream(request, content)
+        return 200, {"Content-Type": "application/json"}, self._completion(request, prompt, content)
+
+    @staticmethod
+    def _issue_numbers(prompt):
+        if "issues_json" in prompt:
+            return [int(number) for number in BATCH_NUMBER.findall(prompt)]
+        match = TITLE_MARKER.search(prompt)
+        return [int(match.group(1))] if match else []
+
+    @staticmethod
+    def _answer(prompt, numbers):
+        if "issues_json" in prompt:
+            titles = [
+                {"issue_number": number, "title": f"Fix bench-issue-{number} crash"}
+                for number in numbers
+            ]
+            return json.dumps(titles)
+        number = numbers[0] if numbers else 0
+        return f"Fix bench-issue-{number} crash"
+
+    @staticmethod
+    def _completion(request, prompt, content):
+        prompt_tokens = len(prompt) // 4
+        completion_tokens = len(content) // 4
+        return {
+            "id": "chatcmpl-bench",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request["model"],
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    def _stream(self, request, content):
+        words = content.split(" ")
+        finished = False
+        try:
+            for i, word in enumerate(words):
+                if i:
+                    self._sleep(self.word_latency)
+                delta = {"content": word if i == 0 else f" {word}"}
+                chunk = {
+                    "id": "chatcmpl-bench",
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": request["model"],
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": None}],
+                }
+                yield f"data: {json.dumps(chunk)}\n\n".encode()
+            yield b"data: [DONE]\n\n"
+            finished = True
+        finally:
+            if not finished:
+                self.recorder.count("llm stream stopped early")
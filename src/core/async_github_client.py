@@ -0,0 +1,295 @@
+import asyncio
+import datetime
+
+import httpx
+
+from .github_client import GITHUB_API_URL, GITHUB_GRAPHQL_URL, is_candidate
+from .github_queries import (
+    LABEL_ID_QUERY,
+    RECENT_ISSUES_QUERY,
+    build_issue_search_query,
+    listing_since,
+    raise_for_graphql_errors,
+    recent_issues_variables,
+)
+from .github_rate_limit import RATE_LIMIT_STATUSES, GitHubRateLimiter, rate_limit_resource
+from .issue_record import IssueRecord
+from .tracing import (
+    http_attributes,
+    issue_attributes,
+    repo_attributes,
+    set_span_attributes,
+    span,
+    traced,
+)
+
+
+class AsyncGitHubClient:
+    """Asyncio counterpart of ``GitHubClient`` that talks to the REST API through httpx.
+
+    Issues are returned as ``IssueRecord`` objects and writes are addressed by repository and number.
+    """
+
+    def __init__(
+        self,
+        token,
+        base_url=GITHUB_API_URL,
+        graphql_url=GITHUB_GRAPHQL_URL,
+        transport=None,
+        rate_limiter=None,
+    ):
+        if not token:
+            raise ValueError("GitHub token not provided")
+        self.base_url = base_url.rstrip("/")
+        self.graphql_url = graphql_url
+        self.rate_limiter = rate_limiter or GitHubRateLimiter()
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            headers={
+                "Authorization": f"Bearer {token}",
+                "Accept": "application/vnd.github+json",
+                "X-GitHub-Api-Version": "2022-11-28",
+            },
+            timeout=httpx.Timeout(30.0),
+            transport=transport,
+        )
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    async def _request(self, method, url, **kwargs):
+        resource = rate_limit_resource(str(url))
+        attempt = 0
+        while True:
+            delay = self.rate_limiter.reserve(resource)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            with span(f"HTTP {method}", {"http.method": method, "http.url": str(url)}):
+                response = await self.client.request(method, url, **kwargs)
+                set_span_attributes(http_attributes(response))
+            self.rate_limiter.update(response.headers, resource)
+            if response.status_code not in RATE_LIMIT_STATUSES:
+                break
+            delay = self.rate_limiter.retry_delay(
+                response.status_code, response.headers, response.text, attempt
+            )
+            if delay is None:
+                break
+            print(f"GitHub rate limit hit, retrying in {delay:.0f}s")
+            attempt += 1
+        response.raise_for_status()
+        return response
+
+    @traced("github.get_repository", repo_attributes)
+    async def get_repository(self, repo_name):
+        try:
+            response = await self._request("GET", f"/repos/{repo_name}")
+            return response.json()
+        except Exception as e:
+            print(f"Error accessing repository {repo_name}: {e!s}")
+            raise
+
+    @traced("github.get_issue", repo_attributes)
+    async def get_issue(self, repo, number):
+        response = await self._request("GET", f"/repos/{repo['full_name']}/issues/{number}")
+        return IssueRecord.from_rest(response.json(), repo["full_name"])
+
+    @traced("github.iter_recent_issues", repo_attributes)
+    async def iter_recent_issues(
+        self,
+        repo,
+        days_to_scan=7,
+        limit=100,
+        required_labels=None,
+        apply_to_closed=False,
+        updated_since=None,
+    ):
+        date_threshold = datetime.datetime.now() - datetime.timedelta(days=days_to_scan)
+
+        try:
+            state = "all" if apply_to_closed else "open"
+            params = {
+                "state": state,
+                "sort": "created",
+                "direction": "desc",
+                "since": listing_since(date_threshold, updated_since).strftime(
+                    "%Y-%m-%dT%H:%M:%SZ"
+                ),
+                "per_page": 100,
+            }
+            all_issues = self._iter_rest_issues(
+                f"/repos/{repo['full_name']}/issues", params, repo["full_name"]
+            )
+
+            async for issue in self._select_issues(
+                all_issues, date_threshold, limit, required_labels
+            ):
+                yield issue
+        except Exception as e:
+            print(f"Error fetching recent issues: {e!s}")
+            raise
+
+    async def get_recent_issues(self, repo, *args, **kwargs):
+        return [issue async for issue in self.iter_recent_issues(repo, *args, **kwargs)]
+
+    @traced("github.iter_recent_issues_graphql", repo_attributes)
+    async def iter_recent_issues_graphql(
+        self,
+        repo,
+        days_to_scan=7,
+        limit=100,
+        required_labels=None,
+        apply_to_closed=False,
+        updated_since=None,
+    ):
+        date_threshold = datetime.datetime.now() - datetime.timedelta(days=days_to_scan)
+
+        try:
+            full_name = repo["full_name"]
+            variables = recent_issues_variables(
+                full_name, listing_since(date_threshold, updated_since), apply_to_closed
+            )
+            all_issues = self._iter_graphql_issues(variables, full_name)
+
+            async for issue in self._select_issues(
+                all_issues, date_threshold, limit, required_labels
+            ):
+                yield issue
+        except Exception as e:
+            print(f"Error fetching recent issues: {e!s}")
+            raise
+
+    async def get_recent_issues_graphql(self, repo, *args, **kwargs):
+        return [issue async for issue in self.iter_recent_issues_graphql(repo, *args, **kwargs)]
+
+    @traced("github.iter_recent_issues_search", repo_attributes)
+    async def iter_recent_issues_search(
+        self,
+        repo,
+        days_to_scan=7,
+        limit=100,
+        required_labels=None,
+        apply_to_closed=False,
+        skip_label=None,
+        updated_since=None,
+    ):
+        date_threshold = datetime.datetime.now() - datetime.timedelta(days=days_to_scan)
+
+        try:
+            query = build_issue_search_query(
+                repo["full_name"],
+                date_threshold,
+                required_labels,
+                apply_to_closed,
+                skip_label,
+                updated_since,
+            )
+            params = {"q": query, "sort": "created", "order": "desc", "per_page": min(limit, 100)}
+            all_issues = self._iter_rest_issues(
+                "/search/issues", params, repo["full_name"], items_key="items"
+            )
+
+            async for issue in self._select_issues(
+                all_issues, date_threshold, limit, required_labels
+            ):
+                yield issue
+        except Exception as e:
+            print(f"Error fetching recent issues: {e!s}")
+            raise
+
+    async def get_recent_issues_search(self, repo, *args, **kwargs):
+        return [issue async for issue in self.iter_recent_issues_search(repo, *args, **kwargs)]
+
+    async def _iter_rest_issues(self, url, params, repo_name, items_key=None):
+        while url:
+            response = await self._request("GET", url, params=params)
+            payload = response.json()
+            for data in payload[items_key] if items_key else payload:
+                yield IssueRecord.from_rest(data, repo_name)
+            # The "next" link already carries the query string.
+            url = response.links.get("next", {}).get("url")
+            params = None
+
+    async def _iter_graphql_issues(self, variables, repo_name):
+        while True:
+            data = await self.graphql(RECENT_ISSUES_QUERY, variables)
+            connection = data["repository"]["issues"]
+            for node in connection["nodes"]:
+                yield IssueRecord.from_graphql(node, repo_name)
+            if not connection["pageInfo"]["hasNextPage"]:
+                return
+            variables = {**variables, "cursor": connection["pageInfo"]["endCursor"]}
+
+    async def _select_issues(self, all_issues, date_threshold, limit, required_labels):
+        selected = 0
+        required_labels = set(required_labels or [])
+
+        try:
+            async for issue in all_issues:
+                # Every backend lists issues newest first, so nothing after this one is recent enough.
+                if issue.created_at < date_threshold:
+                    return
+                if is_candidate(issue, date_threshold, required_labels):
+                    yield issue
+                    selected += 1
+                if selected >= limit:
+                    return
+        finally:
+            await all_issues.aclose()
+
+    @traced("github.graphql")
+    async def graphql(self, query, variables=None, partial=False):
+        response = await self._request(
+            "POST", self.graphql_url, json={"query": query, "variables": variables or {}}
+        )
+        payload = response.json()
+        return payload if partial else raise_for_graphql_errors(payload)
+
+    @traced("github.get_label_id", repo_attributes)
+    async def get_label_id(self, repo_full_name, label_name):
+        owner, name = repo_full_name.split("/", 1)
+        data = await self.graphql(
+            LABEL_ID_QUERY, {"owner": owner, "name": name, "label": label_name}
+        )
+        label = data["repository"]["label"]
+        if label:
+            return label["id"]
+        response = await self._request(
+            "POST", f"/repos/{repo_full_name}/labels", json={"name": label_name}
+        )
+        return response.json()["node_id"]
+
+    @staticmethod
+    def _issue_path(issue):
+        return f"/repos/{issue.repo}/issues/{issue.number}"
+
+    @traced("github.update_issue_title", issue_attributes)
+    async def update_issue_title(self, issue, new_title):
+        try:
+            await self._request("PATCH", self._issue_path(issue), json={"title": new_title})
+            return True
+        except Exception as e:
+            print(f"Error updating issue title: {e!s}")
+            raise
+
+    @traced("github.add_issue_comment", issue_attributes)
+    async def add_issue_comment(self, issue, comment_text):
+        try:
+            response = await self._request(
+                "POST", f"{self._issue_path(issue)}/comments", json={"body": comment_text}
+            )
+            return response.json()
+        except Exception as e:
+            print(f"Error adding comment to issue: {e!s}")
+            raise
+
+    @traced("github.add_issue_label", issue_attributes)
+    async def add_issue_label(self, issue, label_name):
+        try:
+            await self._request(
+                "POST", f"{self._issue_path(issue)}/labels", json={"labels": [label_name]}
+            )
+            return True
+        except Exception as e:
+            print(f"Error adding label to issue: {e!s}")
+            return False
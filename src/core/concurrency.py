@@ -0,0 +1,241 @@
+import asyncio
+import contextlib
+import contextvars
+import itertools
+import queue
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class GroupedOutput:
+    """Stdout proxy that holds each task's output until the task is done.
+
+    Without it, ``print`` calls from concurrently processed issues interleave line by line.
+    Buffers live in a context variable, so this works for worker threads and asyncio tasks alike.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._buffer = contextvars.ContextVar("grouped_output_buffer", default=None)
+        self._lock = threading.Lock()
+
+    def start(self):
+        self._buffer.set([])
+
+    def take(self):
+        """Stop holding this task's output and return what it printed so far."""
+        buffer = self._buffer.get()
+        self._buffer.set(None)
+        return "".join(buffer or ())
+
+    def finish(self):
+        text = self.take()
+        if text:
+            with self._lock:
+                self.stream.write(text)
+                self.stream.flush()
+
+    def write(self, text):
+        buffer = self._buffer.get()
+        if buffer is None:
+            with self._lock:
+                return self.stream.write(text)
+        buffer.append(text)
+        return len(text)
+
+    def flush(self):
+        if self._buffer.get() is None:
+            self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+_install_lock = threading.Lock()
+
+
+def grouped_stdout():
+    """Return the ``GroupedOutput`` proxy of ``sys.stdout``, installing it on first use.
+
+    The proxy stays installed for the rest of the run. Threads outside the pool (the write lane,
+    a warm-up request) can be inside ``print`` on it at any time, and ``print`` only holds a
+    borrowed reference to ``sys.stdout`` on CPython 3.11, so swapping it back out could free it
+    under them. Outside a task the proxy writes straight through.
+    """
+    with _install_lock:
+        if not isinstance(sys.stdout, GroupedOutput):
+            sys.stdout = GroupedOutput(sys.stdout)
+        return sys.stdout
+
+
+def map_bounded(func, items, max_workers=1, on_error=None):
+    """Apply ``func`` to every item using at most ``max_workers`` threads.
+
+    Results are returned in input order. If ``func`` raises, the item's result is
+    ``on_error(item, error)`` instead, so one failing task doesn't abort the others. ``items`` is
+    read lazily, one item per free worker, so it can be a generator still fetching its items.
+    """
+
+    def call(item):
+        try:
+            return func(item)
+        except Exception as error:
+            if on_error is None:
+                raise
+            return on_error(item, error)
+
+    if max_workers <= 1:
+        return [call(item) for item in items]
+    items = iter(items)
+    head = list(itertools.islice(items, 2))
+    if len(head) <= 1:
+        return [call(item) for item in head]
+    items = itertools.chain(head, items)
+
+    output = grouped_stdout()
+    free_workers = threading.Semaphore(max_workers)
+
+    def grouped_call(item):
+        output.start()
+        try:
+            return call(item)
+        finally:
+            output.finish()
+            free_workers.release()
+
+    futures = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for item in items:
+            free_workers.acquire()
+            # Copy the caller's context, so tracing spans opened by ``func`` get the right parent.
+            futures.append(executor.submit(contextvars.copy_context().run, grouped_call, item))
+        return [future.result() for future in futures]
+
+
+async def _aiterate(items):
+    if hasattr(items, "__aiter__"):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+async def gather_bounded(func, items, max_concurrency=1, on_error=None):
+    """Asyncio version of ``map_bounded``: await ``func(item)`` with bounded concurrency.
+
+    ``items`` can also be an async iterable; it's read as tasks finish, like in ``map_bounded``.
+    """
+    semaphore = asyncio.Semaphore(max(max_concurrency, 1))
+    output = grouped_stdout()
+
+    async def call(item):
+        output.start()
+        try:
+            return await func(item)
+        except Exception as error:
+            if on_error is None:
+                raise
+            return on_error(item, error)
+        finally:
+            output.finish()
+            semaphore.release()
+
+    tasks = []
+    try:
+        async for item in _aiterate(items):
+            await semaphore.acquire()
+            tasks.append(asyncio.create_task(call(item)))
+    except BaseException:
+        # Let the started tasks finish, as ``map_bounded`` does, before giving up.
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    return await asyncio.gather(*tasks)
+
+
+_DONE = object()
+
+
+def _put_until_stopped(buffer, entry, stopped):
+    while not stopped.is_set():
+        try:
+            buffer.put(entry, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _produce(items, buffer, stopped):
+    iterator = iter(items)
+    try:
+        for item in iterator:
+            if not _put_until_stopped(buffer, (item, None), stopped):
+                return
+        _put_until_stopped(buffer, (_DONE, None), stopped)
+    except Exception as error:
+        _put_until_stopped(buffer, (_DONE, error), stopped)
+    finally:
+        # Closed in the thread that ran it, so the generator's cleanup runs here too.
+        if hasattr(iterator, "close"):
+            iterator.close()
+
+
+def prefetch(items, max_ahead):
+    """Iterate ``items`` in a background thread, staying at most ``max_ahead`` items ahead.
+
+    With a paginated listing, the next page is fetched while the consumer works through the
+    current one, and no more than ``max_ahead`` fetched items wait in memory. An error raised by
+    ``items`` is raised to the consumer once it reaches it.
+    """
+    buffer = queue.Queue(max_ahead)
+    stopped = threading.Event()
+    # The producer runs in a copy of the caller's context, so its tracing spans nest correctly.
+    producer = threading.Thread(
+        target=contextvars.copy_context().run,
+        args=(_produce, items, buffer, stopped),
+        daemon=True,
+    )
+    producer.start()
+    try:
+        while True:
+            item, error = buffer.get()
+            if item is _DONE:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stopped.set()
+        producer.join()
+
+
+async def aprefetch(items, max_ahead):
+    """Asyncio version of ``prefetch``: iterate the async iterable ``items`` in its own task."""
+    buffer = asyncio.Queue(max_ahead)
+
+    async def produce():
+        try:
+            async for item in items:
+                await buffer.put((item, None))
+            await buffer.put((_DONE, None))
+        except Exception as error:
+            await buffer.put((_DONE, error))
+        finally:
+            if hasattr(items, "aclose"):
+                await items.aclose()
+
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            item, error = await buffer.get()
+            if item is _DONE:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        producer.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await producer
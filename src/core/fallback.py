@@ -0,0 +1,170 @@
+import threading
+import time
+from collections import deque
+
+from .llm import AIClient, AsyncAIClient
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class AllProvidersFailedError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """Tracks the health of one provider.
+
+    The circuit opens after ``failure_threshold`` consecutive failures, or once at least
+    ``error_rate`` of the last ``window`` requests failed. While it's open, requests skip the
+    provider. After ``reset_timeout`` seconds a single probe request is let through (half-open):
+    success closes the circuit, failure opens it again.
+    """
+
+    def __init__(
+        self, failure_threshold=3, error_rate=0.5, window=10, reset_timeout=60, clock=time.monotonic
+    ):
+        self.failure_threshold = failure_threshold
+        self.error_rate = error_rate
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.outcomes = deque(maxlen=window)
+        self.opened_at = 0.0
+        self._probe_started = None
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            now = self.clock()
+            if self.state == OPEN and now - self.opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                self._probe_started = None
+            if self.state == HALF_OPEN:
+                # A probe that never reported back (a cancelled request) is replaced eventually.
+                if (
+                    self._probe_started is not None
+                    and now - self._probe_started < self.reset_timeout
+                ):
+                    return False
+                self._probe_started = now
+                return True
+            return self.state == CLOSED
+
+    def record_success(self):
+        with self._lock:
+            if self.state != CLOSED:
+                # Failures from before the outage would reopen the circuit right away.
+                self.outcomes.clear()
+            self.state = CLOSED
+            self.consecutive_failures = 0
+            self.outcomes.append(True)
+
+    def record_failure(self):
+        """Record a failed request and return whether it opened the circuit."""
+        with self._lock:
+            self.consecutive_failures += 1
+            self.outcomes.append(False)
+            failures = self.outcomes.count(False)
+            if (
+                self.state == HALF_OPEN
+                or self.consecutive_failures >= self.failure_threshold
+                or (
+                    len(self.outcomes) == self.outcomes.maxlen
+                    and failures >= self.error_rate * len(self.outcomes)
+                )
+            ):
+                opened = self.state != OPEN
+                self.state = OPEN
+                self.opened_at = self.clock()
+                return opened
+            return False
+
+
+class _Fallback:
+    def __init__(self, clients, breaker_factory=CircuitBreaker):
+        """``clients`` is an ordered list of ``(provider, client)`` pairs."""
+        self.clients = [(name, client, breaker_factory()) for name, client in clients]
+        self.model_name = self.clients[0][1].model_name
+
+    def _available(self):
+        # Checked lazily: a half-open circuit lets a probe through only when it's really sent.
+        for name, client, breaker in self.clients:
+            if breaker.allow():
+                yield name, client, breaker
+
+    def _failed(self, name, breaker, error):
+        if breaker.record_failure():
+            print(f"Circuit for {name} opened after repeated failures: {error!s}")
+        else:
+            print(f"{name} request failed: {error!s}")
+
+    def _give_up(self, errors):
+        if not errors:
+            return AllProvidersFailedError(
+                "All AI providers are unavailable, their circuits are open"
+            )
+        details = "; ".join(f"{name}: {error!s}" for name, error in errors)
+        return AllProvidersFailedError(f"All AI providers failed ({details})")
+
+
+class FallbackAIClient(_Fallback, AIClient):
+    """Tries providers in order, skipping the ones whose circuit breaker is open."""
+
+    def warm_up(self):
+        for _, client, _ in self.clients:
+            client.warm_up()
+
+    def generate_content(self, prompt):
+        return self._call("generate_content", prompt)
+
+    def generate_title(self, prompt, max_output_tokens=None):
+        return self._call("generate_title", prompt, max_output_tokens)
+
+    def _call(self, method, *args):
+        errors = []
+        for name, client, breaker in self._available():
+            if errors:
+                print(f"Falling back to {name}")
+            try:
+                response = getattr(client, method)(*args)
+            except Exception as error:
+                self._failed(name, breaker, error)
+                errors.append((name, error))
+                continue
+            breaker.record_success()
+            return response
+        raise self._give_up(errors)
+
+
+class AsyncFallbackAIClient(_Fallback, AsyncAIClient):
+    async def warm_up(self):
+        for _, client, _ in self.clients:
+            await client.warm_up()
+
+    async def aclose(self):
+        for _, client, _ in self.clients:
+            await client.aclose()
+
+    async def generate_content(self, prompt):
+        return await self._call("generate_content", prompt)
+
+    async def generate_title(self, prompt, max_output_tokens=None):
+        return await self._call("generate_title", prompt, max_output_tokens)
+
+    async def _call(self, method, *args):
+        errors = []
+        for name, client, breaker in self._available():
+            if errors:
+                print(f"Falling back to {name}")
+            try:
+                response = await getattr(client, method)(*args)
+            except Exception as error:
+                self._failed(name, breaker, error)
+                errors.append((name, error))
+                continue
+            breaker.record_success()
+            return response
+        raise self._give_up(errors)
@@ -1,14 +1,71 @@
 import datetime
+import functools
 
+import requests
 from github import Github
+from github.Requester import Requester
+
+from .github_http_cache import ConditionalRequestAdapter
+from .github_queries import (
+    LABEL_ID_QUERY,
+    RECENT_ISSUES_QUERY,
+    build_issue_search_query,
+    listing_since,
+    raise_for_graphql_errors,
+    recent_issues_variables,
+)
+from .github_rate_limit import GitHubRateLimiter, RateLimitedAdapter, SessionConnection
+from .issue_record import IssueRecord
+from .tracing import issue_attributes, repo_attributes, traced
+
+GITHUB_API_URL = "https://api.github.com"
+GITHUB_GRAPHQL_URL = "https://api.github.com/graphql"
+
+
+def is_candidate(issue, date_threshold, required_labels):
+    if required_labels:
+        if not any(name in required_labels for name in issue.label_names):
+            return False
+    return issue.created_at >= date_threshold and not issue.is_pr
 
 
 class GitHubClient:
-    def __init__(self, token):
+    def __init__(
+        self, token, http_cache=None, base_url=GITHUB_API_URL, graphql_url=GITHUB_GRAPHQL_URL
+    ):
         if not token:
             raise ValueError("GitHub token not provided")
-        self.client = Github(token)
+        # PyGithub and the plain session below share one connection pool and one rate limiter,
+        # and with ``http_cache`` (a ``GitHubResponseCache``) revalidate issue reads with ETags.
+        self.rate_limiter = GitHubRateLimiter()
+        self.http_cache = http_cache
+        self.base_url = base_url.rstrip("/")
+        self.graphql_url = graphql_url
+        self.session = requests.Session()
+        if http_cache:
+            adapter = ConditionalRequestAdapter(self.rate_limiter, http_cache)
+        else:
+            adapter = RateLimitedAdapter(self.rate_limiter)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(
+            {
+                "Authorization": f"Bearer {token}",
+                "Accept": "application/vnd.github+json",
+            }
+        )
+        # The connection class is picked when the client is created, so it is only injected
+        # for the duration of the constructor call.
+        Requester.injectConnectionClasses(
+            functools.partial(SessionConnection, session=self.session, protocol="http"),
+            functools.partial(SessionConnection, session=self.session),
+        )
+        try:
+            self.client = Github(token, base_url=self.base_url, per_page=100)
+        finally:
+            Requester.resetConnectionClasses()
 
+    @traced("github.get_repository", repo_attributes)
     def get_repository(self, repo_name):
         try:
             return self.client.get_repo(repo_name)
@@ -16,53 +73,203 @@ class GitHubClient:
             print(f"Error accessing repository {repo_name}: {e!s}")
             raise
 
-    def get_recent_issues(
-        self, repo, days_to_scan=7, limit=100, required_labels=None, apply_to_closed=False
+    @traced("github.get_issue", repo_attributes)
+    def get_issue(self, repo, number):
+        url = f"{self.base_url}/repos/{repo.full_name}/issues/{number}"
+        return IssueRecord.from_rest(self._rest("GET", url, None), repo.full_name)
+
+    @traced("github.iter_recent_issues", repo_attributes)
+    def iter_recent_issues(
+        self,
+        repo,
+        days_to_scan=7,
+        limit=100,
+        required_labels=None,
+        apply_to_closed=False,
+        updated_since=None,
     ):
+        """Yield recent candidate issues, newest first, as the listing's pages arrive.
+
+        Only the page being read is held, so the caller can start on the first issues while the
+        next page is fetched, whatever ``limit`` is.
+        """
         date_threshold = datetime.datetime.now() - datetime.timedelta(days=days_to_scan)
 
         try:
             state = "all" if apply_to_closed else "open"
+            params = {
+                "state": state,
+                "sort": "created",
+                "direction": "desc",
+                "since": listing_since(date_threshold, updated_since).strftime(
+                    "%Y-%m-%dT%H:%M:%SZ"
+                ),
+                "per_page": 100,
+            }
+            all_issues = self._iter_rest_issues(
+                f"{self.base_url}/repos/{repo.full_name}/issues", params, repo.full_name
+            )
 
-            all_issues = repo.get_issues(
-                state=state, sort="created", direction="desc", since=date_threshold
+            yield from self._select_issues(all_issues, date_threshold, limit, required_labels)
+        except Exception as e:
+            print(f"Error fetching recent issues: {e!s}")
+            raise
+
+    def get_recent_issues(self, repo, *args, **kwargs):
+        return list(self.iter_recent_issues(repo, *args, **kwargs))
+
+    @traced("github.iter_recent_issues_graphql", repo_attributes)
+    def iter_recent_issues_graphql(
+        self,
+        repo,
+        days_to_scan=7,
+        limit=100,
+        required_labels=None,
+        apply_to_closed=False,
+        updated_since=None,
+    ):
+        """Same as ``iter_recent_issues``, but reads ``IssueRecord`` pages from the GraphQL API."""
+        date_threshold = datetime.datetime.now() - datetime.timedelta(days=days_to_scan)
+
+        try:
+            variables = recent_issues_variables(
+                repo.full_name, listing_since(date_threshold, updated_since), apply_to_closed
             )
+            all_issues = self._iter_graphql_issues(variables, repo.full_name)
 
-            recent_issues = []
-            required_labels = set(required_labels or [])
+            yield from self._select_issues(all_issues, date_threshold, limit, required_labels)
+        except Exception as e:
+            print(f"Error fetching recent issues: {e!s}")
+            raise
+
+    def get_recent_issues_graphql(self, repo, *args, **kwargs):
+        return list(self.iter_recent_issues_graphql(repo, *args, **kwargs))
+
+    @traced("github.iter_recent_issues_search", repo_attributes)
+    def iter_recent_issues_search(
+        self,
+        repo,
+        days_to_scan=7,
+        limit=100,
+        required_labels=None,
+        apply_to_closed=False,
+        skip_label=None,
+        updated_since=None,
+    ):
+        """Same as ``iter_recent_issues``, but pushes the filters into a search query.
 
-            for issue in all_issues:
-                if required_labels:
-                    if not any(label.name in required_labels for label in issue.labels):
-                        continue
-                if issue.created_at >= date_threshold and not issue.pull_request:
-                    recent_issues.append(issue)
-                if len(recent_issues) >= limit:
-                    break
+        The creation date, labels and skip label are applied by GitHub, so only candidates are
+        transferred, and paging stops as soon as ``limit`` issues have been yielded.
+        """
+        date_threshold = datetime.datetime.now() - datetime.timedelta(days=days_to_scan)
+
+        try:
+            query = build_issue_search_query(
+                repo.full_name,
+                date_threshold,
+                required_labels,
+                apply_to_closed,
+                skip_label,
+                updated_since,
+            )
+            params = {"q": query, "sort": "created", "order": "desc", "per_page": min(limit, 100)}
+            all_issues = self._iter_rest_issues(
+                f"{self.base_url}/search/issues", params, repo.full_name, items_key="items"
+            )
 
-            return recent_issues
+            yield from self._select_issues(all_issues, date_threshold, limit, required_labels)
         except Exception as e:
             print(f"Error fetching recent issues: {e!s}")
             raise
 
+    def get_recent_issues_search(self, repo, *args, **kwargs):
+        return list(self.iter_recent_issues_search(repo, *args, **kwargs))
+
+    def _iter_rest_issues(self, url, params, repo_name, items_key=None):
+        while url:
+            response = self.session.get(url, params=params, timeout=30)
+            response.raise_for_status()
+            payload = response.json()
+            for data in payload[items_key] if items_key else payload:
+                yield IssueRecord.from_rest(data, repo_name)
+            # The "next" link already carries the query string.
+            url = response.links.get("next", {}).get("url")
+            params = None
+
+    def _iter_graphql_issues(self, variables, repo_name):
+        while True:
+            data = self.graphql(RECENT_ISSUES_QUERY, variables)
+            connection = data["repository"]["issues"]
+            for node in connection["nodes"]:
+                yield IssueRecord.from_graphql(node, repo_name)
+            if not connection["pageInfo"]["hasNextPage"]:
+                return
+            variables = {**variables, "cursor": connection["pageInfo"]["endCursor"]}
+
+    def _select_issues(self, all_issues, date_threshold, limit, required_labels):
+        selected = 0
+        required_labels = set(required_labels or [])
+
+        for issue in all_issues:
+            # Every backend lists issues newest first, so nothing after this one is recent enough.
+            if issue.created_at < date_threshold:
+                return
+            if is_candidate(issue, date_threshold, required_labels):
+                yield issue
+                selected += 1
+            if selected >= limit:
+                return
+
+    @traced("github.graphql")
+    def graphql(self, query, variables=None, partial=False):
+        """Run a GraphQL request; with ``partial`` the payload is returned even if fields failed."""
+        response = self.session.post(
+            self.graphql_url, json={"query": query, "variables": variables or {}}, timeout=30
+        )
+        response.raise_for_status()
+        payload = response.json()
+        return payload if partial else raise_for_graphql_errors(payload)
+
+    @traced("github.get_label_id", repo_attributes)
+    def get_label_id(self, repo_full_name, label_name):
+        """Return the node id of a label, creating the label if the repository doesn't have it."""
+        owner, name = repo_full_name.split("/", 1)
+        data = self.graphql(LABEL_ID_QUERY, {"owner": owner, "name": name, "label": label_name})
+        label = data["repository"]["label"]
+        if label:
+            return label["id"]
+        url = f"{self.base_url}/repos/{repo_full_name}/labels"
+        return self._rest("POST", url, {"name": label_name})["node_id"]
+
+    def _rest(self, method, url, payload):
+        response = self.session.request(method, url, json=payload, timeout=30)
+        response.raise_for_status()
+        return response.json()
+
+    def _issue_url(self, issue):
+        return f"{self.base_url}/repos/{issue.repo}/issues/{issue.number}"
+
+    @traced("github.update_issue_title", issue_attributes)
     def update_issue_title(self, issue, new_title):
         try:
-            issue.edit(title=new_title)
+            self._rest("PATCH", self._issue_url(issue), {"title": new_title})
             return True
         except Exception as e:
             print(f"Error updating issue title: {e!s}")
             raise
 
+    @traced("github.add_issue_comment", issue_attributes)
     def add_issue_comment(self, issue, comment_text):
         try:
-            return issue.create_comment(comment_text)
+            return self._rest("POST", f"{self._issue_url(issue)}/comments", {"body": comment_text})
         except Exception as e:
             print(f"Error adding comment to issue: {e!s}")
             raise
 
+    @traced("github.add_issue_label", issue_attributes)
     def add_issue_label(self, issue, label_name):
         try:
-            issue.add_to_labels(label_name)
+            self._rest("POST", f"{self._issue_url(issue)}/labels", {"labels": [label_name]})
             return True
         except Exception as e:
             print(f"Error adding label to issue: {e!s}")
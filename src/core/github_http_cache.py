@@ -0,0 +1,155 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+
+from .github_rate_limit import RateLimitedAdapter
+from .verbose import verbose_print
+
+# Issue listings and single issues; other reads are cheap or rarely repeated.
+CACHEABLE_PATH = re.compile(r"^/repos/[^/]+/[^/]+/issues(/\d+)?/?$")
+
+# Headers of a cached response that still apply when GitHub answers 304 Not Modified.
+REPLAYED_HEADERS = ("Content-Type", "Link", "ETag", "Last-Modified")
+
+
+def is_cacheable(request):
+    return request.method == "GET" and bool(CACHEABLE_PATH.match(urlsplit(request.url).path))
+
+
+class GitHubResponseCache:
+    """On-disk cache of GitHub responses with their ``ETag`` and ``Last-Modified`` validators.
+
+    Cached requests are sent conditionally. GitHub answers 304 Not Modified when nothing
+    changed, and doesn't count that response against the rate limit, so the cached body is
+    served for free. Entries not used for ``ttl_seconds`` are removed by ``prune``.
+    """
+
+    def __init__(self, directory, ttl_seconds=7 * 24 * 3600):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.not_modified = 0
+        self.fetched = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def make_key(request):
+        # The URL names the repository and the media type changes the body. The token is left
+        # out: Actions issues a new one for every job, and the ETag tells whether the entry
+        # still holds for the current one.
+        payload = json.dumps([request.url, request.headers.get("Accept")])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    def set(self, key, response):
+        headers = {
+            name: response.headers[name] for name in REPLAYED_HEADERS if name in response.headers
+        }
+        if "ETag" not in headers and "Last-Modified" not in headers:
+            return
+        entry = {"url": response.url, "headers": headers, "body": response.text}
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                json.dump(entry, file, ensure_ascii=False)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            print(f"Error writing GitHub cache entry: {e!s}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def record(self, not_modified):
+        with self._lock:
+            if not_modified:
+                self.not_modified += 1
+            else:
+                self.fetched += 1
+
+    def prune(self):
+        removed = 0
+        now = time.time()
+        for filename in os.listdir(self.directory):
+            path = os.path.join(self.directory, filename)
+            try:
+                if filename.endswith(".tmp") or now - os.path.getmtime(path) > self.ttl_seconds:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                continue
+        return removed
+
+    def summary(self):
+        return f"GitHub response cache: {self.not_modified} not modified, {self.fetched} fetched"
+
+
+def replay(entry, response):
+    """Turn a 304 response into the cached 200 response it stands for."""
+    cached = requests.Response()
+    cached.status_code = 200
+    cached.reason = "OK"
+    # Rate limit headers come from the fresh response, the rest from the cached one.
+    cached.headers.update(response.headers)
+    cached.headers.update(entry["headers"])
+    for name in ("Content-Length", "Content-Encoding"):
+        cached.headers.pop(name, None)
+    cached._content = entry["body"].encode("utf-8")
+    cached.encoding = "utf-8"
+    cached.url = response.url
+    cached.request = response.request
+    cached.connection = response.connection
+    return cached
+
+
+class ConditionalRequestAdapter(RateLimitedAdapter):
+    """``RateLimitedAdapter`` that revalidates cacheable requests with a ``GitHubResponseCache``."""
+
+    def __init__(self, rate_limiter, cache, **kwargs):
+        self.cache = cache
+        super().__init__(rate_limiter, **kwargs)
+
+    def send(self, request, **kwargs):
+        if not is_cacheable(request):
+            return super().send(request, **kwargs)
+
+        key = self.cache.make_key(request)
+        entry = self.cache.get(key)
+        if entry:
+            if "ETag" in entry["headers"]:
+                request.headers["If-None-Match"] = entry["headers"]["ETag"]
+            if "Last-Modified" in entry["headers"]:
+                request.headers["If-Modified-Since"] = entry["headers"]["Last-Modified"]
+
+        response = super().send(request, **kwargs)
+        if entry and response.status_code == 304:
+            verbose_print(f"GitHub response not modified: {request.url}")
+            self.cache.record(not_modified=True)
+            response.close()
+            return replay(entry, response)
+        if response.status_code == 200:
+            self.cache.record(not_modified=False)
+            self.cache.set(key, response)
+        return response
@@ -0,0 +1,155 @@
+# GraphQL documents sent by GitHubClient and AsyncGitHubClient.
+
+# Only the fields IssueProcessor reads are requested. ``repository.issues`` never returns pull
+# requests, so nothing has to be discarded on the client side.
+RECENT_ISSUES_QUERY = """
+query RecentIssues($owner: String!, $name: String!, $states: [IssueState!], $since: DateTime, $cursor: String) {
+  repository(owner: $owner, name: $name) {
+    issues(
+      first: 100
+      after: $cursor
+      states: $states
+      filterBy: {since: $since}
+      orderBy: {field: CREATED_AT, direction: DESC}
+    ) {
+      pageInfo {
+        hasNextPage
+        endCursor
+      }
+      nodes {
+        id
+        number
+        title
+        body
+        createdAt
+        labels(first: 100) {
+          nodes {
+            name
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+
+def recent_issues_variables(repo_full_name, date_threshold, apply_to_closed):
+    owner, name = repo_full_name.split("/", 1)
+    return {
+        "owner": owner,
+        "name": name,
+        "states": ["OPEN", "CLOSED"] if apply_to_closed else ["OPEN"],
+        "since": date_threshold.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "cursor": None,
+    }
+
+
+def listing_since(date_threshold, updated_since=None):
+    """Return the lower bound of the "updated since" filter of an issue listing.
+
+    An issue created after ``date_threshold`` was also updated after it, so the creation window
+    works as the bound until a scan cursor (``updated_since``) narrows it down. The window is
+    rounded down to the day, so the listing URL, and with it the cached response, stays the
+    same across runs of a day; issues are listed newest first and older ones aren't paged to.
+    The cursor is kept exact: rounding it would list a day of already processed issues again,
+    while the listing it bounds is small enough that missing the cache costs little.
+    """
+    day = date_threshold.replace(hour=0, minute=0, second=0, microsecond=0)
+    return max(day, updated_since) if updated_since else day
+
+
+def raise_for_graphql_errors(payload):
+    errors = payload.get("errors")
+    if errors:
+        messages = "; ".join(error.get("message", str(error)) for error in errors)
+        raise Exception(f"GraphQL request failed: {messages}")
+    return payload["data"]
+
+
+def _quote_label(label):
+    return '"' + label.replace('"', '\\"') + '"'
+
+
+def build_issue_search_query(
+    repo_full_name,
+    date_threshold,
+    required_labels=None,
+    apply_to_closed=False,
+    skip_label=None,
+    updated_since=None,
+):
+    """Build a search query that leaves only real candidates for ``IssueProcessor``.
+
+    A comma-separated ``label:`` qualifier matches issues with any of the labels, which is the
+    same "at least one of" rule ``required-labels`` uses.
+    """
+    qualifiers = [f"repo:{repo_full_name}", "is:issue"]
+    if not apply_to_closed:
+        qualifiers.append("is:open")
+    qualifiers.append(f"created:>={date_threshold.strftime('%Y-%m-%dT%H:%M:%SZ')}")
+    if updated_since:
+        qualifiers.append(f"updated:>={updated_since.strftime('%Y-%m-%dT%H:%M:%SZ')}")
+    if required_labels:
+        qualifiers.append("label:" + ",".join(_quote_label(label) for label in required_labels))
+    if skip_label:
+        qualifiers.append(f"-label:{_quote_label(skip_label)}")
+    return " ".join(qualifiers)
+
+
+LABEL_ID_QUERY = """
+query LabelId($owner: String!, $name: String!, $label: String!) {
+  repository(owner: $owner, name: $name) {
+    label(name: $label) {
+      id
+    }
+  }
+}
+"""
+
+# Mutation fields of the writes IssueProcessor plans, keyed by the GitHubClient method they stand
+# for: (type of the value variable, field template). ``{n}`` is the index of the write.
+WRITE_MUTATIONS = {
+    "update_issue_title": ("String!", "updateIssue(input: {{id: $id{n}, title: $value{n}}})"),
+    "add_issue_comment": ("String!", "addComment(input: {{subjectId: $id{n}, body: $value{n}}})"),
+    "add_issue_label": (
+        "ID!",
+        "addLabelsToLabelable(input: {{labelableId: $id{n}, labelIds: [$value{n}]}})",
+    ),
+}
+
+
+def build_write_mutation(writes):
+    """Build one mutation document for ``(method, node id, value)`` writes.
+
+    Each write gets the alias ``w<index>``, so errors can be traced back to it through their
+    ``path``. GitHub runs the fields of a mutation one after another, in document order.
+    """
+    declarations = []
+    fields = []
+    variables = {}
+    for n, (method, node_id, value) in enumerate(writes):
+        value_type, template = WRITE_MUTATIONS[method]
+        declarations.append(f"$id{n}: ID!, $value{n}: {value_type}")
+        fields.append(f"  w{n}: {template.format(n=n)} {{ clientMutationId }}")
+        variables[f"id{n}"] = node_id
+        variables[f"value{n}"] = value
+    document = "mutation WriteBack({}) {{\n{}\n}}".format(
+        ", ".join(declarations), "\n".join(fields)
+    )
+    return document, variables
+
+
+def failed_writes(payload, count):
+    """Map write indexes of a ``build_write_mutation`` response to their error message."""
+    failures = {}
+    for error in payload.get("errors") or []:
+        message = error.get("message", str(error))
+        path = error.get("path") or []
+        alias = path[0] if path else ""
+        if isinstance(alias, str) and alias.startswith("w") and alias[1:].isdigit():
+            failures[int(alias[1:])] = message
+        else:
+            # Not tied to a field: the whole document was rejected.
+            return dict.fromkeys(range(count), message)
+    return failures
@@ -0,0 +1,246 @@
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+
+from github.Requester import HTTPSRequestsConnectionClass, RequestsResponse
+from requests.adapters import HTTPAdapter
+
+from .tracing import http_attributes, set_span_attributes, span
+from .verbose import verbose_print
+
+RATE_LIMIT_STATUSES = (403, 429)
+
+# GitHub asks clients hitting a secondary rate limit without further hints to wait at least a
+# minute, and to wait exponentially longer if they keep hitting it.
+SECONDARY_LIMIT_WAIT = 60
+
+
+def rate_limit_resource(url):
+    """Return the rate limit bucket GitHub charges a request to ``url`` against."""
+    if url.rstrip("/").endswith("/graphql"):
+        return "graphql"
+    if "/search/" in url:
+        return "search"
+    return "core"
+
+
+class _Budget:
+    def __init__(self):
+        self.remaining = None
+        self.limit = None
+        self.reset_at = None
+        self.next_slot = 0.0
+
+
+class GitHubRateLimiter:
+    """Schedules GitHub API requests from the rate limit headers of earlier responses.
+
+    Every rate limit resource (``core``, ``search``, ``graphql``) keeps its own budget. Once less
+    than ``pace_below`` of a budget is left, requests are spread evenly over the time until it
+    resets; when it's exhausted, requests wait for the reset. Rate limited responses (403/429)
+    block every caller for the time GitHub asks for, and are retried up to ``max_retries`` times.
+    """
+
+    def __init__(self, pace_below=0.1, max_retries=3, max_wait=600, clock=time.time):
+        self.pace_below = pace_below
+        self.max_retries = max_retries
+        self.max_wait = max_wait
+        self.clock = clock
+        self.blocked_until = 0.0
+        self._budgets = {}
+        self._lock = threading.Lock()
+
+    def _budget(self, resource):
+        if resource not in self._budgets:
+            self._budgets[resource] = _Budget()
+        return self._budgets[resource]
+
+    def reserve(self, resource="core"):
+        """Claim a request slot and return how many seconds to wait before sending it."""
+        with self._lock:
+            now = self.clock()
+            start = max(now, self.blocked_until)
+            budget = self._budget(resource)
+            if budget.remaining is not None and budget.reset_at and budget.reset_at > now:
+                if budget.remaining <= 0:
+                    start = max(start, budget.reset_at + 1)
+                elif budget.limit and budget.remaining < budget.limit * self.pace_below:
+                    start = max(start, budget.next_slot)
+                    budget.next_slot = start + (budget.reset_at - now) / budget.remaining
+                budget.remaining -= 1
+            return start - now
+
+    def wait(self, resource="core"):
+        delay = self.reserve(resource)
+        if delay > 0:
+            verbose_print(f"Waiting {delay:.1f}s for the GitHub {resource} rate limit")
+            time.sleep(delay)
+
+    def update(self, headers, resource="core"):
+        """Record the rate limit state reported by a response."""
+        try:
+            remaining = int(headers["x-ratelimit-remaining"])
+            limit = int(headers["x-ratelimit-limit"])
+            reset_at = int(headers["x-ratelimit-reset"])
+        except (KeyError, TypeError, ValueError):
+            return
+        with self._lock:
+            budget = self._budget(headers.get("x-ratelimit-resource") or resource)
+            if budget.reset_at != reset_at or budget.remaining is None:
+                budget.remaining = remaining
+            else:
+                # Responses to concurrent requests can arrive out of order; keep the lowest count.
+                budget.remaining = min(budget.remaining, remaining)
+            budget.limit = limit
+            budget.reset_at = reset_at
+
+    def retry_delay(self, status, headers, body="", attempt=0):
+        """Return how long to back off before retrying a rate limited response, or None.
+
+        None means the response isn't rate limited, or it shouldn't be retried anymore. Otherwise
+        every caller is blocked for the returned number of seconds.
+        """
+        if status not in RATE_LIMIT_STATUSES:
+            return None
+        now = self.clock()
+        delay = self._retry_after(headers.get("retry-after"), now)
+        if delay is None and headers.get("x-ratelimit-remaining") == "0":
+            try:
+                delay = int(headers["x-ratelimit-reset"]) - now + 1
+            except (KeyError, TypeError, ValueError):
+                delay = None
+        if delay is None:
+            if status == 403 and "rate limit" not in (body or "").lower():
+                # A plain permission error.
+                return None
+            delay = SECONDARY_LIMIT_WAIT * 2**attempt
+
+        delay = max(delay, 1)
+        if attempt >= self.max_retries or delay > self.max_wait:
+            return None
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, now + delay)
+        return delay
+
+    @staticmethod
+    def _retry_after(value, now):
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            pass
+        try:
+            return parsedate_to_datetime(value).timestamp() - now
+        except (TypeError, ValueError):
+            return None
+
+
+class WritePacer:
+    """Spaces out content-creating requests (comments, labels, title edits, mutations).
+
+    GitHub's secondary rate limits are much stricter for writes than for reads, so writes start at
+    least ``min_interval`` seconds apart and at most ``per_minute`` of them start in any 60 seconds.
+    Either limit is disabled with 0.
+    """
+
+    def __init__(self, min_interval=1.0, per_minute=0, clock=time.monotonic):
+        self.min_interval = min_interval
+        self.per_minute = per_minute
+        self.clock = clock
+        self.next_slot = 0.0
+        self.started = deque()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Claim the next write slot and return how many seconds to wait for it."""
+        with self._lock:
+            now = self.clock()
+            start = max(now, self.next_slot)
+            if self.per_minute:
+                while self.started and self.started[0] <= start - 60:
+                    self.started.popleft()
+                if len(self.started) >= self.per_minute:
+                    start = self.started.popleft() + 60
+                self.started.append(start)
+            self.next_slot = start + self.min_interval
+            return start - now
+
+    def wait(self):
+        delay = self.reserve()
+        if delay > 0:
+            verbose_print(f"Waiting {delay:.1f}s before the next GitHub write")
+            time.sleep(delay)
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """``requests`` transport adapter that sends every request through a ``GitHubRateLimiter``."""
+
+    def __init__(self, rate_limiter, **kwargs):
+        self.rate_limiter = rate_limiter
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        resource = rate_limit_resource(request.url)
+        attempt = 0
+        while True:
+            self.rate_limiter.wait(resource)
+            with span(
+                f"HTTP {request.method}", {"http.method": request.method, "http.url": request.url}
+            ):
+                response = super().send(request, **kwargs)
+                set_span_attributes(http_attributes(response))
+            self.rate_limiter.update(response.headers, resource)
+            if response.status_code not in RATE_LIMIT_STATUSES:
+                return response
+            delay = self.rate_limiter.retry_delay(
+                response.status_code, response.headers, response.text, attempt
+            )
+            if delay is None:
+                return response
+            print(f"GitHub rate limit hit, retrying in {delay:.0f}s")
+            response.close()
+            attempt += 1
+
+
+class SessionConnection(HTTPSRequestsConnectionClass):
+    """PyGithub connection class that sends requests through a shared ``requests.Session``.
+
+    PyGithub keeps one connection object per client and passes a request's details from
+    ``request()`` to ``getresponse()`` on it, so they are kept per thread here.
+    """
+
+    def __init__(
+        self,
+        host,
+        port=None,
+        strict=False,
+        timeout=None,
+        session=None,
+        protocol="https",
+        **kwargs,
+    ):
+        self.host = host
+        self.port = port if port else (443 if protocol == "https" else 80)
+        self.protocol = protocol
+        self.timeout = timeout
+        self.verify = kwargs.get("verify", True)
+        self.session = session
+        self._local = threading.local()
+
+    def request(self, verb, url, data, headers):
+        self._local.request = (verb, url, data, headers)
+
+    def getresponse(self):
+        verb, url, data, headers = self._local.request
+        response = self.session.request(
+            verb,
+            f"{self.protocol}://{self.host}:{self.port}{url}",
+            headers=headers,
+            data=data,
+            timeout=self.timeout,
+            verify=self.verify,
+            allow_redirects=False,
+        )
+        return RequestsResponse(response)
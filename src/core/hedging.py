@@ -0,0 +1,306 @@
+import asyncio
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+
+from .concurrency import grouped_stdout
+from .llm import AIClient, AsyncAIClient
+from .llm_rate_limit import SendWatch, watch_send
+
+# Hedge delay used until enough latencies of the primary provider have been recorded.
+DEFAULT_HEDGE_DELAY = 2.0
+MIN_SAMPLES = 5
+# Seconds the end of a run waits for abandoned requests, so their token usage gets reported.
+ABANDONED_WAIT = 30.0
+
+
+class HedgeStats:
+    """Latencies of the primary provider plus counters of the hedged requests.
+
+    The latencies drive the hedge delay (their 95th percentile). They can be saved to a file
+    so that short runs, like the ones triggered by a single issue, start from earlier runs.
+    """
+
+    def __init__(self, latencies=(), window=200):
+        self.latencies = deque(latencies, maxlen=window)
+        self.requests = 0
+        self.hedged = 0
+        self.secondary_wins = 0
+        self.latency_saved = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path, key):
+        try:
+            with open(path, encoding="utf-8") as file:
+                return cls(json.load(file).get(key, []))
+        except (OSError, ValueError, AttributeError):
+            return cls()
+
+    def save(self, path, key):
+        try:
+            with open(path, encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            data = {}
+        data[key] = list(self.latencies)
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "w", encoding="utf-8") as file:
+                json.dump(data, file)
+        except OSError as e:
+            print(f"Error saving provider latencies: {e!s}")
+
+    def record_latency(self, seconds):
+        with self._lock:
+            self.latencies.append(round(seconds, 3))
+
+    def percentile(self, fraction):
+        with self._lock:
+            if len(self.latencies) < MIN_SAMPLES:
+                return None
+            ordered = sorted(self.latencies)
+        return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+    def record_request(self, hedged=False, secondary_won=False, saved=0.0):
+        with self._lock:
+            self.requests += 1
+            self.hedged += hedged
+            self.secondary_wins += secondary_won
+            self.latency_saved += saved
+
+    def summary(self):
+        rate = self.hedged / self.requests * 100 if self.requests else 0
+        return (
+            f"Hedging: {self.hedged} of {self.requests} requests hedged ({rate:.0f}%), "
+            f"{self.secondary_wins} answered first by the secondary provider, "
+            f"~{self.latency_saved:.1f}s saved"
+        )
+
+
+class _Hedge:
+    def __init__(self, primary, secondary, primary_name, secondary_name, stats, delay=None):
+        self.primary = primary
+        self.secondary = secondary
+        self.primary_name = primary_name
+        self.secondary_name = secondary_name
+        self.stats = stats
+        self.delay = delay
+        self.model_name = primary.model_name
+
+    def hedge_delay(self):
+        if self.delay:
+            return self.delay
+        return self.stats.percentile(0.95) or DEFAULT_HEDGE_DELAY
+
+    def _record_latency(self, watch):
+        if not watch.cached:
+            self.stats.record_latency(time.perf_counter() - watch.sent_at)
+
+    def _report_win(self, delay, sent_at, secondary_won):
+        # The primary is abandoned, so its latency is unknown. The saving is estimated against the
+        # p95 latency the hedge delay is based on.
+        saved = max(delay - (time.perf_counter() - sent_at), 0) if secondary_won else 0.0
+        if secondary_won:
+            print(f"{self.secondary_name} answered first")
+        self.stats.record_request(hedged=True, secondary_won=secondary_won, saved=saved)
+
+    def _announce(self, delay):
+        print(
+            f"No answer from {self.primary_name} after {delay:.1f}s, "
+            f"hedging with {self.secondary_name}"
+        )
+
+
+class _Request(Future):
+    """Future of a request running in the background, plus the output it printed."""
+
+    output = ""
+
+
+def _in_background(func, *args, watch=None):
+    """Run ``func`` on a daemon thread, so an abandoned request doesn't hold up the exit.
+
+    Its output is held on the returned future rather than written to the issue's log group,
+    which may be flushed by the time an abandoned request finishes.
+    """
+    future = _Request()
+    stdout = grouped_stdout()
+
+    def run():
+        stdout.start()
+        if watch:
+            watch_send(watch)
+        try:
+            result, error = func(*args), None
+        except Exception as raised:
+            result, error = None, raised
+        future.output = stdout.take()
+        if error is None:
+            future.set_result(result)
+        else:
+            future.set_exception(error)
+
+    # A copy of the caller's context keeps tracing spans and the run report with the issue.
+    threading.Thread(target=contextvars.copy_context().run, args=(run,), daemon=True).start()
+    return future
+
+
+async def _watched(watch, call, *args):
+    watch_send(watch)
+    return await call(*args)
+
+
+class HedgedAIClient(_Hedge, AIClient):
+    """Sends a prompt to a second provider when the first one is slower than usual.
+
+    The secondary request starts once the primary hasn't answered within the hedge delay (the
+    primary's p95 latency, or ``delay`` seconds) of being sent, and the first answer wins. Time
+    the primary spends waiting for its rate limiter doesn't count. A blocking SDK
+    call can't be interrupted, so the losing request is abandoned on its thread: its output is
+    dropped, and ``settle`` waits for it at the end of the run so its token usage is reported.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._abandoned = set()
+        self._abandoned_lock = threading.Lock()
+
+    def warm_up(self):
+        self.primary.warm_up()
+        self.secondary.warm_up()
+
+    def generate_content(self, prompt):
+        return self._hedge("generate_content", prompt)
+
+    def generate_title(self, prompt, max_output_tokens=None):
+        return self._hedge("generate_title", prompt, max_output_tokens)
+
+    def _hedge(self, method, *args):
+        delay = self.hedge_delay()
+        watch = SendWatch()
+        primary = _in_background(getattr(self.primary, method), *args, watch=watch)
+        primary.add_done_callback(lambda future: future.exception() or self._record_latency(watch))
+        if self._answered(primary, watch, delay):
+            self.stats.record_request()
+            return self._resolve([primary], primary)
+
+        self._announce(delay)
+        secondary = _in_background(getattr(self.secondary, method), *args)
+        requests = [primary, secondary]
+        pending = set(requests)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    self._report_win(delay, watch.sent_at, future is secondary)
+                    return self._resolve(requests, future)
+        self.stats.record_request(hedged=True)
+        return self._resolve(requests, primary)
+
+    def _resolve(self, requests, answer):
+        """Replay the output of the finished requests and abandon the others."""
+        for future in requests:
+            if future.done():
+                sys.stdout.write(future.output)
+            else:
+                self._abandon(future)
+        return answer.result()
+
+    def _abandon(self, future):
+        with self._abandoned_lock:
+            self._abandoned.add(future)
+        future.add_done_callback(self._settled)
+
+    def _settled(self, future):
+        with self._abandoned_lock:
+            self._abandoned.discard(future)
+
+    def settle(self, timeout=ABANDONED_WAIT):
+        """Wait up to ``timeout`` seconds for the abandoned requests to finish.
+
+        Their clients record the token usage once they have a response, so this keeps the
+        requests that lost a hedge in the run report.
+        """
+        with self._abandoned_lock:
+            abandoned = list(self._abandoned)
+        if not abandoned:
+            return
+        print(f"Waiting for {len(abandoned)} abandoned model request(s) to finish")
+        _, running = wait(abandoned, timeout=timeout)
+        if running:
+            print(
+                f"Warning: {len(running)} abandoned model request(s) still running, "
+                "their token usage is missing from the run report"
+            )
+
+    @staticmethod
+    def _answered(primary, watch, delay):
+        """Wait until the primary answers or has been sent ``delay`` seconds ago."""
+        while True:
+            # The send time moves while the primary waits for its rate limiter.
+            remaining = watch.sent_at + delay - time.perf_counter()
+            if remaining <= 0:
+                return primary.done()
+            if wait([primary], timeout=remaining).done:
+                return True
+
+
+class AsyncHedgedAIClient(_Hedge, AsyncAIClient):
+    """Asyncio counterpart of ``HedgedAIClient``; the losing request is cancelled."""
+
+    async def warm_up(self):
+        await asyncio.gather(self.primary.warm_up(), self.secondary.warm_up())
+
+    async def aclose(self):
+        await asyncio.gather(self.primary.aclose(), self.secondary.aclose())
+
+    async def generate_content(self, prompt):
+        return await self._hedge("generate_content", prompt)
+
+    async def generate_title(self, prompt, max_output_tokens=None):
+        return await self._hedge("generate_title", prompt, max_output_tokens)
+
+    async def _hedge(self, method, *args):
+        delay = self.hedge_delay()
+        watch = SendWatch()
+        primary = asyncio.ensure_future(_watched(watch, getattr(self.primary, method), *args))
+        if await self._answered(primary, watch, delay):
+            if primary.exception() is None:
+                self._record_latency(watch)
+            self.stats.record_request()
+            return primary.result()
+
+        self._announce(delay)
+        secondary = asyncio.ensure_future(getattr(self.secondary, method)(*args))
+        pending = {primary, secondary}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        continue
+                    if task is primary:
+                        self._record_latency(watch)
+                    self._report_win(delay, watch.sent_at, task is secondary)
+                    return task.result()
+            self.stats.record_request(hedged=True)
+            return primary.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    @staticmethod
+    async def _answered(primary, watch, delay):
+        while True:
+            remaining = watch.sent_at + delay - time.perf_counter()
+            if remaining <= 0:
+                return primary.done()
+            done, _ = await asyncio.wait({primary}, timeout=remaining)
+            if done:
+                return True
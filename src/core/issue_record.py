@@ -0,0 +1,69 @@
+import datetime
+
+
+def parse_github_datetime(value):
+    """Parse a GitHub ISO 8601 timestamp into a naive UTC datetime, as PyGithub does."""
+    if not value:
+        return None
+    return datetime.datetime.strptime(value, "%Y-%m-%dT%H:%M:%SZ")
+
+
+class IssueRecord:
+    """Immutable issue as discovery hands it to ``IssueProcessor``.
+
+    Only the fields the action reads are kept, so a scan of tens of thousands of issues doesn't hold
+    their full API payloads. Writes are addressed by ``repo`` and ``number`` (REST) or ``node_id``
+    (GraphQL); ``repo`` is the repository's full name, shared by all records of a scan.
+    """
+
+    __slots__ = ("body", "created_at", "is_pr", "label_names", "node_id", "number", "repo", "title")
+
+    def __init__(
+        self, number, title, body, label_names, created_at, repo, node_id=None, is_pr=False
+    ):
+        # Attributes are set through ``object`` since ``__setattr__`` refuses them.
+        set_attribute = object.__setattr__
+        set_attribute(self, "number", number)
+        set_attribute(self, "title", title)
+        set_attribute(self, "body", body)
+        set_attribute(self, "label_names", tuple(label_names))
+        set_attribute(self, "created_at", created_at)
+        set_attribute(self, "repo", repo)
+        set_attribute(self, "node_id", node_id)
+        set_attribute(self, "is_pr", is_pr)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"IssueRecord is immutable, can't set {name!r}")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"IssueRecord is immutable, can't delete {name!r}")
+
+    @classmethod
+    def from_rest(cls, data, repo):
+        """Build a record from a REST issue (or issue search result) of the repository ``repo``."""
+        return cls(
+            number=data["number"],
+            title=data["title"],
+            body=data.get("body"),
+            label_names=[label["name"] for label in data.get("labels", [])],
+            created_at=parse_github_datetime(data.get("created_at")),
+            repo=repo,
+            node_id=data.get("node_id"),
+            is_pr=bool(data.get("pull_request")),
+        )
+
+    @classmethod
+    def from_graphql(cls, node, repo):
+        """Build a record from a ``RECENT_ISSUES_QUERY`` node of the repository ``repo``."""
+        return cls(
+            number=node["number"],
+            title=node["title"],
+            body=node.get("body"),
+            label_names=[label["name"] for label in node["labels"]["nodes"]],
+            created_at=parse_github_datetime(node.get("createdAt")),
+            repo=repo,
+            node_id=node.get("id"),
+        )
+
+    def __repr__(self):
+        return f"IssueRecord(number={self.number!r}, title={self.title!r})"
@@ -1,17 +1,413 @@
+import json
+import re
+import textwrap
+
+from .concurrency import gather_bounded, map_bounded
+from .run_report import timed
+from .tokens import estimate_tokens, truncate_body
+from .tracing import byte_size, traced
 from .verbose import verbose_print
 
+BATCH_INSTRUCTIONS = """
+
+The rules above apply to each of the following issues independently. The issues are given as a
+JSON array of objects with `issue_number`, `title` and `body` fields:
+
+```issues_json
+{issues_json}
+```
+
+Respond with ONLY a JSON array that contains one object per issue, in the same order, of the form
+{{"issue_number": <number>, "title": "<improved title, or the original title if it's already good>"}}.
+Do not include any other text, explanations or Markdown code fences.
+"""
+
+
+def _issue_attributes(processor, issue, *args, **kwargs):
+    return {
+        "issue.number": issue.number,
+        "issue.title_bytes": byte_size(issue.title),
+        "issue.body_bytes": byte_size(issue.body),
+    }
+
+
+def _batch_attributes(processor, issues, *args, **kwargs):
+    return {"batch.size": len(issues)}
+
 
 class IssueProcessor:
-    def __init__(self, ai_client, github_client, prompt, skip_label, required_labels=None):
+    def __init__(
+        self,
+        ai_client,
+        github_client,
+        prompt,
+        skip_label,
+        required_labels=None,
+        max_body_tokens=None,
+        count_tokens=estimate_tokens,
+        stream=False,
+        max_output_tokens=None,
+        verdicts=None,
+        write_back=None,
+    ):
         self.ai_client = ai_client
         self.github_client = github_client
         self.prompt = prompt
         self.skip_label = skip_label
         self.required_labels = required_labels
+        self.max_body_tokens = max_body_tokens
+        self.count_tokens = count_tokens
+        self.stream = stream
+        self.max_output_tokens = max_output_tokens
+        # Optional ``VerdictStore`` remembering issues whose title was already optimal.
+        self.verdicts = verdicts
+        # Optional ``WriteLane`` or ``GraphQLWriteBack`` that takes the writes over from the workers.
+        self.write_back = write_back
+        # Issue number -> (original tokens, sent tokens) of oversized bodies, until the issue's
+        # result is reported. The truncated text isn't kept; it's cheap to truncate again.
+        self.body_tokens = {}
 
+    @traced("process_issue", _issue_attributes)
     def process_issue(
         self, issue, auto_update=False, strip_characters="", quiet=False, description_min_skip=40
     ):
+        skipped = self._check_skip(issue, description_min_skip)
+        if skipped:
+            return skipped
+
+        issue_number = issue.number
+        print(f'Processing issue #{issue_number}: "{issue.title}"')
+
+        try:
+            with timed("prompt", issue_number):
+                body = self.prepare_body(issue)
+            if self.stream:
+                with timed("prompt", issue_number):
+                    prompt = self.render_prompt(issue.title, body)
+                with timed("llm", issue_number):
+                    improved_title, stats = self.ai_client.generate_title(
+                        prompt, self.max_output_tokens
+                    )
+            else:
+                improved_title = self.generate_improved_title(issue.title, body, issue_number)
+                stats = None
+            result = self._apply_title(issue, improved_title, auto_update, strip_characters, quiet)
+            return self._add_generation_stats(result, stats)
+
+        except Exception as error:
+            print(f"Warning: Error processing issue #{issue_number}: {error!s}")
+            return self._add_body_tokens({"issue_number": issue_number, "error": str(error)})
+
+    @traced("process_issue", _issue_attributes)
+    async def process_issue_async(
+        self, issue, auto_update=False, strip_characters="", quiet=False, description_min_skip=40
+    ):
+        """Same as ``process_issue`` for an ``AsyncAIClient`` and ``AsyncGitHubClient``."""
+        skipped = self._check_skip(issue, description_min_skip)
+        if skipped:
+            return skipped
+
+        issue_number = issue.number
+        print(f'Processing issue #{issue_number}: "{issue.title}"')
+
+        try:
+            with timed("prompt", issue_number):
+                prompt = self.render_prompt(issue.title, self.prepare_body(issue))
+            with timed("llm", issue_number):
+                if self.stream:
+                    improved_title, stats = await self.ai_client.generate_title(
+                        prompt, self.max_output_tokens
+                    )
+                else:
+                    improved_title = await self.ai_client.generate_content(prompt)
+                    stats = None
+            result = await self._apply_title_async(
+                issue, improved_title, auto_update, strip_characters, quiet
+            )
+            return self._add_generation_stats(result, stats)
+
+        except Exception as error:
+            print(f"Warning: Error processing issue #{issue_number}: {error!s}")
+            return self._add_body_tokens({"issue_number": issue_number, "error": str(error)})
+
+    def process_issues_batched(
+        self,
+        issues,
+        batch_size,
+        max_batch_tokens,
+        max_workers=1,
+        auto_update=False,
+        strip_characters="",
+        quiet=False,
+        description_min_skip=40,
+    ):
+        """Process issues with one model request per batch instead of one per issue.
+
+        Issues that pass the skip checks are packed into batches of at most ``batch_size`` issues
+        and roughly ``max_batch_tokens`` prompt tokens. Results are returned in input order.
+        """
+        results, batches = self._prepare_batches(
+            issues, batch_size, max_batch_tokens, description_min_skip
+        )
+
+        def run_batch(batch):
+            return self.process_batch(batch, auto_update, strip_characters, quiet)
+
+        batch_results = map_bounded(
+            run_batch, batches, max_workers=max_workers, on_error=self._batch_error
+        )
+        return self._collect_batch_results(issues, results, batch_results)
+
+    async def process_issues_batched_async(
+        self,
+        issues,
+        batch_size,
+        max_batch_tokens,
+        max_concurrency=1,
+        auto_update=False,
+        strip_characters="",
+        quiet=False,
+        description_min_skip=40,
+    ):
+        results, batches = self._prepare_batches(
+            issues, batch_size, max_batch_tokens, description_min_skip
+        )
+
+        async def run_batch(batch):
+            return await self.process_batch_async(batch, auto_update, strip_characters, quiet)
+
+        batch_results = await gather_bounded(
+            run_batch, batches, max_concurrency=max_concurrency, on_error=self._batch_error
+        )
+        return self._collect_batch_results(issues, results, batch_results)
+
+    @traced("process_batch", _batch_attributes)
+    def process_batch(self, issues, auto_update=False, strip_characters="", quiet=False):
+        """Generate titles for already-checked issues with a single request.
+
+        Issues the response has no usable title for fall back to a request of their own.
+        """
+        if len(issues) == 1:
+            return [self.process_issue(issues[0], auto_update, strip_characters, quiet, 0)]
+
+        print(f"Processing batch of {len(issues)} issues: {self._batch_numbers(issues)}")
+        try:
+            titles = self.generate_batch_titles(issues)
+        except Exception as error:
+            print(f"Warning: Batch request failed, falling back to single requests: {error!s}")
+            titles = {}
+
+        results = []
+        for issue in issues:
+            if issue.number not in titles:
+                results.append(self.process_issue(issue, auto_update, strip_characters, quiet, 0))
+                continue
+            try:
+                results.append(
+                    self._apply_title(
+                        issue, titles[issue.number], auto_update, strip_characters, quiet
+                    )
+                )
+            except Exception as error:
+                print(f"Warning: Error processing issue #{issue.number}: {error!s}")
+                results.append(
+                    self._add_body_tokens({"issue_number": issue.number, "error": str(error)})
+                )
+        return results
+
+    @traced("process_batch", _batch_attributes)
+    async def process_batch_async(
+        self, issues, auto_update=False, strip_characters="", quiet=False
+    ):
+        if len(issues) == 1:
+            return [
+                await self.process_issue_async(issues[0], auto_update, strip_characters, quiet, 0)
+            ]
+
+        print(f"Processing batch of {len(issues)} issues: {self._batch_numbers(issues)}")
+        try:
+            with timed("prompt"):
+                prompt = self.render_batch_prompt(issues)
+            with timed("llm"):
+                response = await self.ai_client.generate_content(prompt)
+            titles = self.parse_batch_response(response, issues)
+        except Exception as error:
+            print(f"Warning: Batch request failed, falling back to single requests: {error!s}")
+            titles = {}
+
+        results = []
+        for issue in issues:
+            if issue.number not in titles:
+                results.append(
+                    await self.process_issue_async(issue, auto_update, strip_characters, quiet, 0)
+                )
+                continue
+            try:
+                results.append(
+                    await self._apply_title_async(
+                        issue, titles[issue.number], auto_update, strip_characters, quiet
+                    )
+                )
+            except Exception as error:
+                print(f"Warning: Error processing issue #{issue.number}: {error!s}")
+                results.append(
+                    self._add_body_tokens({"issue_number": issue.number, "error": str(error)})
+                )
+        return results
+
+    def _prepare_batches(self, issues, batch_size, max_batch_tokens, description_min_skip):
+        results = {}
+        pending = []
+        for issue in issues:
+            skipped = self._check_skip(issue, description_min_skip)
+            if skipped:
+                results[issue.number] = skipped
+            else:
+                pending.append(issue)
+        return results, self.make_batches(pending, batch_size, max_batch_tokens)
+
+    @staticmethod
+    def _batch_error(batch, error):
+        print(f"Error processing batch {IssueProcessor._batch_numbers(batch)}: {error!s}")
+        return [{"issue_number": issue.number, "error": str(error)} for issue in batch]
+
+    @staticmethod
+    def _collect_batch_results(issues, results, batch_results):
+        for batch in batch_results:
+            for result in batch:
+                results[result["issue_number"]] = result
+        return [results[issue.number] for issue in issues]
+
+    @staticmethod
+    def _batch_numbers(issues):
+        return ", ".join(f"#{issue.number}" for issue in issues)
+
+    def make_batches(self, issues, batch_size, max_batch_tokens):
+        """Greedily pack issues into batches limited by count and estimated prompt tokens.
+
+        An issue that doesn't fit the token budget on its own ends up in a batch by itself.
+        """
+        batches = []
+        batch = []
+        batch_tokens = self.count_tokens(self.render_batch_prompt([]))
+        base_tokens = batch_tokens
+        for issue in issues:
+            # Counted on the text the prompt will contain, separator included, plus one token
+            # for rounding and for tokens spanning the joins between issues.
+            issue_tokens = self.count_tokens(self._batch_item_json(issue) + ",\n") + 1
+            if batch and (
+                len(batch) >= batch_size or batch_tokens + issue_tokens > max_batch_tokens
+            ):
+                batches.append(batch)
+                batch = []
+                batch_tokens = base_tokens
+            batch.append(issue)
+            batch_tokens += issue_tokens
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def _batch_item_json(self, issue):
+        """Serialize one issue as an element of the batch prompt's indented JSON array."""
+        item = {
+            "issue_number": issue.number,
+            "title": issue.title,
+            "body": self.prepare_body(issue),
+        }
+        return textwrap.indent(json.dumps(item, ensure_ascii=False, indent=2), "  ")
+
+    def prepare_body(self, issue):
+        """Return the issue body to send to the model, truncated to ``max_body_tokens``."""
+        body = issue.body or ""
+        if not self.max_body_tokens:
+            return body
+
+        text, original_tokens, sent_tokens = truncate_body(
+            body, self.max_body_tokens, self.count_tokens
+        )
+        if text != body and issue.number not in self.body_tokens:
+            print(
+                f"Issue #{issue.number} body truncated from {original_tokens} "
+                f"to {sent_tokens} tokens"
+            )
+            self.body_tokens[issue.number] = (original_tokens, sent_tokens)
+        return text
+
+    def render_batch_prompt(self, issues):
+        instructions = self.prompt.format(
+            original_title="(see the `title` field of each issue below)",
+            issue_body="(see the `body` field of each issue below)",
+        )
+        # The same text as ``json.dumps(items, indent=2)``, built from the elements
+        # ``make_batches`` counted.
+        items = [self._batch_item_json(issue) for issue in issues]
+        issues_json = "[\n" + ",\n".join(items) + "\n]" if items else "[]"
+        return instructions + BATCH_INSTRUCTIONS.format(issues_json=issues_json)
+
+    def generate_batch_titles(self, issues):
+        with timed("prompt"):
+            prompt = self.render_batch_prompt(issues)
+        with timed("llm"):
+            response = self.ai_client.generate_content(prompt)
+        return self.parse_batch_response(response, issues)
+
+    @staticmethod
+    def parse_batch_response(response, issues):
+        """Map issue numbers to titles from a batch response, ignoring anything unusable."""
+        verbose_print("Model Response: ", response)
+        match = re.search(r"\[.*\]", response or "", re.DOTALL)
+        if not match:
+            print("Warning: Batch response doesn't contain a JSON array")
+            return {}
+        try:
+            items = json.loads(match.group(0))
+        except ValueError as error:
+            print(f"Warning: Batch response is not valid JSON: {error!s}")
+            return {}
+
+        numbers = {issue.number for issue in issues}
+        titles = {}
+        for item in items:
+            if not isinstance(item, dict) or not isinstance(item.get("title"), str):
+                continue
+            try:
+                number = int(item.get("issue_number"))
+            except (TypeError, ValueError):
+                continue
+            if number in numbers:
+                titles[number] = item["title"]
+        return titles
+
+    def _apply_title(self, issue, improved_title, auto_update, strip_characters, quiet):
+        result, writes = self._plan_writes(
+            issue, improved_title, auto_update, strip_characters, quiet
+        )
+        if self.write_back:
+            self.write_back.add(issue, writes, result)
+            return result
+        for method, args, message in writes:
+            with timed(f"write:{method}", issue.number):
+                getattr(self.github_client, method)(issue, *args)
+            if message:
+                print(message)
+        return result
+
+    async def _apply_title_async(self, issue, improved_title, auto_update, strip_characters, quiet):
+        result, writes = self._plan_writes(
+            issue, improved_title, auto_update, strip_characters, quiet
+        )
+        if self.write_back:
+            self.write_back.add(issue, writes, result)
+            return result
+        for method, args, message in writes:
+            with timed(f"write:{method}", issue.number):
+                await getattr(self.github_client, method)(issue, *args)
+            if message:
+                print(message)
+        return result
+
+    def _check_skip(self, issue, description_min_skip):
+        """Return a skip result if the issue shouldn't be sent to the model, otherwise None."""
         issue_number = issue.number
         original_title = issue.title
         issue_body = issue.body or ""
@@ -27,7 +423,7 @@ class IssueProcessor:
                 "reason": "Issue body too short",
             }
 
-        issue_labels = [label.name.lower() for label in issue.labels]
+        issue_labels = [name.lower() for name in issue.label_names]
         if self.skip_label in issue_labels:
             print(f"Skipping issue #{issue_number}: Already has '{self.skip_label}' label")
             return {
@@ -54,58 +450,113 @@ class IssueProcessor:
                     "reason": f"No matching labels found. Current Issue Labels: '{issue_labels}'; Required Labels: '{self.required_labels}'",
                 }
 
-        print(f'Processing issue #{issue_number}: "{original_title}"')
+        if self.verdicts and self.verdicts.is_optimal(issue):
+            print(f"Skipping issue #{issue_number}: Title already optimal and issue unchanged")
+            return {
+                "issue_number": issue_number,
+                "original_title": original_title,
+                "improved_title": None,
+                "updated": False,
+                "skipped": True,
+                "reason": "Title already optimal",
+            }
 
-        try:
-            improved_title = self.generate_improved_title(original_title, issue_body)
-            verbose_print("Model Response: ", improved_title)
-            improved_title = improved_title.strip().strip(strip_characters)
-            if improved_title == original_title or not improved_title:
-                print(f"Title already optimal for issue #{issue_number}")
-                return {
-                    "issue_number": issue_number,
-                    "original_title": original_title,
-                    "improved_title": None,
-                    "updated": False,
-                }
+        return None
 
-            if auto_update:
-                self.github_client.update_issue_title(issue, improved_title)
-                if not quiet:
-                    comment = (
-                        f"🤖 I've improved[^1] the title of this issue "
-                        f"for better clarity and discoverability.\n\n"
-                        f"**Previous title:** {original_title}\n"
-                        f"**New title:** {improved_title}\n\n"
-                        "[^1]: Improved by [issue-title-ai](https://github.com/horw/issue-title-ai)"
-                    )
-                    self.github_client.add_issue_comment(issue, comment)
-                    print(f'Updated issue #{issue_number} title to: "{improved_title}"')
-            else:
-                comment = (
-                    f"🤖 I've analyzed[^1] this issue title "
-                    f"and have a suggestion for improvement:\n\n"
-                    f"**Current title:** {original_title}\n"
-                    f"**Suggested title:** {improved_title}\n\n"
-                    "[^1]: Suggested by [issue-title-ai](https://github.com/horw/issue-title-ai)"
-                )
-                self.github_client.add_issue_comment(issue, comment)
-                print(f"Added title suggestion to issue #{issue_number}")
+    def _plan_writes(self, issue, improved_title, auto_update, strip_characters, quiet):
+        """Turn the model response into a result and the GitHub writes needed to apply it.
 
-            self.github_client.add_issue_label(issue, self.skip_label)
-            print(f"Added '{self.skip_label}' label to issue #{issue_number}")
-            return {
+        Each write is a ``(github_client method name, extra args, log message)`` tuple, so the
+        sync and async paths execute the same plan.
+        """
+        issue_number = issue.number
+        original_title = issue.title
+
+        verbose_print("Model Response: ", improved_title)
+        improved_title = improved_title.strip().strip(strip_characters)
+        if improved_title == original_title or not improved_title:
+            print(f"Title already optimal for issue #{issue_number}")
+            if self.verdicts:
+                self.verdicts.record(issue)
+            result = {
                 "issue_number": issue_number,
                 "original_title": original_title,
-                "improved_title": improved_title,
-                "updated": auto_update,
+                "improved_title": None,
+                "updated": False,
             }
+            return self._add_body_tokens(result), []
 
-        except Exception as error:
-            print(f"Warning: Error processing issue #{issue_number}: {error!s}")
-            return {"issue_number": issue_number, "error": str(error)}
+        writes = []
+        if auto_update:
+            writes.append(("update_issue_title", (improved_title,), None))
+            if not quiet:
+                comment = (
+                    f"🤖 I've improved[^1] the title of this issue "
+                    f"for better clarity and discoverability.\n\n"
+                    f"**Previous title:** {original_title}\n"
+                    f"**New title:** {improved_title}\n\n"
+                    "[^1]: Improved by [issue-title-ai](https://github.com/horw/issue-title-ai)"
+                )
+                writes.append(
+                    (
+                        "add_issue_comment",
+                        (comment,),
+                        f'Updated issue #{issue_number} title to: "{improved_title}"',
+                    )
+                )
+        else:
+            comment = (
+                f"🤖 I've analyzed[^1] this issue title "
+                f"and have a suggestion for improvement:\n\n"
+                f"**Current title:** {original_title}\n"
+                f"**Suggested title:** {improved_title}\n\n"
+                "[^1]: Suggested by [issue-title-ai](https://github.com/horw/issue-title-ai)"
+            )
+            writes.append(
+                (
+                    "add_issue_comment",
+                    (comment,),
+                    f"Added title suggestion to issue #{issue_number}",
+                )
+            )
 
-    def generate_improved_title(self, original_title, issue_body):
-        return self.ai_client.generate_content(
-            self.prompt.format(original_title=original_title, issue_body=issue_body)
+        writes.append(
+            (
+                "add_issue_label",
+                (self.skip_label,),
+                f"Added '{self.skip_label}' label to issue #{issue_number}",
+            )
         )
+        result = {
+            "issue_number": issue_number,
+            "original_title": original_title,
+            "improved_title": improved_title,
+            "updated": auto_update,
+        }
+        return self._add_body_tokens(result), writes
+
+    @staticmethod
+    def _add_generation_stats(result, stats):
+        if stats:
+            print(
+                f"Issue #{result['issue_number']}: title after {stats['time_to_title']:.2f}s, "
+                f"~{stats['output_tokens']} output tokens, "
+                f"up to {stats['tokens_saved']} saved by stopping early"
+            )
+            result["generation"] = stats
+        return result
+
+    def _add_body_tokens(self, result):
+        tokens = self.body_tokens.pop(result["issue_number"], None)
+        if tokens:
+            result["body_tokens"] = {"original": tokens[0], "sent": tokens[1]}
+        return result
+
+    def render_prompt(self, original_title, issue_body):
+        return self.prompt.format(original_title=original_title, issue_body=issue_body)
+
+    def generate_improved_title(self, original_title, issue_body, issue_number=None):
+        with timed("prompt", issue_number):
+            prompt = self.render_prompt(original_title, issue_body)
+        with timed("llm", issue_number):
+            return self.ai_client.generate_content(prompt)
@@ -1,102 +1,589 @@
+import importlib
+import importlib.util
+import threading
+import time
 from abc import ABC, abstractmethod
+from importlib.metadata import entry_points
 
-import google.generativeai as genai
-import openai
-
+from .run_report import record_usage
+from .tokens import estimate_tokens
+from .tracing import byte_size, set_span_attributes, traced
 from .verbose import verbose_print
 
+# Provider SDKs (google.generativeai pulls in gRPC and protobuf) are imported by the client
+# constructors, so a run only pays for the provider it uses.
+
+ENTRY_POINT_GROUP = "issue_title_ai.providers"
+
+
+def llm_attributes(ai_client, prompt, *args, **kwargs):
+    return {
+        "llm.provider": provider_name(ai_client),
+        "llm.model": getattr(ai_client, "model_name", None),
+        "llm.prompt_bytes": byte_size(prompt),
+    }
+
 
 class AIClient(ABC):
     @abstractmethod
     def generate_content(self, prompt):
         pass
 
+    def warm_up(self):
+        """Open the connection to the provider ahead of the first request, if it supports it."""
+        return
+
+    def stream_content(self, prompt, max_output_tokens=None):
+        """Yield the response in chunks; clients without streaming support yield it whole."""
+        yield self.generate_content(prompt)
+
+    @traced("llm.generate_title", llm_attributes)
+    def generate_title(self, prompt, max_output_tokens=None):
+        """Stream a response and stop reading it once its first line is complete.
+
+        Returns ``(title, stats)``, see ``title_stats``.
+        """
+        started = time.perf_counter()
+        chunks = self.stream_content(prompt, max_output_tokens)
+        try:
+            title, received, stopped_early = read_title_line(chunks)
+        finally:
+            chunks.close()
+        verbose_print("Model Response (streamed): ", received)
+        stats = title_stats(started, received, stopped_early, max_output_tokens)
+        record_streamed_usage(self, prompt, stats)
+        return title, stats
+
+
+class AsyncAIClient(ABC):
+    @abstractmethod
+    async def generate_content(self, prompt):
+        pass
+
+    async def warm_up(self):
+        return
+
+    async def aclose(self):
+        """Close the client's connections; called once at the end of an async run."""
+        return
+
+    async def stream_content(self, prompt, max_output_tokens=None):
+        yield await self.generate_content(prompt)
+
+    @traced("llm.generate_title", llm_attributes)
+    async def generate_title(self, prompt, max_output_tokens=None):
+        started = time.perf_counter()
+        chunks = self.stream_content(prompt, max_output_tokens)
+        try:
+            title, received, stopped_early = await async_read_title_line(chunks)
+        finally:
+            await chunks.aclose()
+        verbose_print("Model Response (streamed): ", received)
+        stats = title_stats(started, received, stopped_early, max_output_tokens)
+        record_streamed_usage(self, prompt, stats)
+        return title, stats
+
+
+def _title_line(received):
+    """Return the first non-empty line of ``received`` if it is complete, otherwise None."""
+    text = received.lstrip()
+    if "\n" not in text:
+        return None
+    return text.split("\n", 1)[0].strip()
+
+
+def read_title_line(chunks):
+    """Read ``chunks`` up to the end of the first non-empty line.
+
+    Returns ``(line, received_text, stopped_early)``; ``stopped_early`` is False when the
+    response ended before a line break.
+    """
+    received = ""
+    for chunk in chunks:
+        received += chunk
+        line = _title_line(received)
+        if line is not None:
+            return line, received, True
+    return received.strip(), received, False
+
+
+async def async_read_title_line(chunks):
+    received = ""
+    async for chunk in chunks:
+        received += chunk
+        line = _title_line(received)
+        if line is not None:
+            return line, received, True
+    return received.strip(), received, False
+
+
+def title_stats(started, received, stopped_early, max_output_tokens):
+    """Time-to-title and (estimated) output tokens of a streamed title.
+
+    ``tokens_saved`` is an upper bound: what the model could still have generated under
+    ``max_output_tokens`` when the stream was closed.
+    """
+    output_tokens = estimate_tokens(received)
+    tokens_saved = 0
+    if stopped_early and max_output_tokens:
+        tokens_saved = max(max_output_tokens - output_tokens, 0)
+    return {
+        "time_to_title": round(time.perf_counter() - started, 3),
+        "output_tokens": output_tokens,
+        "tokens_saved": tokens_saved,
+    }
+
+
+def provider_name(ai_client):
+    return getattr(ai_client, "display_name", None) or type(ai_client).__name__
+
+
+def _count_usage(ai_client, prompt_tokens, completion_tokens, estimated=False):
+    record_usage(provider_name(ai_client), prompt_tokens, completion_tokens, estimated)
+    set_span_attributes(
+        {
+            "llm.prompt_tokens": prompt_tokens,
+            "llm.completion_tokens": completion_tokens,
+            "llm.tokens_estimated": estimated,
+        }
+    )
+
+
+def record_streamed_usage(ai_client, prompt, stats):
+    # Streams closed after the title don't report usage, so both counts are estimates.
+    _count_usage(ai_client, estimate_tokens(prompt), stats["output_tokens"], estimated=True)
+
+
+def _usage_count(usage, *names):
+    for name in names:
+        value = getattr(usage, name, None)
+        if isinstance(value, int):
+            return value
+    return None
+
+
+def record_response_usage(ai_client, prompt, usage, text):
+    """Count a model request with the usage the API reported, or an estimate without one."""
+    # OpenAI-compatible APIs report ``usage``, Gemini ``usage_metadata`` (from SDK 0.5 on).
+    prompt_tokens = _usage_count(usage, "prompt_tokens", "prompt_token_count")
+    completion_tokens = _usage_count(usage, "completion_tokens", "candidates_token_count")
+    set_span_attributes({"llm.response_bytes": byte_size(text)})
+    if prompt_tokens is None or completion_tokens is None:
+        _count_usage(ai_client, estimate_tokens(prompt), estimate_tokens(text or ""), True)
+    else:
+        _count_usage(ai_client, prompt_tokens, completion_tokens)
+
+
+# Connections per worker in the pools of the OpenAI-compatible providers: a worker has at most
+# one model request in flight, plus the hedged one sent next to it.
+CONNECTIONS_PER_WORKER = 2
+HTTP_KEEPALIVE_EXPIRY = 60
+
+_pool_workers = 1
+_shared_http_client = None
+_shared_http_client_lock = threading.Lock()
+
+
+def set_http_pool_size(max_concurrency):
+    """Size the connection pools for ``max_concurrency`` workers; call before creating clients."""
+    global _pool_workers
+    _pool_workers = max(max_concurrency, 1)
+
+
+def _http_client_options():
+    import httpx
+
+    connections = CONNECTIONS_PER_WORKER * _pool_workers
+    return {
+        "http2": importlib.util.find_spec("h2") is not None,
+        "limits": httpx.Limits(
+            max_connections=connections,
+            max_keepalive_connections=connections,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+    }
+
+
+def shared_http_client():
+    """Return the process-wide pooled HTTP client used by the OpenAI-compatible providers.
+
+    It keeps connections alive between requests, sized by ``set_http_pool_size``, and uses
+    HTTP/2 when the ``h2`` package is installed, as it is in the action image.
+    """
+    global _shared_http_client
+    with _shared_http_client_lock:
+        if _shared_http_client is None:
+            import openai
+
+            _shared_http_client = openai.DefaultHttpxClient(**_http_client_options())
+        return _shared_http_client
+
+
+def _openai_options(api_key, base_url):
+    # Retries are handled by `llm_rate_limit.RateLimitedAIClient` under a shared budget.
+    options = {"api_key": api_key, "max_retries": 0}
+    if base_url:
+        options["base_url"] = base_url
+    return options
+
+
+def _max_tokens(max_output_tokens):
+    return {"max_tokens": max_output_tokens} if max_output_tokens else {}
+
+
+def _gemini_config(max_output_tokens):
+    return {"max_output_tokens": max_output_tokens} if max_output_tokens else None
+
+
+def _chat_messages(prompt):
+    return [
+        {
+            "role": "system",
+            "content": "You are an expert at improving GitHub issue titles.",
+        },
+        {"role": "user", "content": prompt},
+    ]
+
 
 class GeminiAIClient(AIClient):
+    display_name = "Gemini"
+
     def __init__(self, api_key, model_name):
         self.api_key = api_key
         if not self.api_key:
             raise ValueError("Gemini API key not provided")
 
+        import google.generativeai as genai
+
         genai.configure(api_key=self.api_key)
         self.model = genai.GenerativeModel(model_name)
+        self.model_name = model_name
 
+    @traced("llm.generate_content", llm_attributes)
     def generate_content(self, prompt):
         try:
             verbose_print("Model Input: ", prompt)
             response = self.model.generate_content(prompt)
+            usage = getattr(response, "usage_metadata", None)
+            verbose_print("Model Usage: ", usage)
+            record_response_usage(self, prompt, usage, response.text)
             return response.text.strip()
         except Exception as e:
             print(f"Error generating content with Gemini: {e!s}")
             raise
 
+    def stream_content(self, prompt, max_output_tokens=None):
+        try:
+            verbose_print("Model Input: ", prompt)
+            response = self.model.generate_content(
+                prompt, stream=True, generation_config=_gemini_config(max_output_tokens)
+            )
+            for chunk in response:
+                yield chunk.text
+        except GeneratorExit:
+            raise
+        except Exception as e:
+            print(f"Error generating content with Gemini: {e!s}")
+            raise
+
+
+class OpenAICompatibleClient(AIClient):
+    """Chat completions client for the OpenAI API and providers that mirror it.
+
+    Every instance sends its requests through one shared, pooled HTTP client (see
+    ``shared_http_client``), so all OpenAI-compatible providers of a run reuse connections.
+    """
+
+    display_name = "OpenAI"
+    base_url = None
 
-class OpenAIClient(AIClient):
     def __init__(self, api_key, model_name):
         self.api_key = api_key
         if not self.api_key:
-            raise ValueError("OpenAI API key not provided")
+            raise ValueError(f"{self.display_name} API key not provided")
+
+        import openai
 
-        self.client = openai.OpenAI(api_key=self.api_key)
+        self.http_client = shared_http_client()
+        self.client = openai.OpenAI(
+            **_openai_options(self.api_key, self.base_url), http_client=self.http_client
+        )
         self.model_name = model_name
 
+    def warm_up(self):
+        try:
+            self.http_client.head(str(self.client.base_url))
+            verbose_print(f"Connected to {self.display_name} API")
+        except Exception as e:
+            verbose_print(f"Pre-warming the {self.display_name} connection failed: {e!s}")
+
+    @traced("llm.generate_content", llm_attributes)
     def generate_content(self, prompt):
         try:
-            messages = [
-                {
-                    "role": "system",
-                    "content": "You are an expert at improving GitHub issue titles.",
-                },
-                {"role": "user", "content": prompt},
-            ]
+            messages = _chat_messages(prompt)
             verbose_print("Model Input: ", self.model_name, messages)
             response = self.client.chat.completions.create(
                 model=self.model_name,
                 messages=messages,
             )
             verbose_print("Model Usage: ", response.usage)
-            return response.choices[0].message.content.strip()
+            content = response.choices[0].message.content
+            record_response_usage(self, prompt, response.usage, content)
+            return content.strip()
+        except Exception as e:
+            print(f"Error generating content with {self.display_name}: {e!s}")
+            raise
+
+    def stream_content(self, prompt, max_output_tokens=None):
+        try:
+            messages = _chat_messages(prompt)
+            verbose_print("Model Input: ", self.model_name, messages)
+            # Closing the stream early closes the HTTP response, so the rest isn't generated.
+            with self.client.chat.completions.create(
+                model=self.model_name,
+                messages=messages,
+                stream=True,
+                **_max_tokens(max_output_tokens),
+            ) as stream:
+                for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+        except GeneratorExit:
+            raise
         except Exception as e:
-            print(f"Error generating content with OpenAI: {e!s}")
+            print(f"Error generating content with {self.display_name}: {e!s}")
             raise
 
 
-class DeepseekAIClient(AIClient):
+class OpenAIClient(OpenAICompatibleClient):
+    pass
+
+
+class DeepseekAIClient(OpenAICompatibleClient):
+    display_name = "Deepseek"
+    base_url = "https://api.deepseek.com/v1"
+
+
+class AsyncGeminiAIClient(AsyncAIClient):
+    display_name = "Gemini"
+
     def __init__(self, api_key, model_name):
         self.api_key = api_key
         if not self.api_key:
-            raise ValueError("Deepseek API key not provided")
+            raise ValueError("Gemini API key not provided")
+
+        import google.generativeai as genai
 
-        self.client = openai.OpenAI(api_key=self.api_key, base_url="https://api.deepseek.com/v1")
+        genai.configure(api_key=self.api_key)
+        self.model = genai.GenerativeModel(model_name)
         self.model_name = model_name
 
-    def generate_content(self, prompt):
+    @traced("llm.generate_content", llm_attributes)
+    async def generate_content(self, prompt):
         try:
-            messages = [
-                {
-                    "role": "system",
-                    "content": "You are an expert at improving GitHub issue titles.",
-                },
-                {"role": "user", "content": prompt},
-            ]
+            verbose_print("Model Input: ", prompt)
+            response = await self.model.generate_content_async(prompt)
+            usage = getattr(response, "usage_metadata", None)
+            verbose_print("Model Usage: ", usage)
+            record_response_usage(self, prompt, usage, response.text)
+            return response.text.strip()
+        except Exception as e:
+            print(f"Error generating content with Gemini: {e!s}")
+            raise
+
+    async def stream_content(self, prompt, max_output_tokens=None):
+        try:
+            verbose_print("Model Input: ", prompt)
+            response = await self.model.generate_content_async(
+                prompt, stream=True, generation_config=_gemini_config(max_output_tokens)
+            )
+            async for chunk in response:
+                yield chunk.text
+        except GeneratorExit:
+            raise
+        except Exception as e:
+            print(f"Error generating content with Gemini: {e!s}")
+            raise
+
+
+class AsyncOpenAICompatibleClient(AsyncAIClient):
+    display_name = "OpenAI"
+    base_url = None
+
+    def __init__(self, api_key, model_name):
+        self.api_key = api_key
+        if not self.api_key:
+            raise ValueError(f"{self.display_name} API key not provided")
+
+        import openai
+
+        # An async HTTP client is bound to the event loop it is first used on, so unlike the
+        # sync one it is pooled per client rather than per process.
+        self.http_client = openai.DefaultAsyncHttpxClient(**_http_client_options())
+        self.client = openai.AsyncOpenAI(
+            **_openai_options(self.api_key, self.base_url), http_client=self.http_client
+        )
+        self.model_name = model_name
+
+    async def warm_up(self):
+        try:
+            await self.http_client.head(str(self.client.base_url))
+            verbose_print(f"Connected to {self.display_name} API")
+        except Exception as e:
+            verbose_print(f"Pre-warming the {self.display_name} connection failed: {e!s}")
+
+    async def aclose(self):
+        await self.http_client.aclose()
+
+    @traced("llm.generate_content", llm_attributes)
+    async def generate_content(self, prompt):
+        try:
+            messages = _chat_messages(prompt)
             verbose_print("Model Input: ", self.model_name, messages)
-            response = self.client.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 model=self.model_name,
                 messages=messages,
             )
-            verbose_print("Model Usage", response.usage)
-            return response.choices[0].message.content.strip()
+            verbose_print("Model Usage: ", response.usage)
+            content = response.choices[0].message.content
+            record_response_usage(self, prompt, response.usage, content)
+            return content.strip()
         except Exception as e:
-            print(f"Error generating content with Deepseek: {e!s}")
+            print(f"Error generating content with {self.display_name}: {e!s}")
             raise
 
+    async def stream_content(self, prompt, max_output_tokens=None):
+        try:
+            messages = _chat_messages(prompt)
+            verbose_print("Model Input: ", self.model_name, messages)
+            stream = await self.client.chat.completions.create(
+                model=self.model_name,
+                messages=messages,
+                stream=True,
+                **_max_tokens(max_output_tokens),
+            )
+            async with stream:
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+        except GeneratorExit:
+            raise
+        except Exception as e:
+            print(f"Error generating content with {self.display_name}: {e!s}")
+            raise
 
-def create_ai_client(provider, api_key, model_name=None):
-    if provider.lower() == "gemini":
-        return GeminiAIClient(api_key, model_name or "gemini-2.0-flash")
-    elif provider.lower() == "openai":
-        return OpenAIClient(api_key, model_name or "gpt-4")
-    elif provider.lower() == "deepseek":
-        return DeepseekAIClient(api_key, model_name or "deepseek-chat")
-    else:
-        raise ValueError(f"Unsupported AI provider: {provider}")
+
+class AsyncOpenAIClient(AsyncOpenAICompatibleClient):
+    pass
+
+
+class AsyncDeepseekAIClient(AsyncOpenAICompatibleClient):
+    display_name = "Deepseek"
+    base_url = "https://api.deepseek.com/v1"
+
+
+class ProviderSpec:
+    """How to build the clients of one AI provider.
+
+    ``client`` and ``async_client`` are classes or lazy ``"module:attribute"`` references, so
+    registering a provider doesn't import its SDK. Third-party packages can expose a
+    ``ProviderSpec`` under the ``issue_title_ai.providers`` entry point group; the entry point
+    name is the provider name.
+    """
+
+    def __init__(self, client, async_client=None, default_model=None):
+        self.client = client
+        self.async_client = async_client
+        self.default_model = default_model
+
+
+_providers = {}
+_entry_points_loaded = False
+
+
+def register_provider(name, spec):
+    _providers[name.lower()] = spec
+
+
+def _load_entry_point_providers():
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+    _entry_points_loaded = True
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        if entry_point.name.lower() in _providers:
+            continue
+        try:
+            register_provider(entry_point.name, entry_point.load())
+        except Exception as e:
+            print(f"Error loading AI provider plugin {entry_point.name}: {e!s}")
+
+
+def get_provider(name):
+    name = name.lower()
+    if name not in _providers:
+        # Entry points are only scanned for providers that aren't built in.
+        _load_entry_point_providers()
+    if name not in _providers:
+        raise ValueError(f"Unsupported AI provider: {name}")
+    return _providers[name]
+
+
+def _resolve(target):
+    if not isinstance(target, str):
+        return target
+    module_name, _, attribute = target.partition(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+register_provider(
+    "gemini",
+    ProviderSpec(
+        f"{__name__}:GeminiAIClient", f"{__name__}:AsyncGeminiAIClient", "gemini-2.0-flash"
+    ),
+)
+register_provider(
+    "openai",
+    ProviderSpec(f"{__name__}:OpenAIClient", f"{__name__}:AsyncOpenAIClient", "gpt-4"),
+)
+register_provider(
+    "deepseek",
+    ProviderSpec(
+        f"{__name__}:DeepseekAIClient", f"{__name__}:AsyncDeepseekAIClient", "deepseek-chat"
+    ),
+)
+
+
+def create_ai_client(provider, api_key=None, model_name=None, wrap=None):
+    """Create the client of ``provider``.
+
+    ``provider`` may also be an ordered list of ``(provider, api_key, model_name)`` entries. The
+    clients are then tried in that order, each behind its own circuit breaker. ``wrap`` is called
+    with ``(provider, client)`` for every client and returns the client to use.
+    """
+    if isinstance(provider, list | tuple):
+        from .fallback import FallbackAIClient
+
+        return FallbackAIClient(
+            [(name, create_ai_client(name, key, model, wrap)) for name, key, model in provider]
+        )
+    spec = get_provider(provider)
+    ai_client = _resolve(spec.client)(api_key, model_name or spec.default_model)
+    return wrap(provider, ai_client) if wrap else ai_client
+
+
+def create_async_ai_client(provider, api_key=None, model_name=None, wrap=None):
+    if isinstance(provider, list | tuple):
+        from .fallback import AsyncFallbackAIClient
+
+        return AsyncFallbackAIClient(
+            [
+                (name, create_async_ai_client(name, key, model, wrap))
+                for name, key, model in provider
+            ]
+        )
+    spec = get_provider(provider)
+    if spec.async_client is None:
+        raise ValueError(f"AI provider {provider} doesn't support async execution")
+    ai_client = _resolve(spec.async_client)(api_key, model_name or spec.default_model)
+    return wrap(provider, ai_client) if wrap else ai_client
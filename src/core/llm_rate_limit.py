@@ -0,0 +1,229 @@
+import asyncio
+import contextvars
+import random
+import threading
+import time
+
+from .llm import AIClient, AsyncAIClient
+from .run_report import record_retry
+from .tokens import estimate_tokens
+
+# Allowance for the generated title when reserving tokens-per-minute budget for a request.
+RESPONSE_TOKENS = 64
+
+RETRYABLE_STATUSES = (408, 409, 429)
+
+_send_watch = contextvars.ContextVar("send_watch", default=None)
+
+
+class SendWatch:
+    """When (``time.perf_counter``) a request leaves its rate limiter and is sent.
+
+    A hedge watches its primary request with one, so time spent waiting for rate limit budget
+    doesn't count towards the hedge delay. ``cached`` tells it the answer came from the response
+    cache, whose latency says nothing about the provider's.
+    """
+
+    def __init__(self):
+        self.sent_at = time.perf_counter()
+        self.cached = False
+
+
+def watch_send(watch):
+    """Report the send time of requests made in the current context to ``watch``."""
+    _send_watch.set(watch)
+
+
+def note_cache_hit():
+    watch = _send_watch.get()
+    if watch is not None:
+        watch.cached = True
+
+
+def _note_send(delay):
+    watch = _send_watch.get()
+    if watch is not None:
+        watch.sent_at = time.perf_counter() + delay
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at ``per_minute`` units per minute.
+
+    ``reserve`` always succeeds and returns how long the caller has to wait for the units it
+    took, so concurrent callers queue up instead of polling.
+    """
+
+    def __init__(self, per_minute, clock=time.monotonic):
+        self.capacity = per_minute
+        self.rate = per_minute / 60
+        self.tokens = per_minute
+        self.clock = clock
+        self.updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount=1):
+        with self._lock:
+            now = self.clock()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # A single request larger than the whole budget waits for a full bucket, not forever.
+            self.tokens -= min(amount, self.capacity)
+            if self.tokens >= 0:
+                return 0
+            return -self.tokens / self.rate
+
+
+def error_status(error):
+    """Return the HTTP status of an SDK error, if it carries one."""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        # google.api_core exceptions keep the HTTP status in `code`.
+        status = getattr(error, "code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_retryable(error):
+    status = error_status(error)
+    if status is None:
+        # Connection errors and timeouts don't carry a status. The openai SDK isn't imported
+        # here, so its APIConnectionError (and APITimeoutError subclass) is matched by name.
+        return isinstance(error, ConnectionError | TimeoutError) or any(
+            cls.__name__ == "APIConnectionError" for cls in type(error).__mro__
+        )
+    return status in RETRYABLE_STATUSES or status >= 500
+
+
+def retry_after(error):
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class ProviderRateLimiter:
+    """Requests-per-minute and tokens-per-minute budgets plus the retry policy of one provider.
+
+    Failed requests with a retryable status (429, 5xx, ...) are retried up to ``max_retries``
+    times with exponential full-jitter backoff, as long as the run's ``retry_budget`` (the
+    ``retry-budget`` input) lasts. Retries are counted in the run report.
+    """
+
+    def __init__(
+        self,
+        provider,
+        requests_per_minute=0,
+        tokens_per_minute=0,
+        max_retries=3,
+        retry_budget=20,
+        base_delay=1.0,
+        max_delay=60.0,
+        count_tokens=estimate_tokens,
+    ):
+        self.provider = provider
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_retries = max_retries
+        self.retry_budget = retry_budget
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.count_tokens = count_tokens
+        self._lock = threading.Lock()
+
+    def reserve(self, prompt):
+        """Take budget for one request and return how long to wait before sending it."""
+        delay = 0
+        if self.requests:
+            delay = self.requests.reserve()
+        if self.tokens:
+            delay = max(delay, self.tokens.reserve(self.count_tokens(prompt) + RESPONSE_TOKENS))
+        return delay
+
+    def backoff(self, error, attempt):
+        """Return the delay before retrying after ``error``, or None to give up."""
+        if attempt >= self.max_retries or not is_retryable(error):
+            return None
+        with self._lock:
+            if self.retry_budget <= 0:
+                print(f"Warning: {self.provider} retry budget exhausted")
+                return None
+            self.retry_budget -= 1
+        record_retry(self.provider)
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))  # noqa: S311
+        return max(delay, retry_after(error) or 0)
+
+
+class RateLimitedAIClient(AIClient):
+    """Sends the wrapped client's requests through a ``ProviderRateLimiter``."""
+
+    def __init__(self, ai_client, limiter):
+        self.ai_client = ai_client
+        self.limiter = limiter
+        self.model_name = ai_client.model_name
+
+    def warm_up(self):
+        self.ai_client.warm_up()
+
+    def generate_content(self, prompt):
+        return self._call(self.ai_client.generate_content, prompt)
+
+    def generate_title(self, prompt, max_output_tokens=None):
+        return self._call(self.ai_client.generate_title, prompt, max_output_tokens)
+
+    def _call(self, method, prompt, *args):
+        attempt = 0
+        while True:
+            delay = self.limiter.reserve(prompt)
+            if attempt == 0:
+                _note_send(delay)
+            if delay:
+                time.sleep(delay)
+            try:
+                return method(prompt, *args)
+            except Exception as error:
+                delay = self.limiter.backoff(error, attempt)
+                if delay is None:
+                    raise
+                print(f"Retrying {self.limiter.provider} request in {delay:.1f}s: {error!s}")
+                time.sleep(delay)
+                attempt += 1
+
+
+class AsyncRateLimitedAIClient(AsyncAIClient):
+    def __init__(self, ai_client, limiter):
+        self.ai_client = ai_client
+        self.limiter = limiter
+        self.model_name = ai_client.model_name
+
+    async def warm_up(self):
+        await self.ai_client.warm_up()
+
+    async def aclose(self):
+        await self.ai_client.aclose()
+
+    async def generate_content(self, prompt):
+        return await self._call(self.ai_client.generate_content, prompt)
+
+    async def generate_title(self, prompt, max_output_tokens=None):
+        return await self._call(self.ai_client.generate_title, prompt, max_output_tokens)
+
+    async def _call(self, method, prompt, *args):
+        attempt = 0
+        while True:
+            delay = self.limiter.reserve(prompt)
+            if attempt == 0:
+                _note_send(delay)
+            if delay:
+                await asyncio.sleep(delay)
+            try:
+                return await method(prompt, *args)
+            except Exception as error:
+                delay = self.limiter.backoff(error, attempt)
+                if delay is None:
+                    raise
+                print(f"Retrying {self.limiter.provider} request in {delay:.1f}s: {error!s}")
+                await asyncio.sleep(delay)
+                attempt += 1
@@ -20,5 +20,5 @@ def block_user_title_edit(event_data, skip_label, github_client, issue):
         "A well-written title helps programmers and testers better understand the issue's intent, "
         "which leads to more effective and enthusiastic contributions. I appreciate your cooperation.",
     )
-    issue.edit(title=previous_title)
+    github_client.update_issue_title(issue, previous_title)
     return True
@@ -0,0 +1,192 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+from .llm import AIClient, AsyncAIClient, read_title_line
+from .llm_rate_limit import note_cache_hit
+from .verbose import verbose_print
+
+
+class ResponseCache:
+    """On-disk cache of model responses keyed by a hash of (provider, model, prompt).
+
+    Every entry is a small JSON file, so the directory can be persisted between workflow runs
+    (for example with ``actions/cache``). Entries older than ``ttl_seconds`` are treated as
+    misses, and ``prune`` keeps at most ``max_entries`` of the most recently used ones.
+    """
+
+    def __init__(self, directory, ttl_seconds=30 * 24 * 3600, max_entries=10000):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def make_key(provider, model_name, prompt):
+        payload = json.dumps([provider, model_name, prompt], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            self._record(hit=False)
+            return None
+
+        if self.ttl_seconds and time.time() - entry.get("created_at", 0) > self.ttl_seconds:
+            self._remove(path)
+            self._record(hit=False)
+            return None
+
+        # Refresh the modification time so pruning evicts the least recently used entries.
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self._record(hit=True)
+        return entry.get("response")
+
+    def set(self, key, response):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        entry = {"created_at": time.time(), "response": response}
+        # Write to a temporary file first so concurrent readers never see a partial entry.
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                json.dump(entry, file, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error writing response cache entry: {e!s}")
+            self._remove(tmp_path)
+
+    def prune(self):
+        """Remove expired entries and the least recently used ones beyond ``max_entries``."""
+        entries = []
+        now = time.time()
+        removed = 0
+        for root, _, files in os.walk(self.directory):
+            if root == self.directory:
+                # Entries live in subdirectories; other run state may be kept next to them.
+                continue
+            for filename in files:
+                path = os.path.join(root, filename)
+                try:
+                    mtime = os.path.getmtime(path)
+                except OSError:
+                    continue
+                if filename.endswith(".tmp") or (
+                    self.ttl_seconds and now - mtime > self.ttl_seconds
+                ):
+                    removed += self._remove(path)
+                else:
+                    entries.append((mtime, path))
+
+        if self.max_entries and len(entries) > self.max_entries:
+            entries.sort()
+            for _, path in entries[: len(entries) - self.max_entries]:
+                removed += self._remove(path)
+        return removed
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+            return 1
+        except OSError:
+            return 0
+
+    def summary(self):
+        return f"LLM response cache: {self.hits} hits, {self.misses} misses"
+
+
+class CachedAIClient(AIClient):
+    """Serves repeated prompts from a ``ResponseCache`` before calling the wrapped client.
+
+    It wraps a single provider, so with fallback providers or hedging each of them gets its own
+    and answers are cached under the provider and model that gave them.
+    """
+
+    def __init__(self, ai_client, cache, provider):
+        self.ai_client = ai_client
+        self.cache = cache
+        self.provider = provider
+        self.model_name = ai_client.model_name
+
+    def warm_up(self):
+        self.ai_client.warm_up()
+
+    def generate_content(self, prompt):
+        key = self.cache.make_key(self.provider, self.model_name, prompt)
+        response = self.cache.get(key)
+        if response is not None:
+            note_cache_hit()
+            verbose_print("Model Response (cached): ", response)
+            return response
+        response = self.ai_client.generate_content(prompt)
+        self.cache.set(key, response)
+        return response
+
+    def generate_title(self, prompt, max_output_tokens=None):
+        key = self.cache.make_key(self.provider, self.model_name, prompt)
+        response = self.cache.get(key)
+        if response is not None:
+            note_cache_hit()
+            verbose_print("Model Response (cached): ", response)
+            return read_title_line([response])[0], None
+        title, stats = self.ai_client.generate_title(prompt, max_output_tokens)
+        self.cache.set(key, title)
+        return title, stats
+
+
+class AsyncCachedAIClient(AsyncAIClient):
+    def __init__(self, ai_client, cache, provider):
+        self.ai_client = ai_client
+        self.cache = cache
+        self.provider = provider
+        self.model_name = ai_client.model_name
+
+    async def warm_up(self):
+        await self.ai_client.warm_up()
+
+    async def aclose(self):
+        await self.ai_client.aclose()
+
+    async def generate_content(self, prompt):
+        key = self.cache.make_key(self.provider, self.model_name, prompt)
+        response = self.cache.get(key)
+        if response is not None:
+            note_cache_hit()
+            verbose_print("Model Response (cached): ", response)
+            return response
+        response = await self.ai_client.generate_content(prompt)
+        self.cache.set(key, response)
+        return response
+
+    async def generate_title(self, prompt, max_output_tokens=None):
+        key = self.cache.make_key(self.provider, self.model_name, prompt)
+        response = self.cache.get(key)
+        if response is not None:
+            note_cache_hit()
+            verbose_print("Model Response (cached): ", response)
+            return read_title_line([response])[0], None
+        title, stats = await self.ai_client.generate_title(prompt, max_output_tokens)
+        self.cache.set(key, title)
+        return title, stats
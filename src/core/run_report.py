@@ -0,0 +1,294 @@
+import itertools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+def _percentile(ordered, fraction):
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def is_improved(result):
+    """Whether a result's better title reached GitHub: results whose writes failed don't count."""
+    return bool(result.get("improved_title")) and not result.get("error")
+
+
+class RunReport:
+    """Stage timings and model token usage of one run.
+
+    Stages are timed per issue where there is one: ``prompt`` (body preparation and rendering),
+    ``llm`` (the model call, including rate limit waits and retries) and one ``write:<kind>`` per
+    GitHub write. ``discovery``, batch requests and GraphQL mutations are timed per call. Time
+    spent in the same stage for the same issue adds up to one sample.
+    """
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.started = clock()
+        self.finished = None
+        # Stage -> {issue number or call id -> seconds}.
+        self.timings = {}
+        # Provider -> {"requests", "prompt_tokens", "completion_tokens", "estimated"}.
+        self.tokens = {}
+        # Provider -> model requests retried.
+        self.retries = {}
+        # Cache -> {"hits", "misses"}, for the caches the run used.
+        self.caches = {}
+        self.results = []
+        self._calls = itertools.count()
+        self._lock = threading.Lock()
+
+    def record(self, stage, seconds, issue_number=None):
+        key = issue_number if issue_number is not None else f"call-{next(self._calls)}"
+        with self._lock:
+            samples = self.timings.setdefault(stage, {})
+            samples[key] = samples.get(key, 0.0) + seconds
+
+    @contextmanager
+    def timed(self, stage, issue_number=None):
+        started = self.clock()
+        try:
+            yield
+        finally:
+            self.record(stage, self.clock() - started, issue_number)
+
+    def add_usage(self, provider, prompt_tokens, completion_tokens, estimated=False):
+        """Count one model request; ``estimated`` marks token counts not reported by the API."""
+        with self._lock:
+            usage = self.tokens.setdefault(
+                provider,
+                {"requests": 0, "prompt_tokens": 0, "completion_tokens": 0, "estimated": False},
+            )
+            usage["requests"] += 1
+            usage["prompt_tokens"] += prompt_tokens or 0
+            usage["completion_tokens"] += completion_tokens or 0
+            usage["estimated"] = usage["estimated"] or estimated
+
+    def add_retry(self, provider):
+        with self._lock:
+            self.retries[provider] = self.retries.get(provider, 0) + 1
+
+    def add_cache(self, name, hits, misses):
+        with self._lock:
+            self.caches[name] = {"hits": hits, "misses": misses}
+
+    def finish(self, results):
+        self.results = list(results or [])
+        self.finished = self.clock()
+
+    def stage_summary(self):
+        summary = {}
+        with self._lock:
+            timings = {stage: sorted(samples.values()) for stage, samples in self.timings.items()}
+        for stage, ordered in sorted(timings.items()):
+            summary[stage] = {
+                "count": len(ordered),
+                "total_s": round(sum(ordered), 3),
+                "p50_s": round(_percentile(ordered, 0.5), 3),
+                "p95_s": round(_percentile(ordered, 0.95), 3),
+                "max_s": round(ordered[-1], 3),
+            }
+        return summary
+
+    def issue_counts(self):
+        return {
+            "processed": len(self.results),
+            "improved": len([r for r in self.results if is_improved(r)]),
+            "updated": len([r for r in self.results if r.get("updated")]),
+            "skipped": len([r for r in self.results if r.get("skipped")]),
+            "failed": len([r for r in self.results if r.get("error")]),
+        }
+
+    def per_issue(self):
+        issues = {}
+        with self._lock:
+            for stage, samples in self.timings.items():
+                for key, seconds in samples.items():
+                    if isinstance(key, int):
+                        issues.setdefault(str(key), {})[stage] = round(seconds, 3)
+        return dict(sorted(issues.items(), key=lambda item: int(item[0])))
+
+    def total_tokens(self):
+        prompt = sum(usage["prompt_tokens"] for usage in self.tokens.values())
+        completion = sum(usage["completion_tokens"] for usage in self.tokens.values())
+        return prompt, completion
+
+    def to_dict(self):
+        finished = self.finished if self.finished is not None else self.clock()
+        with self._lock:
+            tokens = {provider: dict(usage) for provider, usage in sorted(self.tokens.items())}
+            retries = dict(sorted(self.retries.items()))
+            caches = {name: dict(counts) for name, counts in sorted(self.caches.items())}
+        return {
+            "duration_s": round(finished - self.started, 3),
+            "issues": self.issue_counts(),
+            "stages": self.stage_summary(),
+            "tokens": tokens,
+            "retries": retries,
+            "caches": caches,
+            "per_issue": self.per_issue(),
+        }
+
+    def outputs(self):
+        """Step outputs: flat values a workflow can pass on, e.g. to a metrics step."""
+        data = self.to_dict()
+        counts = data["issues"]
+        prompt_tokens, completion_tokens = self.total_tokens()
+        llm = data["stages"].get("llm", {})
+        llm_cache = data["caches"].get("llm", {})
+        github_cache = data["caches"].get("github", {})
+        return {
+            "issues-processed": counts["processed"],
+            "issues-improved": counts["improved"],
+            "issues-failed": counts["failed"],
+            "prompt-tokens": prompt_tokens,
+            "completion-tokens": completion_tokens,
+            "llm-retries": sum(data["retries"].values()),
+            "llm-cache-hits": llm_cache.get("hits", 0),
+            "llm-cache-misses": llm_cache.get("misses", 0),
+            "github-cache-hits": github_cache.get("hits", 0),
+            "github-cache-misses": github_cache.get("misses", 0),
+            "llm-p95-seconds": llm.get("p95_s", 0),
+            "duration-seconds": data["duration_s"],
+        }
+
+    def markdown(self):
+        data = self.to_dict()
+        counts = data["issues"]
+        lines = [
+            "### Issue Title AI run",
+            "",
+            f"{counts['processed']} issues processed in {data['duration_s']:.1f}s: "
+            f"{counts['improved']} improved, {counts['skipped']} skipped, {counts['failed']} failed.",
+            "",
+        ]
+        if data["retries"]:
+            per_provider = ", ".join(f"{name}: {count}" for name, count in data["retries"].items())
+            lines += [
+                f"{sum(data['retries'].values())} model requests retried ({per_provider}).",
+                "",
+            ]
+        lines += [
+            "| Stage | Count | Total (s) | p50 (s) | p95 (s) | Max (s) |",
+            "| --- | ---: | ---: | ---: | ---: | ---: |",
+        ]
+        for stage, stats in data["stages"].items():
+            lines.append(
+                f"| {stage} | {stats['count']} | {stats['total_s']:.3f} | {stats['p50_s']:.3f} "
+                f"| {stats['p95_s']:.3f} | {stats['max_s']:.3f} |"
+            )
+        if data["tokens"]:
+            lines += [
+                "",
+                "| Provider | Requests | Prompt tokens | Completion tokens |",
+                "| --- | ---: | ---: | ---: |",
+            ]
+            for provider, usage in data["tokens"].items():
+                marker = " (estimated)" if usage["estimated"] else ""
+                lines.append(
+                    f"| {provider}{marker} | {usage['requests']} | {usage['prompt_tokens']} "
+                    f"| {usage['completion_tokens']} |"
+                )
+        if data["caches"]:
+            lines += ["", "| Cache | Hits | Misses |", "| --- | ---: | ---: |"]
+            for name, counts in data["caches"].items():
+                lines.append(f"| {name} | {counts['hits']} | {counts['misses']} |")
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def write_step_summary(self, path):
+        with open(path, "a") as f:
+            f.write(self.markdown())
+
+    def write_outputs(self, path):
+        with open(path, "a") as f:
+            for name, value in self.outputs().items():
+                f.write(f"{name}={value}\n")
+
+
+_report = None
+
+
+def set_run_report(report):
+    global _report
+    _report = report
+
+
+@contextmanager
+def timed(stage, issue_number=None):
+    """Time the block as ``stage`` of the current ``RunReport``, if there is one."""
+    report = _report
+    if report is None:
+        yield
+        return
+    with report.timed(stage, issue_number):
+        yield
+
+
+def record_usage(provider, prompt_tokens, completion_tokens, estimated=False):
+    report = _report
+    if report is not None:
+        report.add_usage(provider, prompt_tokens, completion_tokens, estimated)
+
+
+def record_retry(provider):
+    report = _report
+    if report is not None:
+        report.add_retry(provider)
+
+
+def timed_iteration(stage, items):
+    """Yield from ``items``, timing the time spent producing them as one sample of ``stage``.
+
+    Time the consumer holds on to an item isn't counted, so a listing consumed while its issues
+    are processed still reports how long fetching it took.
+    """
+    report = _report
+    if report is None:
+        yield from items
+        return
+    elapsed = 0.0
+    iterator = iter(items)
+    try:
+        while True:
+            started = report.clock()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                elapsed += report.clock() - started
+            yield item
+    finally:
+        report.record(stage, elapsed)
+
+
+async def timed_aiteration(stage, items):
+    """Asyncio version of ``timed_iteration`` for an async iterable."""
+    report = _report
+    if report is None:
+        async for item in items:
+            yield item
+        return
+    elapsed = 0.0
+    iterator = aiter(items)
+    try:
+        while True:
+            started = report.clock()
+            try:
+                item = await anext(iterator)
+            except StopAsyncIteration:
+                return
+            finally:
+                elapsed += report.clock() - started
+            yield item
+    finally:
+        report.record(stage, elapsed)
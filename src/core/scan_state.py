@@ -0,0 +1,132 @@
+import datetime
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+from .issue_record import parse_github_datetime
+
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+def utc_now():
+    """Return the current time as a naive UTC datetime, like the issue timestamps."""
+    return datetime.datetime.now(datetime.UTC).replace(tzinfo=None)
+
+
+def _read_state(path):
+    try:
+        with open(path, encoding="utf-8") as file:
+            data = json.load(file)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"Error reading scan state, starting over: {e!s}")
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _write_state(path, data):
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    # Replace the file in one step so an interrupted run never leaves a truncated state file.
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            json.dump(data, file, indent=2)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Error writing scan state: {e!s}")
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+class ScanState:
+    """High-water marks of earlier scheduled scans, one per repository, kept in a JSON file.
+
+    A cursor records when the last complete scan listed the issues (``updated_at``) plus the
+    highest issue number it processed. The next scan only lists issues updated since then, minus
+    ``overlap`` to absorb clock skew and issues updated while the last scan was running.
+    """
+
+    def __init__(self, path, overlap=datetime.timedelta(minutes=10)):
+        self.path = path
+        self.overlap = overlap
+
+    def cursor(self, repo_name):
+        return _read_state(self.path).get(repo_name)
+
+    def since(self, repo_name):
+        """Return the "updated since" bound for the next scan, or None for a full scan."""
+        cursor = self.cursor(repo_name)
+        updated_at = parse_github_datetime(cursor.get("updated_at")) if cursor else None
+        if not updated_at:
+            return None
+        print(
+            f"Incremental scan: issues updated since {cursor['updated_at']}"
+            f" (newest issue processed: #{cursor.get('number')})"
+        )
+        return updated_at - self.overlap
+
+    def advance(self, repo_name, scanned_at, issue_numbers=()):
+        """Move the cursor of ``repo_name`` to a scan started at ``scanned_at``."""
+        data = _read_state(self.path)
+        cursor = dict(data.get(repo_name) or {})
+        cursor["updated_at"] = scanned_at.strftime(TIMESTAMP_FORMAT)
+        # Issue numbers grow with creation time, so the highest one is the newest issue.
+        cursor["number"] = max([*issue_numbers, cursor.get("number") or 0]) or None
+        data[repo_name] = cursor
+        _write_state(self.path, data)
+
+
+class VerdictStore:
+    """Issues the model found already well titled, kept in the scan state file.
+
+    A verdict holds a fingerprint of the issue's title and body (and of the prompt), so the
+    issue is skipped until one of them changes. Verdicts older than ``ttl`` are dropped, by
+    then the issue has usually left the ``days-to-scan`` window.
+    """
+
+    def __init__(self, path, repo_name, prompt="", ttl=datetime.timedelta(days=90)):
+        self.path = path
+        self.repo_name = repo_name
+        self.prompt = prompt
+        self.ttl = ttl
+        repo_state = _read_state(path).get(repo_name) or {}
+        self.verdicts = dict(repo_state.get("verdicts") or {})
+        self._changed = False
+        self._lock = threading.Lock()
+
+    def fingerprint(self, issue):
+        payload = json.dumps([issue.title, issue.body or "", self.prompt], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def is_optimal(self, issue):
+        verdict = self.verdicts.get(str(issue.number))
+        return bool(verdict) and verdict.get("fingerprint") == self.fingerprint(issue)
+
+    def record(self, issue):
+        with self._lock:
+            self.verdicts[str(issue.number)] = {
+                "fingerprint": self.fingerprint(issue),
+                "checked_at": utc_now().strftime(TIMESTAMP_FORMAT),
+            }
+            self._changed = True
+
+    def save(self):
+        if not self._changed:
+            return
+        oldest = (utc_now() - self.ttl).strftime(TIMESTAMP_FORMAT)
+        with self._lock:
+            verdicts = {
+                number: verdict
+                for number, verdict in self.verdicts.items()
+                if verdict.get("checked_at", "") >= oldest
+            }
+            self._changed = False
+        data = _read_state(self.path)
+        data[self.repo_name] = {**(data.get(self.repo_name) or {}), "verdicts": verdicts}
+        _write_state(self.path, data)
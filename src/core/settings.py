@@ -6,12 +6,28 @@ class Config:
     def __init__(self):
         self.github_token = os.environ.get("INPUT_GITHUB-TOKEN")
         self.repo_name = os.environ.get("GITHUB_REPOSITORY")
+        # Set by the runner; they point to the GitHub Enterprise Server API where there is one.
+        self.github_api_url = os.environ.get("GITHUB_API_URL", "https://api.github.com")
+        self.github_graphql_url = os.environ.get(
+            "GITHUB_GRAPHQL_URL", "https://api.github.com/graphql"
+        )
         self.days_to_scan = int(os.environ.get("INPUT_DAYS-TO-SCAN", "7"))
         self.auto_update = os.environ.get("INPUT_AUTO-UPDATE", "false").lower() == "true"
         self.quiet = os.environ.get("INPUT_QUIET", "false").lower() == "true"
         self.max_issues = int(os.environ.get("INPUT_MAX-ISSUES", "100"))
         self.required_labels = self._parse_labels(os.environ.get("INPUT_REQUIRED-LABELS", ""))
         self.apply_to_closed = os.environ.get("INPUT_APPLY-TO-CLOSED", "false").lower() == "true"
+        self.max_concurrency = int(os.environ.get("INPUT_MAX-CONCURRENCY", "1"))
+        self.execution_mode = os.environ.get("INPUT_EXECUTION-MODE", "sync").lower()
+        self.discovery = os.environ.get("INPUT_DISCOVERY", "rest").lower()
+        self.batch_size = int(os.environ.get("INPUT_BATCH-SIZE", "1"))
+        self.batch_max_tokens = int(os.environ.get("INPUT_BATCH-MAX-TOKENS", "8000"))
+        self.write_back = os.environ.get("INPUT_WRITE-BACK", "rest").lower()
+        self.write_batch_size = int(os.environ.get("INPUT_WRITE-BATCH-SIZE", "25"))
+        self.write_interval_ms = int(os.environ.get("INPUT_WRITE-INTERVAL-MS", "1000"))
+        self.writes_per_minute = int(os.environ.get("INPUT_WRITES-PER-MINUTE", "0"))
+        max_body_tokens = os.environ.get("INPUT_MAX-BODY-TOKENS", "")
+        self.max_body_tokens = int(max_body_tokens) if max_body_tokens else None
 
         self.gemini_api_key = os.environ.get("INPUT_GEMINI-API-KEY")
         self.openai_api_key = os.environ.get("INPUT_OPENAI-API-KEY")
@@ -32,6 +48,30 @@ class Config:
 
         self.description_min_skip = int(os.getenv("INPUT_DESCRIPTION_LEN_MIN_SKIP", 40))
 
+        self.stream = os.environ.get("INPUT_STREAM", "false").lower() == "true"
+        self.max_output_tokens = int(os.environ.get("INPUT_MAX-OUTPUT-TOKENS", "64"))
+        self.requests_per_minute = int(os.environ.get("INPUT_REQUESTS-PER-MINUTE", "0"))
+        self.tokens_per_minute = int(os.environ.get("INPUT_TOKENS-PER-MINUTE", "0"))
+        self.max_retries = int(os.environ.get("INPUT_MAX-RETRIES", "3"))
+        self.retry_budget = int(os.environ.get("INPUT_RETRY-BUDGET", "20"))
+
+        self.cache_dir = os.environ.get("INPUT_CACHE-DIR", "")
+        self.cache_ttl_days = int(os.environ.get("INPUT_CACHE-TTL-DAYS", "30"))
+        self.cache_max_entries = int(os.environ.get("INPUT_CACHE-MAX-ENTRIES", "10000"))
+
+        self.github_cache_dir = os.environ.get("INPUT_GITHUB-CACHE-DIR", "")
+
+        self.state_file = os.environ.get("INPUT_STATE-FILE", "")
+        self.scan_overlap_minutes = int(os.environ.get("INPUT_SCAN-OVERLAP-MINUTES", "10"))
+        self.full_rescan = os.environ.get("INPUT_FULL-RESCAN", "false").lower() == "true"
+
+        self.report_file = os.environ.get("INPUT_REPORT-FILE", "")
+        self.step_summary = os.environ.get("INPUT_STEP-SUMMARY", "true").lower() == "true"
+        self.trace_file = os.environ.get("INPUT_TRACE-FILE", "")
+        # Set by the runner: the job summary (Markdown) and step output files.
+        self.step_summary_path = os.environ.get("GITHUB_STEP_SUMMARY")
+        self.output_path = os.environ.get("GITHUB_OUTPUT")
+
         # Check if this is an issue event trigger
         self.event_name = os.environ.get("GITHUB_EVENT_NAME")
         self.event_path = os.environ.get("GITHUB_EVENT_PATH")
@@ -54,6 +94,14 @@ class Config:
 
         self.ai_provider = self._detect_ai_provider()
 
+        self.fallback_providers = self._parse_fallback_providers(
+            os.environ.get("INPUT_FALLBACK-PROVIDERS", "")
+        )
+
+        self.hedge = os.environ.get("INPUT_HEDGE", "false").lower() == "true"
+        self.hedge_delay_ms = int(os.environ.get("INPUT_HEDGE-DELAY-MS", "0"))
+        self.hedge_provider = self._detect_hedge_provider() if self.hedge else None
+
     def _retrieve_prompt(self):
         prompt = os.environ.get("INPUT_PROMPT")
         if prompt:
@@ -108,8 +156,26 @@ class Config:
             return []
         return [label.strip() for label in labels_str.split(",") if label.strip()]
 
+    def _parse_fallback_providers(self, providers_str):
+        """Parse comma-separated ``provider`` or ``provider:model`` entries."""
+        fallbacks = []
+        for entry in self._parse_labels(providers_str):
+            provider, _, model_name = entry.partition(":")
+            fallbacks.append((provider.strip().lower(), model_name.strip() or None))
+        return fallbacks
+
+    def provider_chain(self):
+        """Return the ``(provider, api_key, model_name)`` entries to try, main provider first."""
+        chain = [(self.ai_provider, self.get_api_key(), self.model_name)]
+        for provider, model_name in self.fallback_providers:
+            chain.append((provider, self.get_api_key(provider), model_name))
+        return chain
+
     def _detect_ai_provider(self):
         explicit = os.environ.get("INPUT_AI-PROVIDER", "").lower()
+        if explicit and explicit not in self.providers:
+            # A provider registered by a plugin; its key comes from the generic `api-key` input.
+            self.providers[explicit] = os.environ.get("INPUT_API-KEY")
         if explicit in self.providers:
             if not self.providers[explicit]:
                 raise ValueError(f"{self.providers[explicit]} API key not provided")
@@ -123,8 +189,17 @@ class Config:
             "No LLM API key was provided. Please provide one of the following: deepseek, gemini, openai."
         )
 
-    def get_api_key(self):
-        return self.providers[self.ai_provider]
+    def _detect_hedge_provider(self):
+        explicit = os.environ.get("INPUT_HEDGE-PROVIDER", "").lower()
+        if explicit:
+            return explicit
+        for provider, api_key in self.providers.items():
+            if api_key and provider != self.ai_provider:
+                return provider
+        return None
+
+    def get_api_key(self, provider=None):
+        return self.providers.get(provider or self.ai_provider)
 
     def validate(self):
         if not self.github_token:
@@ -135,3 +210,52 @@ class Config:
 
         if not self.get_api_key():
             raise ValueError(f"API key not found for {self.ai_provider}")
+
+        for name, value in (
+            ("max-concurrency", self.max_concurrency),
+            ("batch-size", self.batch_size),
+            ("max-output-tokens", self.max_output_tokens),
+            ("write-batch-size", self.write_batch_size),
+        ):
+            if value < 1:
+                raise ValueError(f"{name} must be at least 1")
+
+        for name, value, choices in (
+            ("execution-mode", self.execution_mode, ("sync", "async")),
+            ("discovery", self.discovery, ("rest", "graphql", "search")),
+            ("write-back", self.write_back, ("rest", "graphql")),
+        ):
+            if value not in choices:
+                raise ValueError(
+                    f"Unsupported {name}: {value}, please use one of {', '.join(choices)}"
+                )
+
+        for name, value in (
+            ("requests-per-minute", self.requests_per_minute),
+            ("tokens-per-minute", self.tokens_per_minute),
+            ("max-retries", self.max_retries),
+            ("retry-budget", self.retry_budget),
+            ("max-body-tokens", self.max_body_tokens or 0),
+            ("hedge-delay-ms", self.hedge_delay_ms),
+            ("scan-overlap-minutes", self.scan_overlap_minutes),
+            ("write-interval-ms", self.write_interval_ms),
+            ("writes-per-minute", self.writes_per_minute),
+        ):
+            if value < 0:
+                raise ValueError(f"{name} must not be negative")
+
+        self._validate_secondary_providers()
+
+    def _validate_secondary_providers(self):
+        for provider, _ in self.fallback_providers:
+            if not self.get_api_key(provider):
+                raise ValueError(f"API key not found for fallback provider {provider}")
+
+        if not self.hedge:
+            return
+        if not self.hedge_provider:
+            raise ValueError("hedge needs the API key of a second provider")
+        if self.hedge_provider == self.ai_provider:
+            raise ValueError("hedge-provider must differ from the main provider")
+        if not self.get_api_key(self.hedge_provider):
+            raise ValueError(f"API key not found for {self.hedge_provider}")
@@ -0,0 +1,177 @@
+# Token accounting shared by prompt batching and issue body budgeting.
+
+import re
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - optional dependency
+    tiktoken = None
+
+CHARS_PER_TOKEN = 4
+
+# Share of the body budget left unused when token counts are estimated rather than counted, since
+# the characters per token rule undercounts code, URLs and non-English text.
+ESTIMATE_MARGIN = 0.1
+
+# Issue body budget used when `max-body-tokens` isn't set. A title needs far less context than any
+# of these models accept, so the limits are about cost and latency rather than context size.
+DEFAULT_MAX_BODY_TOKENS = {
+    "gemini": 8000,
+    "openai": 4000,
+    "deepseek": 4000,
+}
+
+# Share of the body budget kept from the start and from the end of an oversized body. The rest is
+# used for Markdown headings in the middle, which usually carry the issue template structure.
+HEAD_SHARE = 0.5
+TAIL_SHARE = 0.3
+
+HEADING_PATTERN = re.compile(r"^\s{0,3}#{1,6}\s")
+OMITTED_MARKER = "[... {count} lines omitted ...]"
+CLIPPED_MARKER = " [...]"
+
+
+def estimate_tokens(text):
+    """Estimate the number of tokens in ``text`` using the ~4 characters per token rule of thumb."""
+    if not text:
+        return 0
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def get_token_counter(provider, model_name=None):
+    """Return a function counting tokens the way ``provider`` roughly does.
+
+    OpenAI-compatible providers use ``tiktoken`` when it's installed; everything else falls back
+    to ``estimate_tokens``.
+    """
+    if tiktoken is None or provider not in ("openai", "deepseek"):
+        return estimate_tokens
+    try:
+        try:
+            encoding = tiktoken.encoding_for_model(model_name or "")
+        except KeyError:
+            encoding = tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        print(f"Error loading tokenizer, estimating token counts instead: {e!s}")
+        return estimate_tokens
+
+    def count_tokens(text):
+        return len(encoding.encode(text, disallowed_special=())) if text else 0
+
+    return count_tokens
+
+
+def resolve_max_body_tokens(provider, configured=None):
+    """Return the body budget for ``provider``; ``configured`` wins and 0 disables the limit."""
+    if configured is not None:
+        return configured or None
+    return DEFAULT_MAX_BODY_TOKENS.get(provider)
+
+
+def _clip(text, max_tokens, count_tokens, from_end=False):
+    """Return the longest prefix (or suffix) of ``text`` that fits in ``max_tokens``."""
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        candidate = text[-middle:] if from_end else text[:middle]
+        if count_tokens(candidate) <= max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    if not low:
+        return ""
+    return text[-low:] if from_end else text[:low]
+
+
+def _clip_edges(lines, kept, start, end, head_budget, tail_budget, count_tokens):
+    head = _clip(lines[start], max(head_budget - 2, 0), count_tokens)
+    tail = _clip(lines[end], max(tail_budget - 2, 0), count_tokens, from_end=True)
+    if start == end:
+        if head or tail:
+            kept[start] = f"{head}{CLIPPED_MARKER} {tail}".strip()
+        return
+    if head:
+        kept[start] = head + CLIPPED_MARKER
+    if tail:
+        kept[end] = CLIPPED_MARKER.strip() + " " + tail
+
+
+def _join_kept(lines, kept):
+    """Join the kept lines, replacing every run of dropped lines with ``OMITTED_MARKER``."""
+    output = []
+    previous = -1
+    for index in sorted(kept):
+        if index - previous > 1:
+            output.append(OMITTED_MARKER.format(count=index - previous - 1))
+        output.append(kept[index])
+        previous = index
+    if previous < len(lines) - 1:
+        output.append(OMITTED_MARKER.format(count=len(lines) - 1 - previous))
+    return "\n".join(output)
+
+
+def _truncate_lines(lines, max_tokens, count_tokens):
+    line_tokens = [count_tokens(line) + 1 for line in lines]
+    kept = {}
+
+    head_budget = int(max_tokens * HEAD_SHARE)
+    tail_budget = int(max_tokens * TAIL_SHARE)
+    head_used = 0
+    tail_used = 0
+
+    start = 0
+    while start < len(lines) and head_used + line_tokens[start] <= head_budget:
+        kept[start] = lines[start]
+        head_used += line_tokens[start]
+        start += 1
+    end = len(lines) - 1
+    while end >= start and tail_used + line_tokens[end] <= tail_budget:
+        kept[end] = lines[end]
+        tail_used += line_tokens[end]
+        end -= 1
+
+    # Lines at the edges of the gap are clipped rather than dropped, so that a single huge line
+    # (a minified log, a crash dump) still keeps its start and its end.
+    if start <= end:
+        _clip_edges(
+            lines, kept, start, end, head_budget - head_used, tail_budget - tail_used, count_tokens
+        )
+        head_used += count_tokens(kept.get(start, "")) + 1
+        tail_used += count_tokens(kept.get(end, "")) + 1
+        start += 1
+        end -= 1
+
+    # Leave room for the omission markers when filling the rest with headings.
+    remaining = max_tokens - head_used - tail_used - 2 * count_tokens(OMITTED_MARKER)
+    for index in range(start, end + 1):
+        if HEADING_PATTERN.match(lines[index]) and line_tokens[index] <= remaining:
+            kept[index] = lines[index]
+            remaining -= line_tokens[index]
+            remaining -= count_tokens(OMITTED_MARKER)
+
+    return _join_kept(lines, kept)
+
+
+def truncate_body(body, max_tokens, count_tokens=estimate_tokens):
+    """Fit an issue body into ``max_tokens``.
+
+    Keeps the start and the end of the body plus the Markdown headings in between, and marks
+    every gap. With ``estimate_tokens`` only ``1 - ESTIMATE_MARGIN`` of the budget is used.
+    Returns ``(text, original_tokens, kept_tokens)``.
+    """
+    original_tokens = count_tokens(body)
+    budget = max_tokens
+    if max_tokens and count_tokens is estimate_tokens:
+        budget = max(int(max_tokens * (1 - ESTIMATE_MARGIN)), 1)
+    if not budget or original_tokens <= budget:
+        return body, original_tokens, original_tokens
+
+    lines = body.splitlines()
+    limit = budget
+    while True:
+        text = _truncate_lines(lines, limit, count_tokens)
+        kept_tokens = count_tokens(text)
+        # Lines are counted one by one, so the joined text can come out a few tokens over.
+        if kept_tokens <= budget or limit <= 1:
+            return text, original_tokens, kept_tokens
+        limit = max(limit - (kept_tokens - budget), 1)
@@ -0,0 +1,245 @@
+import contextvars
+import functools
+import inspect
+import json
+import os
+import secrets
+import threading
+import time
+from contextlib import aclosing, contextmanager, nullcontext
+
+SERVICE_NAME = "issue-title-ai"
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    __slots__ = ("attributes", "end", "error", "name", "parent_id", "span_id", "start", "trace_id")
+
+    def __init__(self, name, trace_id, parent_id, start, attributes):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.start = start
+        self.end = None
+        self.attributes = attributes
+        self.error = None
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+
+class _NoopSpan:
+    def set_attribute(self, key, value):
+        return
+
+
+NOOP_SPAN = _NoopSpan()
+# Returned by ``span`` while tracing is off, so an untraced call costs one global lookup.
+_NOOP_CONTEXT = nullcontext(NOOP_SPAN)
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        # OTLP/JSON encodes 64-bit integers as strings.
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes):
+    return [
+        {"key": key, "value": _otlp_value(value)}
+        for key, value in attributes.items()
+        if value is not None
+    ]
+
+
+class Tracer:
+    """Collects spans in memory and exports them as an OTLP/JSON file.
+
+    The file follows the OpenTelemetry protocol's JSON encoding (``resourceSpans``), so it can be
+    loaded into tools that read OTLP files, e.g. the OpenTelemetry collector's ``otlpjsonfile``
+    receiver or otel-desktop-viewer, without running a collector during the run.
+    """
+
+    def __init__(self, service_name=SERVICE_NAME, clock=time.time_ns):
+        self.service_name = service_name
+        self.clock = clock
+        self.spans = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name, attributes):
+        parent = _current_span.get()
+        trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        span = Span(name, trace_id, parent.span_id if parent else None, self.clock(), attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as error:
+            span.error = f"{type(error).__name__}: {error}"
+            raise
+        finally:
+            span.end = self.clock()
+            _current_span.reset(token)
+            with self._lock:
+                self.spans.append(span)
+
+    def to_otlp(self):
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span.start)
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": _otlp_attributes({"service.name": self.service_name})
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "issue_title_ai"},
+                            "spans": [self._otlp_span(span) for span in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+
+    @staticmethod
+    def _otlp_span(span):
+        data = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            # SPAN_KIND_INTERNAL, or SPAN_KIND_CLIENT for outgoing requests.
+            "kind": 3 if span.name.startswith("HTTP ") else 1,
+            "startTimeUnixNano": str(span.start),
+            "endTimeUnixNano": str(span.end),
+            "attributes": _otlp_attributes(span.attributes),
+            # STATUS_CODE_OK or STATUS_CODE_ERROR.
+            "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+        }
+        if span.parent_id:
+            data["parentSpanId"] = span.parent_id
+        return data
+
+    def export(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.to_otlp(), f)
+        return len(self.spans)
+
+
+_tracer = None
+
+
+def set_tracer(tracer):
+    global _tracer
+    _tracer = tracer
+
+
+def span(name, attributes=None):
+    """Context manager timing the block as a span of the current ``Tracer``, if there is one."""
+    tracer = _tracer
+    if tracer is None:
+        return _NOOP_CONTEXT
+    return tracer.span(name, dict(attributes or {}))
+
+
+def set_span_attributes(attributes):
+    """Add attributes to the innermost open span, e.g. token counts known only at the end."""
+    if _tracer is None:
+        return
+    current = _current_span.get()
+    if current is not None:
+        current.attributes.update(attributes)
+
+
+def _traced_generators(func, open_span):
+    """Wrap a generator or async generator function so its span covers the whole iteration."""
+    if inspect.isasyncgenfunction(func):
+
+        @functools.wraps(func)
+        async def async_gen_wrapper(*args, **kwargs):
+            # Closing the wrapper closes the wrapped generator before the span ends.
+            with open_span(args, kwargs):
+                async with aclosing(func(*args, **kwargs)) as items:
+                    async for item in items:
+                        yield item
+
+        return async_gen_wrapper
+
+    @functools.wraps(func)
+    def gen_wrapper(*args, **kwargs):
+        with open_span(args, kwargs):
+            return (yield from func(*args, **kwargs))
+
+    return gen_wrapper
+
+
+def traced(name, attributes=None):
+    """Decorate a function, coroutine function or (async) generator function to run in a span.
+
+    ``attributes`` is called with the function's arguments and returns the span attributes. A
+    generator's span stays open until it is exhausted or closed, so it covers the requests made
+    while it is consumed; consume it in one context, as ``prefetch`` and ``aprefetch`` do.
+    """
+
+    def open_span(args, kwargs):
+        if _tracer is None:
+            return _NOOP_CONTEXT
+        return span(name, attributes(*args, **kwargs) if attributes else None)
+
+    def decorate(func):
+        if inspect.isasyncgenfunction(func) or inspect.isgeneratorfunction(func):
+            return _traced_generators(func, open_span)
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if _tracer is None:
+                    return await func(*args, **kwargs)
+                with span(name, attributes(*args, **kwargs) if attributes else None):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _tracer is None:
+                return func(*args, **kwargs)
+            with span(name, attributes(*args, **kwargs) if attributes else None):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def issue_attributes(self, issue, *args, **kwargs):
+    return {"issue.number": issue.number}
+
+
+def repo_attributes(self, repo, *args, **kwargs):
+    name = repo if isinstance(repo, str) else getattr(repo, "full_name", None)
+    return {"github.repository": name if isinstance(name, str) else None}
+
+
+def http_attributes(response):
+    """Status and body size of a ``requests`` or ``httpx`` response, without reading the body."""
+    length = response.headers.get("Content-Length")
+    return {
+        "http.status_code": response.status_code,
+        "http.response_content_length": int(length) if length and length.isdigit() else None,
+    }
+
+
+def byte_size(text):
+    return len(text.encode("utf-8")) if text else 0
@@ -0,0 +1,279 @@
+import asyncio
+import contextvars
+import queue
+import threading
+
+from .github_queries import build_write_mutation, failed_writes
+from .run_report import timed
+
+DEFAULT_WRITE_BATCH_SIZE = 25
+
+
+class _PendingIssue:
+    def __init__(self, issue, writes, result):
+        self.issue = issue
+        self.writes = writes
+        self.result = result
+        self.failed = False
+
+    def fail(self, method, message):
+        number = self.issue.number
+        if method == "add_issue_label":
+            # Like ``add_issue_label``, a missing skip label doesn't fail the issue.
+            print(f"Error adding label to issue #{number}: {message}")
+        else:
+            print(f"Warning: Error processing issue #{number}: {message}")
+            self.result["error"] = message
+            if method == "update_issue_title":
+                self.result["updated"] = False
+        self.failed = True
+
+
+def _write_rest(github_client, pending, pacer=None):
+    for method, args, message in pending.writes:
+        if pacer:
+            pacer.wait()
+        try:
+            with timed(f"write:{method}", pending.issue.number):
+                getattr(github_client, method)(pending.issue, *args)
+        except Exception as error:
+            pending.fail(method, str(error))
+            return
+        if message:
+            print(message)
+
+
+async def _write_rest_async(github_client, pending, pacer=None):
+    for method, args, message in pending.writes:
+        if pacer:
+            await _pace(pacer)
+        try:
+            with timed(f"write:{method}", pending.issue.number):
+                await getattr(github_client, method)(pending.issue, *args)
+        except Exception as error:
+            pending.fail(method, str(error))
+            return
+        if message:
+            print(message)
+
+
+async def _pace(pacer):
+    delay = pacer.reserve()
+    if delay > 0:
+        await asyncio.sleep(delay)
+
+
+class WriteLane:
+    """Sends the writes of all issues from one background thread, paced by a ``WritePacer``.
+
+    Workers hand an issue's writes over and move on, so model requests and reads keep their
+    concurrency while writes drain one at a time, at a rate GitHub's secondary rate limits accept.
+    ``flush`` waits for the queue to drain; failed issues get an ``error`` in their result.
+    """
+
+    def __init__(self, github_client, pacer=None):
+        self.github_client = github_client
+        self.pacer = pacer
+        self.queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+        # The worker runs in the creator's context, so its tracing spans belong to the run.
+        self._context = contextvars.copy_context()
+
+    def add(self, issue, writes, result):
+        if not writes:
+            return
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._context.copy().run, args=(self._drain,), daemon=True
+                )
+                self._worker.start()
+        self.queue.put(_PendingIssue(issue, writes, result))
+
+    def _drain(self):
+        while True:
+            pending = self.queue.get()
+            try:
+                if pending is None:
+                    return
+                _write_rest(self.github_client, pending, self.pacer)
+            finally:
+                self.queue.task_done()
+
+    def flush(self):
+        with self._lock:
+            worker, self._worker = self._worker, None
+        if worker:
+            self.queue.put(None)
+            worker.join()
+
+
+class AsyncWriteLane:
+    """``WriteLane`` for the async clients: one task drains the writes of every issue."""
+
+    def __init__(self, github_client, pacer=None):
+        self.github_client = github_client
+        self.pacer = pacer
+        self.queue = None
+        self._worker = None
+
+    def add(self, issue, writes, result):
+        if not writes:
+            return
+        if self._worker is None:
+            self.queue = asyncio.Queue()
+            self._worker = asyncio.get_running_loop().create_task(self._drain())
+        self.queue.put_nowait(_PendingIssue(issue, writes, result))
+
+    async def _drain(self):
+        while True:
+            pending = await self.queue.get()
+            try:
+                await _write_rest_async(self.github_client, pending, self.pacer)
+            finally:
+                self.queue.task_done()
+
+    async def flush(self):
+        if self._worker is None:
+            return
+        await self.queue.join()
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+
+class _WriteBack:
+    """Collects the writes ``IssueProcessor`` planned and sends them as batched GraphQL mutations.
+
+    The n-th write of every issue goes into round n, so a title edit succeeded before the comment
+    announcing it is posted, and an issue with a failed write gets no further writes (no skip
+    label, so the next run retries it). A round takes one request per ``batch_size`` issues
+    instead of one per write. Issues without a node id are written over REST as before. Every
+    request waits for a slot of the optional ``WritePacer``.
+    """
+
+    def __init__(self, github_client, repo_name, batch_size=DEFAULT_WRITE_BATCH_SIZE, pacer=None):
+        self.github_client = github_client
+        self.repo_name = repo_name
+        self.batch_size = batch_size
+        self.pacer = pacer
+        # Label name -> node id, resolved once per run.
+        self.label_ids = {}
+        self.pending = []
+        self.requests = 0
+        self.writes = 0
+        self._lock = threading.Lock()
+
+    def add(self, issue, writes, result):
+        if writes:
+            with self._lock:
+                self.pending.append(_PendingIssue(issue, writes, result))
+
+    def _take(self):
+        with self._lock:
+            pending, self.pending = self.pending, []
+        bulk = [p for p in pending if isinstance(getattr(p.issue, "node_id", None), str)]
+        rest = [p for p in pending if not isinstance(getattr(p.issue, "node_id", None), str)]
+        return bulk, rest
+
+    def _missing_labels(self, pending):
+        names = {
+            args[0]
+            for p in pending
+            for method, args, _ in p.writes
+            if method == "add_issue_label" and args[0] not in self.label_ids
+        }
+        return sorted(names)
+
+    def _rounds(self, pending):
+        # Lazy on purpose: the issues of a round are picked once the previous round was handled.
+        step = 0
+        while True:
+            active = [p for p in pending if not p.failed and step < len(p.writes)]
+            if not active:
+                return
+            for start in range(0, len(active), self.batch_size):
+                yield step, active[start : start + self.batch_size]
+            step += 1
+
+    def _mutation(self, step, chunk):
+        writes = []
+        for pending in chunk:
+            method, args, _ = pending.writes[step]
+            value = self.label_ids[args[0]] if method == "add_issue_label" else args[0]
+            writes.append((method, pending.issue.node_id, value))
+        self.requests += 1
+        self.writes += len(writes)
+        return build_write_mutation(writes)
+
+    @staticmethod
+    def _handle(step, chunk, payload):
+        failures = failed_writes(payload, len(chunk))
+        for n, pending in enumerate(chunk):
+            method, _, message = pending.writes[step]
+            if n in failures:
+                pending.fail(method, failures[n])
+            elif message:
+                print(message)
+
+    def summary(self):
+        return f"Write-back: {self.writes} writes sent in {self.requests} GraphQL requests"
+
+
+class GraphQLWriteBack(_WriteBack):
+    def flush(self):
+        """Send the collected writes, updating the results of failed issues in place."""
+        bulk, rest = self._take()
+        try:
+            for name in self._missing_labels(bulk):
+                self.label_ids[name] = self.github_client.get_label_id(self.repo_name, name)
+        except Exception as error:
+            print(f"Error resolving label, writing back over REST: {error!s}")
+            bulk, rest = [], bulk + rest
+
+        for step, chunk in self._rounds(bulk):
+            document, variables = self._mutation(step, chunk)
+            if self.pacer:
+                self.pacer.wait()
+            try:
+                with timed("write:graphql"):
+                    payload = self.github_client.graphql(document, variables, partial=True)
+            except Exception as error:
+                payload = {"errors": [{"message": str(error)}]}
+            self._handle(step, chunk, payload)
+
+        for pending in rest:
+            _write_rest(self.github_client, pending, self.pacer)
+        if bulk:
+            print(self.summary())
+
+
+class AsyncGraphQLWriteBack(_WriteBack):
+    async def flush(self):
+        bulk, rest = self._take()
+        try:
+            for name in self._missing_labels(bulk):
+                self.label_ids[name] = await self.github_client.get_label_id(self.repo_name, name)
+        except Exception as error:
+            print(f"Error resolving label, writing back over REST: {error!s}")
+            bulk, rest = [], bulk + rest
+
+        for step, chunk in self._rounds(bulk):
+            document, variables = self._mutation(step, chunk)
+            if self.pacer:
+                await _pace(self.pacer)
+            try:
+                with timed("write:graphql"):
+                    payload = await self.github_client.graphql(document, variables, partial=True)
+            except Exception as error:
+                payload = {"errors": [{"message": str(error)}]}
+            self._handle(step, chunk, payload)
+
+        for pending in rest:
+            await _write_rest_async(self.github_client, pending, self.pacer)
+        if bulk:
+            print(self.summary())
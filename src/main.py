@@ -1,26 +1,49 @@
 """IssueTitleAI: GitHub issue title improvement tool."""
 
+import asyncio
+import datetime
+import os
 import sys
+import threading
 
+from core.async_github_client import AsyncGitHubClient
+from core.concurrency import aprefetch, gather_bounded, map_bounded, prefetch
 from core.github_client import GitHubClient
+from core.github_http_cache import GitHubResponseCache
+from core.github_rate_limit import WritePacer
+from core.hedging import AsyncHedgedAIClient, HedgedAIClient, HedgeStats
 from core.issue_service import IssueProcessor
-from core.llm import create_ai_client
+from core.llm import create_ai_client, create_async_ai_client, set_http_pool_size
+from core.llm_rate_limit import AsyncRateLimitedAIClient, ProviderRateLimiter, RateLimitedAIClient
 from core.pre_checks import block_user_title_edit
+from core.response_cache import AsyncCachedAIClient, CachedAIClient, ResponseCache
+from core.run_report import (
+    RunReport,
+    is_improved,
+    set_run_report,
+    timed_aiteration,
+    timed_iteration,
+)
+from core.scan_state import ScanState, VerdictStore, utc_now
 from core.settings import Config
+from core.tokens import get_token_counter, resolve_max_body_tokens
+from core.tracing import Tracer, set_tracer, span
 from core.verbose import set_verbose
+from core.write_back import AsyncGraphQLWriteBack, AsyncWriteLane, GraphQLWriteBack, WriteLane
+
+# Issues discovered ahead of the ones being processed: one page of the issue listing.
+DISCOVERY_BUFFER = 100
 
 
 def open_issue_event(config, repo_obj, ai_client, github_client):
     print(f"Processing single issue #{config.issue_number} from event trigger")
     try:
-        issue = repo_obj.get_issue(config.issue_number)
+        issue = github_client.get_issue(repo_obj, config.issue_number)
 
         if block_user_title_edit(config.event_data, config.skip_label, github_client, issue):
             return []
 
-        issue_processor = IssueProcessor(
-            ai_client, github_client, config.prompt, config.skip_label, config.required_labels
-        )
+        issue_processor = build_issue_processor(config, ai_client, github_client)
         result = issue_processor.process_issue(
             issue=issue,
             auto_update=config.auto_update,
@@ -28,73 +51,467 @@ def open_issue_event(config, repo_obj, ai_client, github_client):
             quiet=config.quiet,
             description_min_skip=config.description_min_skip,
         )
+        save_verdicts(issue_processor)
         return [result]
     except Exception as e:
         print(f"Error processing issue #{config.issue_number}: {e!s}")
         return []
 
 
-def scan_issue_event(config, repo_obj, ai_client, github_client):
+def scan_issue_event(config, repo_obj, ai_client, github_client, updated_since=None):
     print("Regular scheduled run - process all recent issues")
-    recent_issues = github_client.get_recent_issues(
-        repo=repo_obj,
-        days_to_scan=config.days_to_scan,
-        limit=config.max_issues,
-        required_labels=config.required_labels,
-        apply_to_closed=config.apply_to_closed,
+    print(f"Processing `{issue_state(config)}` issues as they are found")
+    # Issues are processed while the next page is fetched, at most one page ahead.
+    recent_issues = prefetch(
+        timed_iteration(
+            "discovery", discover_recent_issues(config, repo_obj, github_client, updated_since)
+        ),
+        DISCOVERY_BUFFER,
     )
 
-    if not recent_issues:
-        message = f"No open issues found in the last {config.days_to_scan} days"
-        if config.required_labels:
-            message += f" with the following labels: {', '.join(config.required_labels)}"
-        print(message)
-        return []
+    write_back = build_write_back(config, github_client)
+    issue_processor = build_issue_processor(config, ai_client, github_client, write_back)
+
+    def process(numbered_issue):
+        i, issue = numbered_issue
+        print(f"[{i}] Processing issue #{issue.number}")
+        return issue_processor.process_issue(
+            issue=issue,
+            auto_update=config.auto_update,
+            strip_characters=config.strip_characters,
+            quiet=config.quiet,
+            description_min_skip=config.description_min_skip,
+        )
+
+    try:
+        if config.batch_size > 1:
+            # Batches are packed from the whole listing, so it's read completely first.
+            results = issue_processor.process_issues_batched(
+                list(recent_issues),
+                batch_size=config.batch_size,
+                max_batch_tokens=config.batch_max_tokens,
+                max_workers=config.max_concurrency,
+                auto_update=config.auto_update,
+                strip_characters=config.strip_characters,
+                quiet=config.quiet,
+                description_min_skip=config.description_min_skip,
+            )
+        else:
+            results = map_bounded(
+                process,
+                enumerate(recent_issues, 1),
+                max_workers=config.max_concurrency,
+                on_error=numbered_issue_error,
+            )
+    finally:
+        # Also after a failed listing page: titles generated up to there are still written.
+        write_back.flush()
+        save_verdicts(issue_processor)
 
-    issue_state = "open and closed" if config.apply_to_closed else "open"
-    print(f"Found {len(recent_issues)} `{issue_state}` issues to process")
+    return finish_scan(config, results)
 
-    issue_processor = IssueProcessor(
-        ai_client, github_client, config.prompt, config.skip_label, config.required_labels
+
+async def scan_issue_event_async(config, repo_obj, ai_client, github_client, updated_since=None):
+    print("Regular scheduled run - process all recent issues (async)")
+    print(f"Processing `{issue_state(config)}` issues as they are found")
+    recent_issues = aprefetch(
+        timed_aiteration(
+            "discovery", discover_recent_issues(config, repo_obj, github_client, updated_since)
+        ),
+        DISCOVERY_BUFFER,
     )
 
-    results = []
-    for i, issue in enumerate(recent_issues, 1):
-        print(f"[{i}/{len(recent_issues)}] Processing issue #{issue.number}")
-        result = issue_processor.process_issue(
+    write_back = build_write_back(config, github_client, asynchronous=True)
+    issue_processor = build_issue_processor(config, ai_client, github_client, write_back)
+
+    async def process(numbered_issue):
+        i, issue = numbered_issue
+        print(f"[{i}] Processing issue #{issue.number}")
+        return await issue_processor.process_issue_async(
             issue=issue,
             auto_update=config.auto_update,
             strip_characters=config.strip_characters,
             quiet=config.quiet,
             description_min_skip=config.description_min_skip,
         )
-        results.append(result)
 
-    improved_count = len([r for r in results if r.get("improved_title")])
-    print(f"Summary: {improved_count} of {len(recent_issues)} issues improved")
+    async def numbered(issues):
+        i = 0
+        async for issue in issues:
+            i += 1
+            yield i, issue
+
+    try:
+        if config.batch_size > 1:
+            results = await issue_processor.process_issues_batched_async(
+                [issue async for issue in recent_issues],
+                batch_size=config.batch_size,
+                max_batch_tokens=config.batch_max_tokens,
+                max_concurrency=config.max_concurrency,
+                auto_update=config.auto_update,
+                strip_characters=config.strip_characters,
+                quiet=config.quiet,
+                description_min_skip=config.description_min_skip,
+            )
+        else:
+            results = await gather_bounded(
+                process,
+                numbered(recent_issues),
+                max_concurrency=config.max_concurrency,
+                on_error=numbered_issue_error,
+            )
+    finally:
+        await write_back.flush()
+        save_verdicts(issue_processor)
+
+    return finish_scan(config, results)
+
+
+def issue_state(config):
+    return "open and closed" if config.apply_to_closed else "open"
+
+
+def numbered_issue_error(numbered_issue, error):
+    _, issue = numbered_issue
+    print(f"Error processing issue #{issue.number}: {error!s}")
+    return {"issue_number": issue.number, "error": str(error)}
+
+
+def finish_scan(config, results):
+    if not results:
+        print_no_issues_found(config)
+        return []
+    print_summary(results)
     return results
 
 
-def run():
+async def run_async(config, response_cache=None, hedge_stats=None):
+    ai_client = build_async_ai_client(config, response_cache, hedge_stats)
+    github_client = AsyncGitHubClient(
+        config.github_token, base_url=config.github_api_url, graphql_url=config.github_graphql_url
+    )
+    # Connect to the model provider while issues are being discovered.
+    warm_up = asyncio.create_task(ai_client.warm_up())
+    scan_state = build_scan_state(config)
     try:
-        config = Config()
-        config.validate()
+        print(f"Scanning repository: {config.repo_name}")
+        repo_obj = await github_client.get_repository(config.repo_name)
+        scanned_at = utc_now()
+        results = await scan_issue_event_async(
+            config, repo_obj, ai_client, github_client, scan_since(config, scan_state)
+        )
+        save_scan_cursor(config, scan_state, scanned_at, results)
+        return results
+    finally:
+        await warm_up
+        await github_client.aclose()
+        await ai_client.aclose()
+
+
+def discover_recent_issues(config, repo_obj, github_client, updated_since=None):
+    """Iterate the recent issues from the discovery backend selected by ``config.discovery``.
+
+    Works for both clients: with ``AsyncGitHubClient`` the result is an async iterator.
+    """
+    kwargs = {
+        "repo": repo_obj,
+        "days_to_scan": config.days_to_scan,
+        "limit": config.max_issues,
+        "required_labels": config.required_labels,
+        "apply_to_closed": config.apply_to_closed,
+    }
+    if updated_since:
+        kwargs["updated_since"] = updated_since
+    if config.discovery == "graphql":
+        return github_client.iter_recent_issues_graphql(**kwargs)
+    if config.discovery == "search":
+        return github_client.iter_recent_issues_search(**kwargs, skip_label=config.skip_label)
+    return github_client.iter_recent_issues(**kwargs)
+
+
+def build_scan_state(config):
+    if not config.state_file:
+        return None
+    return ScanState(
+        config.state_file, overlap=datetime.timedelta(minutes=config.scan_overlap_minutes)
+    )
+
+
+def scan_since(config, scan_state):
+    if not scan_state:
+        return None
+    if config.full_rescan:
+        print("Full rescan requested, ignoring the scan cursor")
+        return None
+    return scan_state.since(config.repo_name)
+
+
+def save_scan_cursor(config, scan_state, scanned_at, results):
+    """Advance the scan cursor, unless issues of this scan may be left unprocessed."""
+    if not scan_state:
+        return
+    if len(results) >= config.max_issues or any(result.get("error") for result in results):
+        print("Scan cursor not advanced: the issue limit was reached or some issues failed")
+        return
+    scan_state.advance(config.repo_name, scanned_at, [result["issue_number"] for result in results])
+
+
+def build_issue_processor(config, ai_client, github_client, write_back=None):
+    return IssueProcessor(
+        ai_client,
+        github_client,
+        config.prompt,
+        config.skip_label,
+        config.required_labels,
+        max_body_tokens=resolve_max_body_tokens(config.ai_provider, config.max_body_tokens),
+        count_tokens=get_token_counter(config.ai_provider, config.model_name),
+        stream=config.stream,
+        max_output_tokens=config.max_output_tokens,
+        verdicts=build_verdict_store(config),
+        write_back=write_back,
+    )
+
+
+def build_write_back(config, github_client, asynchronous=False):
+    """Take GitHub writes out of the per-issue flow, into one paced queue or GraphQL batches."""
+    pacer = WritePacer(config.write_interval_ms / 1000, config.writes_per_minute)
+    if config.write_back == "graphql":
+        write_back_cls = AsyncGraphQLWriteBack if asynchronous else GraphQLWriteBack
+        return write_back_cls(github_client, config.repo_name, config.write_batch_size, pacer)
+    write_lane_cls = AsyncWriteLane if asynchronous else WriteLane
+    return write_lane_cls(github_client, pacer)
+
+
+def build_verdict_store(config):
+    if not config.state_file:
+        return None
+    return VerdictStore(config.state_file, config.repo_name, config.prompt)
 
-        print(f"Using {config.ai_provider} with model: {config.model_name}")
-        set_verbose(config.verbose)
 
+def save_verdicts(issue_processor):
+    if issue_processor.verdicts:
+        issue_processor.verdicts.save()
+
+
+def build_rate_limiter(config, provider=None, model_name=None):
+    provider = provider or config.ai_provider
+    return ProviderRateLimiter(
+        provider,
+        requests_per_minute=config.requests_per_minute,
+        tokens_per_minute=config.tokens_per_minute,
+        max_retries=config.max_retries,
+        retry_budget=config.retry_budget,
+        count_tokens=get_token_counter(provider, model_name),
+    )
+
+
+def build_ai_client(config, response_cache=None, hedge_stats=None):
+    def provider_client(provider, ai_client):
+        limiter = build_rate_limiter(config, provider, ai_client.model_name)
+        ai_client = RateLimitedAIClient(ai_client, limiter)
+        if response_cache:
+            # Every provider caches the answers it gave itself. Cache hits are served before the
+            # rate limiter, so they don't use up any budget.
+            ai_client = CachedAIClient(ai_client, response_cache, provider)
+        return ai_client
+
+    if config.fallback_providers:
+        ai_client = create_ai_client(config.provider_chain(), wrap=provider_client)
+    else:
         ai_client = create_ai_client(
+            provider=config.ai_provider,
+            api_key=config.get_api_key(),
+            model_name=config.model_name,
+        )
+        ai_client = provider_client(config.ai_provider, ai_client)
+    if hedge_stats:
+        secondary = create_ai_client(
+            provider=config.hedge_provider, api_key=config.get_api_key(config.hedge_provider)
+        )
+        ai_client = HedgedAIClient(
+            ai_client,
+            provider_client(config.hedge_provider, secondary),
+            config.ai_provider,
+            config.hedge_provider,
+            hedge_stats,
+            delay=config.hedge_delay_ms / 1000,
+        )
+    return ai_client
+
+
+def build_async_ai_client(config, response_cache=None, hedge_stats=None):
+    def provider_client(provider, ai_client):
+        limiter = build_rate_limiter(config, provider, ai_client.model_name)
+        ai_client = AsyncRateLimitedAIClient(ai_client, limiter)
+        if response_cache:
+            ai_client = AsyncCachedAIClient(ai_client, response_cache, provider)
+        return ai_client
+
+    if config.fallback_providers:
+        ai_client = create_async_ai_client(config.provider_chain(), wrap=provider_client)
+    else:
+        ai_client = create_async_ai_client(
             provider=config.ai_provider, api_key=config.get_api_key(), model_name=config.model_name
         )
-        github_client = GitHubClient(config.github_token)
+        ai_client = provider_client(config.ai_provider, ai_client)
+    if hedge_stats:
+        secondary = create_async_ai_client(
+            provider=config.hedge_provider, api_key=config.get_api_key(config.hedge_provider)
+        )
+        ai_client = AsyncHedgedAIClient(
+            ai_client,
+            provider_client(config.hedge_provider, secondary),
+            config.ai_provider,
+            config.hedge_provider,
+            hedge_stats,
+            delay=config.hedge_delay_ms / 1000,
+        )
+    return ai_client
+
+
+def build_hedge_stats(config):
+    if not config.hedge:
+        return None
+    if not config.cache_dir:
+        return HedgeStats()
+    # Primary provider latencies are kept in the cache directory, so that runs handling a single
+    # issue get a hedge delay based on earlier runs.
+    return HedgeStats.load(
+        os.path.join(config.cache_dir, "latencies.json"),
+        f"{config.ai_provider}:{config.model_name}",
+    )
+
+
+def save_hedge_stats(config, hedge_stats):
+    print(hedge_stats.summary())
+    if config.cache_dir:
+        hedge_stats.save(
+            os.path.join(config.cache_dir, "latencies.json"),
+            f"{config.ai_provider}:{config.model_name}",
+        )
+
+
+def build_response_cache(config):
+    if not config.cache_dir:
+        return None
+    return ResponseCache(
+        config.cache_dir,
+        ttl_seconds=config.cache_ttl_days * 24 * 3600,
+        max_entries=config.cache_max_entries,
+    )
+
+
+def build_github_cache(config):
+    if not config.github_cache_dir:
+        return None
+    return GitHubResponseCache(config.github_cache_dir)
+
 
+def print_no_issues_found(config):
+    message = f"No open issues found in the last {config.days_to_scan} days"
+    if config.required_labels:
+        message += f" with the following labels: {', '.join(config.required_labels)}"
+    print(message)
+
+
+def write_run_report(config, report, results):
+    """Write the run report as JSON (``report-file``), job summary and step outputs."""
+    report.finish(results)
+    if config.report_file:
+        report.write_json(config.report_file)
+        print(f"Run report written to {config.report_file}")
+    if config.step_summary and config.step_summary_path:
+        report.write_step_summary(config.step_summary_path)
+    if config.output_path:
+        report.write_outputs(config.output_path)
+
+
+def print_summary(results):
+    improved_count = len([r for r in results if is_improved(r)])
+    print(f"Summary: {improved_count} of {len(results)} issues improved")
+
+
+def run_sync(config, response_cache=None, github_cache=None, hedge_stats=None):
+    ai_client = build_ai_client(config, response_cache, hedge_stats)
+    # Connect to the model provider while the issues are being fetched.
+    threading.Thread(target=ai_client.warm_up, daemon=True).start()
+    github_client = GitHubClient(
+        config.github_token,
+        http_cache=github_cache,
+        base_url=config.github_api_url,
+        graphql_url=config.github_graphql_url,
+    )
+
+    try:
         print(f"Scanning repository: {config.repo_name}")
         repo_obj = github_client.get_repository(config.repo_name)
 
         if config.is_issue_event and config.issue_number:
-            open_issue_event(config, repo_obj, ai_client, github_client)
-        else:
-            scan_issue_event(config, repo_obj, ai_client, github_client)
+            return open_issue_event(config, repo_obj, ai_client, github_client)
+        scan_state = build_scan_state(config)
+        scanned_at = utc_now()
+        results = scan_issue_event(
+            config, repo_obj, ai_client, github_client, scan_since(config, scan_state)
+        )
+        save_scan_cursor(config, scan_state, scanned_at, results)
+        return results
+    finally:
+        if hedge_stats:
+            # Requests that lost a hedge are still running; their usage belongs in the report.
+            ai_client.settle()
+
+
+def build_tracer(config):
+    if not config.trace_file:
+        return None
+    return Tracer()
+
+
+def export_trace(config, tracer):
+    if tracer:
+        count = tracer.export(config.trace_file)
+        print(f"Trace with {count} spans written to {config.trace_file}")
+
+
+def run():
+    try:
+        config = Config()
+        config.validate()
+
+        print(f"Using {config.ai_provider} with model: {config.model_name}")
+        set_verbose(config.verbose)
+        set_http_pool_size(config.max_concurrency)
+
+        report = RunReport()
+        set_run_report(report)
+        tracer = build_tracer(config)
+        set_tracer(tracer)
+        response_cache = build_response_cache(config)
+        github_cache = build_github_cache(config)
+        hedge_stats = build_hedge_stats(config)
+        single_issue = config.is_issue_event and config.issue_number
+        try:
+            with span("run", {"github.repository": config.repo_name}):
+                if config.execution_mode == "async" and not single_issue:
+                    results = asyncio.run(run_async(config, response_cache, hedge_stats))
+                else:
+                    results = run_sync(config, response_cache, github_cache, hedge_stats)
+        finally:
+            # Also after a failed run, which is when a trace helps most.
+            export_trace(config, tracer)
+
+        if hedge_stats:
+            save_hedge_stats(config, hedge_stats)
+        if response_cache:
+            response_cache.prune()
+            print(response_cache.summary())
+            report.add_cache("llm", response_cache.hits, response_cache.misses)
+        if github_cache:
+            github_cache.prune()
+            print(github_cache.summary())
+            # A 304 Not Modified is a hit; a full response replacing the entry is a miss.
+            report.add_cache("github", github_cache.not_modified, github_cache.fetched)
+        write_run_report(config, report, results)
 
     except Exception as error:
         print(f"Error: {error!s}")
@@ -7,3 +7,8 @@ class RegexStr:
 
     def __eq__(self, other):
         return bool(self.pattern.search(other))
+
+
+async def async_iter(items):
+    for item in items:
+        yield item
@@ -0,0 +1,251 @@
+import asyncio
+import datetime
+import json
+
+import httpx
+import pytest
+
+from src.core.async_github_client import AsyncGitHubClient
+from src.core.issue_record import IssueRecord
+
+REPO = {"full_name": "owner/repo"}
+
+
+def issue_payload(number, days_ago=0, labels=(), pull_request=None):
+    created_at = datetime.datetime.now() - datetime.timedelta(days=days_ago)
+    return {
+        "number": number,
+        "title": f"Title {number}",
+        "body": "Body",
+        "labels": [{"name": name} for name in labels],
+        "created_at": created_at.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "url": f"https://api.github.com/repos/owner/repo/issues/{number}",
+        "node_id": f"I_{number}",
+        "pull_request": pull_request,
+    }
+
+
+def make_client(handler):
+    return AsyncGitHubClient("valid-token", transport=httpx.MockTransport(handler))
+
+
+def test_init_without_token():
+    with pytest.raises(ValueError, match="GitHub token not provided"):
+        AsyncGitHubClient("")
+
+
+def test_get_repository():
+    def handler(request):
+        assert request.url.path == "/repos/owner/repo"
+        assert request.headers["Authorization"] == "Bearer valid-token"
+        return httpx.Response(200, json=REPO)
+
+    client = make_client(handler)
+    assert asyncio.run(client.get_repository("owner/repo")) == REPO
+
+
+def test_get_repository_error():
+    client = make_client(lambda request: httpx.Response(404, json={"message": "Not Found"}))
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(client.get_repository("owner/repo"))
+
+
+def test_get_recent_issues_paginates_and_filters():
+    pages = {
+        "1": [issue_payload(1), issue_payload(2, pull_request={"url": "pr"})],
+        "2": [issue_payload(3, labels=["bug"]), issue_payload(4, days_ago=10)],
+    }
+
+    def handler(request):
+        page = request.url.params.get("page", "1")
+        headers = {}
+        if page == "1":
+            headers["Link"] = (
+                '<https://api.github.com/repos/owner/repo/issues?page=2&state=open>; rel="next"'
+            )
+        else:
+            assert request.url.params["state"] == "open"
+        return httpx.Response(200, json=pages[page], headers=headers)
+
+    client = make_client(handler)
+    issues = asyncio.run(client.get_recent_issues(REPO, days_to_scan=5))
+
+    assert [issue.number for issue in issues] == [1, 3]
+    assert all(isinstance(issue, IssueRecord) for issue in issues)
+    assert issues[1].label_names == ("bug",)
+    assert issues[1].repo == "owner/repo"
+
+
+def test_get_recent_issues_with_labels_and_limit():
+    payload = [issue_payload(n, labels=["bug"] if n % 2 else []) for n in range(1, 7)]
+    client = make_client(lambda request: httpx.Response(200, json=payload))
+
+    issues = asyncio.run(client.get_recent_issues(REPO, limit=2, required_labels=["bug"]))
+
+    assert [issue.number for issue in issues] == [1, 3]
+
+
+def test_get_recent_issues_apply_to_closed():
+    def handler(request):
+        assert request.url.params["state"] == "all"
+        return httpx.Response(200, json=[])
+
+    client = make_client(handler)
+    assert asyncio.run(client.get_recent_issues(REPO, apply_to_closed=True)) == []
+
+
+def test_writes():
+    requests = []
+
+    def handler(request):
+        requests.append((request.method, request.url.path, json.loads(request.content)))
+        return httpx.Response(200, json={"id": 1})
+
+    client = make_client(handler)
+    issue = IssueRecord.from_rest(issue_payload(7), "owner/repo")
+
+    async def write():
+        assert await client.update_issue_title(issue, "New title") is True
+        assert await client.add_issue_comment(issue, "Comment") == {"id": 1}
+        assert await client.add_issue_label(issue, "titled") is True
+        await client.aclose()
+
+    asyncio.run(write())
+
+    assert requests == [
+        ("PATCH", "/repos/owner/repo/issues/7", {"title": "New title"}),
+        ("POST", "/repos/owner/repo/issues/7/comments", {"body": "Comment"}),
+        ("POST", "/repos/owner/repo/issues/7/labels", {"labels": ["titled"]}),
+    ]
+
+
+def test_write_errors():
+    client = make_client(lambda request: httpx.Response(500, json={}))
+    issue = IssueRecord.from_rest(issue_payload(7), "owner/repo")
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(client.update_issue_title(issue, "New title"))
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(client.add_issue_comment(issue, "Comment"))
+    assert asyncio.run(client.add_issue_label(issue, "titled")) is False
+
+
+def test_get_recent_issues_graphql():
+    created_at = datetime.datetime.now().strftime("%Y-%m-%dT%H:%M:%SZ")
+    node = {
+        "id": "I_1",
+        "number": 1,
+        "title": "Title 1",
+        "body": "Body",
+        "createdAt": created_at,
+        "labels": {"nodes": [{"name": "bug"}]},
+    }
+    pages = [
+        {"pageInfo": {"hasNextPage": True, "endCursor": "c1"}, "nodes": [node]},
+        {"pageInfo": {"hasNextPage": False, "endCursor": None}, "nodes": [{**node, "number": 2}]},
+    ]
+    cursors = []
+
+    def handler(request):
+        assert request.url == "https://api.github.com/graphql"
+        variables = json.loads(request.content)["variables"]
+        cursors.append(variables["cursor"])
+        page = pages[len(cursors) - 1]
+        return httpx.Response(200, json={"data": {"repository": {"issues": page}}})
+
+    client = make_client(handler)
+    issues = asyncio.run(client.get_recent_issues_graphql(REPO, required_labels=["bug"]))
+
+    assert [issue.number for issue in issues] == [1, 2]
+    assert issues[1].repo == "owner/repo"
+    assert cursors == [None, "c1"]
+
+
+def test_get_recent_issues_graphql_error():
+    client = make_client(
+        lambda request: httpx.Response(200, json={"errors": [{"message": "Bad query"}]})
+    )
+
+    with pytest.raises(Exception, match="GraphQL request failed: Bad query"):
+        asyncio.run(client.get_recent_issues_graphql(REPO))
+
+
+def test_get_label_id_creates_missing_label():
+    requests = []
+
+    def handler(request):
+        requests.append((request.method, request.url.path))
+        if request.url.path == "/graphql":
+            return httpx.Response(200, json={"data": {"repository": {"label": None}}})
+        assert json.loads(request.content) == {"name": "titled"}
+        return httpx.Response(201, json={"node_id": "LA_1"})
+
+    client = make_client(handler)
+
+    assert asyncio.run(client.get_label_id("owner/repo", "titled")) == "LA_1"
+    assert requests == [("POST", "/graphql"), ("POST", "/repos/owner/repo/labels")]
+
+
+def test_graphql_partial():
+    payload = {"data": {"w0": None}, "errors": [{"message": "locked", "path": ["w0"]}]}
+    client = make_client(lambda request: httpx.Response(200, json=payload))
+
+    assert asyncio.run(client.graphql("mutation", partial=True)) == payload
+
+
+def test_get_recent_issues_search():
+    def handler(request):
+        assert request.url.path == "/search/issues"
+        query = request.url.params["q"]
+        assert query.startswith("repo:owner/repo is:issue is:open created:>=")
+        assert query.endswith('-label:"titled"')
+        assert request.url.params["per_page"] == "2"
+        next_link = '<https://api.github.com/search/issues?page=2>; rel="next"'
+        return httpx.Response(
+            200,
+            json={"items": [issue_payload(1), issue_payload(2)]},
+            headers={"Link": next_link},
+        )
+
+    client = make_client(handler)
+    issues = asyncio.run(client.get_recent_issues_search(REPO, limit=2, skip_label="titled"))
+
+    assert [issue.number for issue in issues] == [1, 2]
+
+
+def test_get_recent_issues_updated_since():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        if request.url.path == "/graphql":
+            issues = {"nodes": [], "pageInfo": {"hasNextPage": False, "endCursor": None}}
+            return httpx.Response(200, json={"data": {"repository": {"issues": issues}}})
+        if request.url.path == "/search/issues":
+            return httpx.Response(200, json={"items": []})
+        return httpx.Response(200, json=[])
+
+    client = make_client(handler)
+    updated_since = datetime.datetime(2099, 5, 1, 12, 0, 0)
+
+    async def discover():
+        await client.get_recent_issues(REPO, updated_since=updated_since)
+        await client.get_recent_issues_graphql(REPO, updated_since=updated_since)
+        await client.get_recent_issues_search(REPO, updated_since=updated_since)
+
+    asyncio.run(discover())
+
+    rest, graphql, search = requests
+    assert rest.url.params["since"] == "2099-05-01T12:00:00Z"
+    assert json.loads(graphql.content)["variables"]["since"] == "2099-05-01T12:00:00Z"
+    assert "updated:>=2099-05-01T12:00:00Z" in search.url.params["q"]
+
+
+def test_get_recent_issues_stops_at_first_old_issue():
+    payload = [issue_payload(1), issue_payload(2, days_ago=10), issue_payload(3)]
+    client = make_client(lambda request: httpx.Response(200, json=payload))
+
+    issues = asyncio.run(client.get_recent_issues(REPO, days_to_scan=5))
+
+    assert [issue.number for issue in issues] == [1]
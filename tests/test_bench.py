@@ -0,0 +1,132 @@
+import json
+import os
+
+import pytest
+import requests
+
+from src.bench.__main__ import main as bench_main
+from src.bench.harness import environment, percentile, run_benchmark
+from src.bench.servers import FakeGitHub, FakeLLM, Recorder
+from src.core.github_client import GitHubClient
+
+pytestmark = pytest.mark.enable_socket
+
+
+def test_percentile():
+    assert percentile([], 0.5) == 0.0
+    values = [float(n) for n in range(1, 21)]
+    assert percentile(values, 0.5) == 10.0
+    assert percentile(values, 0.95) == 19.0
+    assert percentile(values, 1.0) == 20.0
+    assert percentile([3.0], 0.95) == 3.0
+
+
+def test_environment_restores_variables(monkeypatch):
+    monkeypatch.setenv("BENCH_KEEP", "old")
+    monkeypatch.delenv("BENCH_NEW", raising=False)
+
+    with environment({"BENCH_KEEP": None, "BENCH_NEW": "new"}):
+        assert "BENCH_KEEP" not in os.environ
+        assert os.environ["BENCH_NEW"] == "new"
+
+    assert os.environ["BENCH_KEEP"] == "old"
+    assert "BENCH_NEW" not in os.environ
+
+
+def test_fake_github_serves_the_real_client():
+    with FakeGitHub(issues=5, labeled_fraction=1.0, label_rate=0.0, seed=1) as github:
+        client = GitHubClient("token", base_url=github.url, graphql_url=f"{github.url}/graphql")
+        repo = client.get_repository("owner/repo")
+        issues = client.get_recent_issues(repo)
+        assert [issue.number for issue in issues] == [5, 4, 3, 2, 1]
+        assert all(issue.label_names == ("titled",) for issue in issues)
+
+        client.update_issue_title(issues[0], "New title")
+        assert github.issues[5]["title"] == "New title"
+        assert client.get_label_id("owner/repo", "titled") == "LA_titled"
+        found = client.get_recent_issues_search(repo, skip_label="titled")
+        assert found == []
+
+    assert github.recorder.counts["github PATCH /repos/:repo/issues/:number"] == 1
+
+
+def test_fake_llm_answers_and_fails_on_demand():
+    recorder = Recorder()
+    with FakeLLM(latency=0, rate_limit_rate=0.5, retry_after=7, recorder=recorder) as llm:
+        request = {
+            "model": "m",
+            "messages": [{"role": "user", "content": "Title: bench-issue-3 broken"}],
+        }
+        statuses = []
+        for _ in range(10):
+            response = requests.post(f"{llm.url}/v1/chat/completions", json=request, timeout=5)
+            statuses.append(response.status_code)
+            if response.status_code == 429:
+                assert response.headers["Retry-After"] == "7"
+            else:
+                content = response.json()["choices"][0]["message"]["content"]
+                assert content == "Fix bench-issue-3 crash"
+
+        llm.rate_limit_rate = 0
+        batch = {"model": "m", "messages": [{"role": "user", "content": "```issues_json\n"}]}
+        batch["messages"][0]["content"] += '[{"issue_number": 1}, {"issue_number": 2}]'
+        batch["stream"] = True
+        response = requests.post(f"{llm.url}/v1/chat/completions", json=batch, timeout=5)
+        events = [line for line in response.text.splitlines() if line.startswith("data: ")]
+
+    assert {200, 429} == set(statuses)
+    assert recorder.counts["llm 429"] == statuses.count(429)
+    assert recorder.counts["llm completion"] == statuses.count(200) + 1
+    assert events[-1] == "data: [DONE]"
+    content = "".join(json.loads(e[6:])["choices"][0]["delta"]["content"] for e in events[:-1])
+    assert [item["issue_number"] for item in json.loads(content)] == [1, 2]
+    assert set(recorder.timelines) == {1, 2, 3}
+
+
+def test_run_benchmark_scan():
+    result = run_benchmark(
+        issues=6,
+        inputs={"write-interval-ms": "0", "max-concurrency": "3"},
+        github_options={"labeled_fraction": 0.0},
+        llm_options={"latency": 0.0},
+    )
+
+    assert result.failures == 0
+    assert result.processed == 6
+    assert result.issues_per_second > 0
+    assert result.requests["llm completion"] == 6
+    assert result.requests["github POST /repos/:repo/issues/:number/labels"] == 6
+    assert "Summary: 6 of 6 issues improved" in result.output
+    report = result.format()
+    assert "Throughput:" in report and "llm completion" in report
+
+
+def test_run_benchmark_streamed_titles_stop_early():
+    result = run_benchmark(
+        issues=3,
+        inputs={"write-interval-ms": "0", "stream": "true"},
+        github_options={"labeled_fraction": 0.0},
+        llm_options={"latency": 0.0, "word_latency": 0.02},
+    )
+
+    assert result.failures == 0
+    assert result.processed == 3
+    # Every stream is closed after the title line, before the explanation is sent.
+    assert result.requests["llm stream stopped early"] == 3
+    assert "saved by stopping early" in result.output
+    assert "The new title" not in result.output
+
+
+def test_cli_event_mode_json(capsys):
+    status = bench_main(
+        [
+            *("--issues", "2", "--mode", "event", "--llm-latency-ms", "0", "--json"),
+            *("--input", "write-interval-ms=0"),
+        ]
+    )
+
+    report = json.loads(capsys.readouterr().out)
+    assert status == 0
+    assert report["mode"] == "event"
+    assert report["processed"] == 2
+    assert report["requests"]["github GET /repos/:repo"] == 2
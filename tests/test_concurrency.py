@@ -0,0 +1,211 @@
+import asyncio
+import sys
+import threading
+import time
+
+import pytest
+
+from src.core.concurrency import (
+    GroupedOutput,
+    aprefetch,
+    gather_bounded,
+    map_bounded,
+    prefetch,
+)
+from tests.common import async_iter
+
+
+def test_map_bounded_sequential():
+    assert map_bounded(lambda x: x * 2, [1, 2, 3]) == [2, 4, 6]
+
+
+def test_map_bounded_keeps_input_order():
+    def slow_first(x):
+        time.sleep(0.05 if x == 0 else 0)
+        return x
+
+    assert map_bounded(slow_first, range(5), max_workers=5) == [0, 1, 2, 3, 4]
+
+
+def test_map_bounded_limits_workers():
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def track(x):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.01)
+        with lock:
+            active -= 1
+        return x
+
+    map_bounded(track, range(10), max_workers=3)
+    assert peak <= 3
+
+
+def test_map_bounded_on_error():
+    def fail_on_two(x):
+        if x == 2:
+            raise ValueError("two")
+        return x
+
+    results = map_bounded(
+        fail_on_two, [1, 2, 3], max_workers=2, on_error=lambda item, error: str(error)
+    )
+    assert results == [1, "two", 3]
+
+
+def test_map_bounded_reraises_without_handler():
+    def fail(x):
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError, match="boom"):
+        map_bounded(fail, [1, 2], max_workers=2)
+
+
+def test_map_bounded_groups_output(capsys):
+    def chatty(x):
+        print(f"start {x}")
+        time.sleep(0.01)
+        print(f"end {x}")
+        return x
+
+    map_bounded(chatty, range(4), max_workers=4)
+
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 8
+    for start, end in zip(lines[::2], lines[1::2]):
+        assert start.replace("start", "end") == end
+
+
+def test_grouped_output_is_installed_once(capsys):
+    map_bounded(print, range(2), max_workers=2)
+    output = sys.stdout
+    map_bounded(print, range(2), max_workers=2)
+    asyncio.run(gather_bounded(asyncio.sleep, [0, 0], max_concurrency=2))
+
+    # The proxy stays in place, so threads printing outside the pool never see it swapped out.
+    assert isinstance(output, GroupedOutput)
+    assert sys.stdout is output
+    print("after")
+    assert capsys.readouterr().out.splitlines()[-1] == "after"
+
+
+def test_gather_bounded_keeps_order_and_handles_errors(capsys):
+    async def work(x):
+        print(f"start {x}")
+        await asyncio.sleep(0.01 * (3 - x))
+        if x == 1:
+            raise ValueError("one")
+        print(f"end {x}")
+        return x
+
+    results = asyncio.run(
+        gather_bounded(work, range(3), max_concurrency=3, on_error=lambda item, error: str(error))
+    )
+
+    assert results == [0, "one", 2]
+    lines = capsys.readouterr().out.splitlines()
+    assert lines.index("start 0") + 1 == lines.index("end 0")
+    assert lines.index("start 2") + 1 == lines.index("end 2")
+
+
+def test_gather_bounded_limits_concurrency():
+    active = 0
+    peak = 0
+
+    async def track(x):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return x
+
+    assert asyncio.run(gather_bounded(track, range(10), max_concurrency=4)) == list(range(10))
+    assert peak == 4
+
+
+def test_map_bounded_reads_items_lazily():
+    def first_result(max_workers):
+        produced = []
+
+        def listing():
+            for x in range(6):
+                produced.append(x)
+                yield x
+
+        # Items are handed out one per free worker, not read up front.
+        return map_bounded(lambda x: len(produced), listing(), max_workers=max_workers)[0]
+
+    assert first_result(max_workers=1) == 1
+    assert first_result(max_workers=2) < 6
+
+
+def test_gather_bounded_accepts_async_iterables():
+    async def double(x):
+        return x * 2
+
+    results = asyncio.run(gather_bounded(double, async_iter(range(5)), max_concurrency=2))
+
+    assert results == [0, 2, 4, 6, 8]
+
+
+def test_prefetch_stays_bounded():
+    produced = []
+
+    def listing():
+        for x in range(10):
+            produced.append(x)
+            yield x
+
+    items = prefetch(listing(), max_ahead=3)
+    assert next(items) == 0
+    time.sleep(0.05)
+    # The item handed out, three waiting in the queue and one waiting to be put.
+    assert len(produced) == 5
+    assert list(items) == list(range(1, 10))
+
+
+def test_prefetch_raises_listing_errors_and_stops_early():
+    closed = threading.Event()
+
+    def listing():
+        try:
+            yield 1
+            raise ValueError("page 2 failed")
+        finally:
+            closed.set()
+
+    items = prefetch(listing(), max_ahead=1)
+    assert next(items) == 1
+    with pytest.raises(ValueError, match="page 2 failed"):
+        next(items)
+
+    closed.clear()
+    items = prefetch(listing(), max_ahead=1)
+    next(items)
+    items.close()
+    assert closed.is_set()
+
+
+def test_aprefetch():
+    async def listing():
+        yield 1
+        yield 2
+        raise ValueError("page 2 failed")
+
+    async def consume():
+        seen = []
+        with pytest.raises(ValueError, match="page 2 failed"):
+            async for item in aprefetch(listing(), max_ahead=1):
+                seen.append(item)
+        items = aprefetch(async_iter(range(100)), max_ahead=1)
+        first = await anext(items)
+        await items.aclose()
+        return seen, first
+
+    assert asyncio.run(consume()) == ([1, 2], 0)
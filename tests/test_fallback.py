@@ -0,0 +1,175 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from src.core.fallback import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    AllProvidersFailedError,
+    AsyncFallbackAIClient,
+    CircuitBreaker,
+    FallbackAIClient,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3, clock=FakeClock())
+    assert breaker.record_failure() is False
+    assert breaker.record_failure() is False
+    assert breaker.allow()
+    assert breaker.record_failure() is True
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+
+def test_breaker_success_resets_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=2, window=100, clock=FakeClock())
+    for _ in range(5):
+        breaker.record_failure()
+        breaker.record_success()
+    assert breaker.state == CLOSED
+
+
+def test_breaker_opens_on_error_rate():
+    breaker = CircuitBreaker(failure_threshold=10, error_rate=0.75, window=4, clock=FakeClock())
+    for _ in range(2):
+        breaker.record_failure()
+        breaker.record_success()
+    assert breaker.record_failure() is False
+    assert breaker.state == CLOSED
+    assert breaker.record_failure() is True
+    assert breaker.state == OPEN
+
+
+def test_breaker_half_opens_for_a_single_probe():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=clock)
+    breaker.record_failure()
+
+    clock.now = 29
+    assert not breaker.allow()
+    clock.now = 30
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert list(breaker.outcomes) == [True]
+
+
+def test_breaker_failed_probe_reopens():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30, clock=clock)
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now = 30
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+
+def test_breaker_replaces_lost_probe():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=clock)
+    breaker.record_failure()
+    clock.now = 30
+    assert breaker.allow()
+    clock.now = 60
+    assert breaker.allow()
+
+
+def make_chain(*clients, cls=FallbackAIClient, **breaker_kwargs):
+    return cls(
+        [(f"provider-{i}", client) for i, client in enumerate(clients)],
+        breaker_factory=lambda: CircuitBreaker(**breaker_kwargs),
+    )
+
+
+def test_fallback_uses_first_healthy_provider():
+    primary = Mock(model_name="primary-model")
+    primary.generate_content.return_value = "Primary title"
+    secondary = Mock(model_name="secondary-model")
+    client = make_chain(primary, secondary)
+
+    assert client.model_name == "primary-model"
+    assert client.generate_content("prompt") == "Primary title"
+    secondary.generate_content.assert_not_called()
+
+
+def test_fallback_moves_to_next_provider(capsys):
+    primary = Mock(model_name="primary-model")
+    primary.generate_title.side_effect = RuntimeError("503 Service Unavailable")
+    secondary = Mock(model_name="secondary-model")
+    secondary.generate_title.return_value = ("Secondary title", None)
+    client = make_chain(primary, secondary, failure_threshold=2)
+
+    assert client.generate_title("prompt", 64) == ("Secondary title", None)
+    secondary.generate_title.assert_called_once_with("prompt", 64)
+    assert "Falling back to provider-1" in capsys.readouterr().out
+
+    client.generate_title("prompt", 64)
+    assert "Circuit for provider-0 opened" in capsys.readouterr().out
+
+    # The open circuit sends traffic straight to the next provider.
+    client.generate_title("prompt", 64)
+    assert primary.generate_title.call_count == 2
+    assert secondary.generate_title.call_count == 3
+
+
+def test_fallback_all_providers_failed():
+    primary = Mock(model_name="a")
+    primary.generate_content.side_effect = RuntimeError("primary down")
+    secondary = Mock(model_name="b")
+    secondary.generate_content.side_effect = RuntimeError("secondary down")
+    client = make_chain(primary, secondary, failure_threshold=1)
+
+    with pytest.raises(AllProvidersFailedError, match="provider-0: primary down; provider-1"):
+        client.generate_content("prompt")
+    with pytest.raises(AllProvidersFailedError, match="circuits are open"):
+        client.generate_content("prompt")
+    assert primary.generate_content.call_count == 1
+
+
+def test_fallback_warm_up():
+    primary, secondary = Mock(model_name="a"), Mock(model_name="b")
+    make_chain(primary, secondary).warm_up()
+    primary.warm_up.assert_called_once()
+    secondary.warm_up.assert_called_once()
+
+
+def test_async_fallback_moves_to_next_provider():
+    primary = AsyncMock(model_name="a")
+    primary.generate_content.side_effect = RuntimeError("timeout")
+    secondary = AsyncMock(model_name="b")
+    secondary.generate_content.return_value = "Secondary title"
+    client = make_chain(primary, secondary, cls=AsyncFallbackAIClient, failure_threshold=1)
+
+    assert asyncio.run(client.generate_content("prompt")) == "Secondary title"
+    assert asyncio.run(client.generate_title("prompt")) == secondary.generate_title.return_value
+    primary.generate_title.assert_not_called()
+    asyncio.run(client.warm_up())
+    primary.warm_up.assert_awaited_once()
+    asyncio.run(client.aclose())
+    primary.aclose.assert_awaited_once()
+    secondary.aclose.assert_awaited_once()
+
+
+def test_async_fallback_all_providers_failed():
+    primary = AsyncMock(model_name="a")
+    primary.generate_content.side_effect = RuntimeError("down")
+    client = make_chain(primary, cls=AsyncFallbackAIClient)
+
+    with pytest.raises(AllProvidersFailedError, match="provider-0: down"):
+        asyncio.run(client.generate_content("prompt"))
@@ -4,6 +4,9 @@ from unittest.mock import ANY, MagicMock, Mock, patch
 import pytest
 
 from src.core.github_client import GitHubClient
+from src.core.github_queries import build_issue_search_query
+from src.core.issue_record import IssueRecord
+from src.core.tracing import Tracer, set_tracer, span
 
 
 def test_init_without_token():
@@ -35,194 +38,408 @@ def test_get_repository_error():
             client.get_repository("owner/repo")
 
 
-def test_get_recent_issues():
-    mock_github = Mock()
-    mock_repo = Mock()
+def issue_payload(number, days_ago=0, labels=("bug",), pull_request=None):
+    created_at = datetime.datetime.now() - datetime.timedelta(days=days_ago)
+    payload = {
+        "number": number,
+        "title": f"Title {number}",
+        "body": "Body",
+        "labels": [{"name": name} for name in labels],
+        "created_at": created_at.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "url": f"https://api.github.com/repos/owner/repo/issues/{number}",
+        "node_id": f"I_{number}",
+    }
+    if pull_request:
+        payload["pull_request"] = pull_request
+    return payload
 
-    # Create mock issues
-    mock_issue1 = Mock()
-    mock_issue1.created_at = datetime.datetime.now()
-    mock_issue1.pull_request = None
 
-    mock_issue2 = Mock()
-    mock_issue2.created_at = datetime.datetime.now() - datetime.timedelta(days=10)
-    mock_issue2.pull_request = None
+def rest_page(payload, next_url=None):
+    page = Mock(links={"next": {"url": next_url}} if next_url else {})
+    page.json.return_value = payload
+    return page
 
-    mock_repo.get_issues.return_value = [mock_issue1, mock_issue2]
-
-    with patch("src.core.github_client.Github", return_value=mock_github):
-        client = GitHubClient("valid-token")
-        issues = client.get_recent_issues(mock_repo, days_to_scan=5, limit=10)
 
-        assert len(issues) == 1
-        assert issues[0] == mock_issue1
+def rest_client(*pages):
+    client = GitHubClient("valid-token")
+    client.session = Mock()
+    client.session.get.side_effect = list(pages)
+    return client
 
 
-def test_get_recent_issues_error():
-    mock_github = Mock()
+def owner_repo():
     mock_repo = Mock()
-    mock_repo.get_issues.side_effect = Exception("API error")
+    mock_repo.full_name = "owner/repo"
+    return mock_repo
 
-    with patch("src.core.github_client.Github", return_value=mock_github):
-        client = GitHubClient("valid-token")
 
-        with pytest.raises(Exception, match="API error"):
-            client.get_recent_issues(mock_repo)
+def test_get_recent_issues():
+    client = rest_client(
+        rest_page(
+            [issue_payload(1), issue_payload(2, pull_request={"url": "pr"})],
+            next_url="https://api.github.com/repos/owner/repo/issues?page=2",
+        ),
+        rest_page([issue_payload(3, labels=()), issue_payload(4, days_ago=10)]),
+    )
+
+    issues = client.get_recent_issues(owner_repo(), days_to_scan=5, limit=10)
+
+    assert [issue.number for issue in issues] == [1, 3]
+    assert all(isinstance(issue, IssueRecord) for issue in issues)
+    assert issues[0].label_names == ("bug",)
+    assert issues[0].repo == "owner/repo"
+    first_call, second_call = client.session.get.call_args_list
+    assert first_call.args == ("https://api.github.com/repos/owner/repo/issues",)
+    params = first_call.kwargs["params"]
+    assert params["state"] == "open"
+    assert params["sort"] == "created"
+    assert params["direction"] == "desc"
+    assert params["per_page"] == 100
+    assert second_call.args == ("https://api.github.com/repos/owner/repo/issues?page=2",)
+    assert second_call.kwargs["params"] is None
+
+
+def test_get_recent_issues_error():
+    client = rest_client(Exception("API error"))
+
+    with pytest.raises(Exception, match="API error"):
+        client.get_recent_issues(owner_repo())
 
 
 def test_get_recent_issues_with_labels():
     """Test filtering issues by labels."""
-    mock_github = Mock()
+    payload = [
+        issue_payload(1, labels=["enhancement", "bug"]),
+        issue_payload(2, labels=["bug"]),
+        issue_payload(3, labels=["enhancement"]),
+        issue_payload(4, labels=[]),
+    ]
+    client = GitHubClient("valid-token")
+    client.session = Mock()
+    client.session.get.side_effect = lambda *args, **kwargs: rest_page(payload)
+
+    assert len(client.get_recent_issues(owner_repo(), required_labels=["bug"])) == 2
+    assert len(client.get_recent_issues(owner_repo(), required_labels=["enhancement"])) == 2
+    assert len(client.get_recent_issues(owner_repo(), required_labels=["bug", "enhancement"])) == 3
+    assert len(client.get_recent_issues(owner_repo(), required_labels=[])) == 4
+
+
+def test_get_recent_issues_with_apply_to_closed():
+    """Test that get_recent_issues respects the apply_to_closed parameter."""
+    client = rest_client(rest_page([]), rest_page([]))
+
+    client.get_recent_issues(owner_repo(), days_to_scan=7, limit=100)
+    client.get_recent_issues(owner_repo(), days_to_scan=7, limit=100, apply_to_closed=True)
+
+    states = [call.kwargs["params"]["state"] for call in client.session.get.call_args_list]
+    assert states == ["open", "all"]
+
+
+def test_get_issue():
+    client = GitHubClient("valid-token")
+    client.session = Mock()
+    client.session.request.return_value.json.return_value = issue_payload(7)
+
+    issue = client.get_issue(owner_repo(), 7)
+
+    assert (issue.number, issue.title, issue.node_id) == (7, "Title 7", "I_7")
+    client.session.request.assert_called_once_with(
+        "GET", "https://api.github.com/repos/owner/repo/issues/7", json=None, timeout=30
+    )
+
+
+def graphql_page(nodes, end_cursor=None):
+    return {
+        "data": {
+            "repository": {
+                "issues": {
+                    "pageInfo": {"hasNextPage": end_cursor is not None, "endCursor": end_cursor},
+                    "nodes": nodes,
+                }
+            }
+        }
+    }
+
+
+def graphql_node(number, days_ago=0, labels=()):
+    created_at = datetime.datetime.now() - datetime.timedelta(days=days_ago)
+    return {
+        "id": f"I_{number}",
+        "number": number,
+        "title": f"Title {number}",
+        "body": "Body",
+        "createdAt": created_at.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "labels": {"nodes": [{"name": name} for name in labels]},
+    }
+
+
+def graphql_client(pages):
+    client = GitHubClient("valid-token")
+    client.session = Mock()
+    client.session.post.return_value.json.side_effect = pages
+    return client
+
+
+def test_get_recent_issues_graphql():
     mock_repo = Mock()
+    mock_repo.full_name = "owner/repo"
+    client = graphql_client(
+        [
+            graphql_page([graphql_node(1), graphql_node(2, labels=["bug"])], end_cursor="c1"),
+            graphql_page([graphql_node(3, labels=["bug"]), graphql_node(4, days_ago=10)]),
+        ]
+    )
 
-    # Labels
-    enhancement_label = Mock()
-    enhancement_label.name = "enhancement"
-    bug_label = Mock()
-    bug_label.name = "bug"
+    issues = client.get_recent_issues_graphql(mock_repo, days_to_scan=5, required_labels=["bug"])
 
-    # Create mock issues
-    mock_issue1 = Mock()
-    mock_issue1.created_at = datetime.datetime.now()
-    mock_issue1.pull_request = None
-    mock_issue1.labels = [enhancement_label, bug_label]
+    assert [issue.number for issue in issues] == [2, 3]
+    assert issues[0].node_id == "I_2"
+    assert issues[0].repo == "owner/repo"
+    assert issues[0].label_names == ("bug",)
 
-    mock_issue2 = Mock()
-    mock_issue2.created_at = datetime.datetime.now()
-    mock_issue2.pull_request = None
-    mock_issue2.labels = [bug_label]
+    first_call, second_call = client.session.post.call_args_list
+    assert first_call.args == ("https://api.github.com/graphql",)
+    variables = first_call.kwargs["json"]["variables"]
+    assert variables["owner"] == "owner"
+    assert variables["name"] == "repo"
+    assert variables["states"] == ["OPEN"]
+    assert variables["cursor"] is None
+    assert second_call.kwargs["json"]["variables"]["cursor"] == "c1"
 
-    mock_issue3 = Mock()
-    mock_issue3.created_at = datetime.datetime.now()
-    mock_issue3.pull_request = None
-    mock_issue3.labels = [enhancement_label]
 
-    mock_issue4 = Mock()
-    mock_issue4.created_at = datetime.datetime.now()
-    mock_issue4.pull_request = None
-    mock_issue4.labels = []
+def test_get_recent_issues_graphql_updated_since():
+    mock_repo = Mock()
+    mock_repo.full_name = "owner/repo"
+    client = graphql_client([graphql_page([])])
+    updated_since = datetime.datetime(2099, 5, 1, 12, 0, 0)
 
-    mock_repo.get_issues.return_value = [mock_issue1, mock_issue2, mock_issue3, mock_issue4]
+    client.get_recent_issues_graphql(mock_repo, updated_since=updated_since)
 
-    with patch("src.core.github_client.Github", return_value=mock_github):
-        client = GitHubClient("valid-token")
+    assert client.session.post.call_args.kwargs["json"]["variables"]["since"] == (
+        "2099-05-01T12:00:00Z"
+    )
 
-        # Test with single label
-        issues = client.get_recent_issues(mock_repo, required_labels=["bug"])
-        mock_repo.get_issues.assert_called_with(
-            state="open", sort="created", direction="desc", since=ANY
-        )
-        assert len(issues) == 2
-
-        issues = client.get_recent_issues(mock_repo, required_labels=["enhancement"])
-        mock_repo.get_issues.assert_called_with(
-            state="open", sort="created", direction="desc", since=ANY
-        )
-        assert len(issues) == 2
-
-        # Test with multiple labels
-        issues = client.get_recent_issues(mock_repo, required_labels=["bug", "enhancement"])
-        mock_repo.get_issues.assert_called_with(
-            state="open", sort="created", direction="desc", since=ANY
-        )
-        assert len(issues) == 3
-
-        # Test with no labels
-        issues = client.get_recent_issues(mock_repo, required_labels=[])
-        mock_repo.get_issues.assert_called_with(
-            state="open", sort="created", direction="desc", since=ANY
-        )
-        assert len(issues) == 4
 
+def test_get_recent_issues_graphql_stops_at_limit():
+    mock_repo = Mock()
+    mock_repo.full_name = "owner/repo"
+    client = graphql_client(
+        [graphql_page([graphql_node(1), graphql_node(2)], end_cursor="c1"), AssertionError()]
+    )
 
-def test_get_recent_issues_with_apply_to_closed():
-    """Test that get_recent_issues respects the apply_to_closed parameter."""
-    mock_repo = MagicMock()
+    issues = client.get_recent_issues_graphql(mock_repo, limit=2, apply_to_closed=True)
+
+    assert [issue.number for issue in issues] == [1, 2]
+    assert client.session.post.call_count == 1
+    variables = client.session.post.call_args.kwargs["json"]["variables"]
+    assert variables["states"] == ["OPEN", "CLOSED"]
 
-    github_client = GitHubClient("test-token")
 
-    github_client.get_recent_issues(mock_repo, days_to_scan=7, limit=100)
-    mock_repo.get_issues.assert_called_with(
-        state="open", sort="created", direction="desc", since=ANY
+def test_iter_recent_issues_graphql_fetches_pages_on_demand():
+    mock_repo = Mock()
+    mock_repo.full_name = "owner/repo"
+    client = graphql_client(
+        [
+            graphql_page([graphql_node(1)], end_cursor="c1"),
+            graphql_page([graphql_node(2)]),
+        ]
     )
 
-    mock_repo.get_issues.reset_mock()
+    issues = client.iter_recent_issues_graphql(mock_repo)
+
+    assert next(issues).number == 1
+    assert client.session.post.call_count == 1
+    assert [issue.number for issue in issues] == [2]
+    assert client.session.post.call_count == 2
+
+
+def test_get_recent_issues_graphql_error():
+    mock_repo = Mock()
+    mock_repo.full_name = "owner/repo"
+    client = graphql_client([{"errors": [{"message": "Bad query"}]}])
+
+    with pytest.raises(Exception, match="GraphQL request failed: Bad query"):
+        client.get_recent_issues_graphql(mock_repo)
 
-    github_client.get_recent_issues(mock_repo, days_to_scan=7, limit=100, apply_to_closed=True)
-    mock_repo.get_issues.assert_called_with(
-        state="all", sort="created", direction="desc", since=ANY
+
+def test_graphql_partial_returns_field_errors():
+    payload = {"data": {"w0": None}, "errors": [{"message": "locked", "path": ["w0"]}]}
+    client = graphql_client([payload])
+
+    assert client.graphql("mutation", {}, partial=True) == payload
+
+
+def test_get_label_id():
+    client = graphql_client(
+        [
+            {"data": {"repository": {"label": {"id": "LA_1"}}}},
+            {"data": {"repository": {"label": None}}},
+        ]
+    )
+    client.session.request.return_value.json.return_value = {"node_id": "LA_2"}
+
+    assert client.get_label_id("owner/repo", "titled") == "LA_1"
+    assert client.session.post.call_args.kwargs["json"]["variables"]["label"] == "titled"
+    client.session.request.assert_not_called()
+
+    assert client.get_label_id("owner/repo", "titled") == "LA_2"
+    client.session.request.assert_called_once_with(
+        "POST",
+        "https://api.github.com/repos/owner/repo/labels",
+        json={"name": "titled"},
+        timeout=30,
     )
 
 
-def test_update_issue_title_success():
-    mock_github = Mock()
-    mock_issue = Mock()
+def test_writes_to_issue_record():
+    client = GitHubClient("valid-token")
+    client.session = Mock()
+    client.session.request.return_value.json.return_value = {"id": 1}
+    issue = IssueRecord(
+        number=7,
+        title="Title",
+        body="Body",
+        label_names=[],
+        created_at=None,
+        repo="owner/repo",
+    )
+    url = "https://api.github.com/repos/owner/repo/issues/7"
 
-    with patch("src.core.github_client.Github", return_value=mock_github):
-        client = GitHubClient("valid-token")
-        result = client.update_issue_title(mock_issue, "New Title")
+    assert client.update_issue_title(issue, "New title") is True
+    assert client.add_issue_comment(issue, "Comment") == {"id": 1}
+    assert client.add_issue_label(issue, "titled") is True
 
-        assert result is True
-        mock_issue.edit.assert_called_once_with(title="New Title")
+    assert [(*c.args, c.kwargs["json"]) for c in client.session.request.call_args_list] == [
+        ("PATCH", url, {"title": "New title"}),
+        ("POST", f"{url}/comments", {"body": "Comment"}),
+        ("POST", f"{url}/labels", {"labels": ["titled"]}),
+    ]
 
+    client.session.request.return_value.raise_for_status.side_effect = Exception("API error")
+    assert client.add_issue_label(issue, "titled") is False
+    with pytest.raises(Exception, match="API error"):
+        client.update_issue_title(issue, "New title")
+    with pytest.raises(Exception, match="API error"):
+        client.add_issue_comment(issue, "Comment")
 
-def test_update_issue_title_error():
-    mock_github = Mock()
-    mock_issue = Mock()
-    mock_issue.edit.side_effect = Exception("API error")
 
-    with patch("src.core.github_client.Github", return_value=mock_github):
-        client = GitHubClient("valid-token")
+def test_issue_record_is_immutable():
+    issue = IssueRecord.from_rest(issue_payload(7, pull_request={"url": "pr"}), "owner/repo")
 
-        with pytest.raises(Exception, match="API error"):
-            client.update_issue_title(mock_issue, "New Title")
+    assert issue.is_pr is True
+    assert not hasattr(issue, "__dict__")
+    with pytest.raises(AttributeError, match="immutable"):
+        issue.title = "Changed"
+    with pytest.raises(AttributeError, match="immutable"):
+        del issue.body
 
 
-def test_add_issue_comment_success():
-    mock_github = Mock()
-    mock_issue = Mock()
-    mock_comment = Mock()
-    mock_issue.create_comment.return_value = mock_comment
+def test_build_issue_search_query():
+    date_threshold = datetime.datetime(2024, 5, 1, 12, 30, 0)
 
-    with patch("src.core.github_client.Github", return_value=mock_github):
-        client = GitHubClient("valid-token")
-        result = client.add_issue_comment(mock_issue, "Test comment")
+    assert build_issue_search_query("owner/repo", date_threshold) == (
+        "repo:owner/repo is:issue is:open created:>=2024-05-01T12:30:00Z"
+    )
+    assert build_issue_search_query(
+        "owner/repo",
+        date_threshold,
+        required_labels=["bug", "good first issue"],
+        apply_to_closed=True,
+        skip_label="titled",
+    ) == (
+        "repo:owner/repo is:issue created:>=2024-05-01T12:30:00Z "
+        'label:"bug","good first issue" -label:"titled"'
+    )
 
-        assert result == mock_comment
-        mock_issue.create_comment.assert_called_once_with("Test comment")
 
+def test_get_recent_issues_search():
+    mock_repo = Mock()
+    mock_repo.full_name = "owner/repo"
+    client = GitHubClient("valid-token")
+    client.session = Mock()
+    first_page = Mock(links={"next": {"url": "https://api.github.com/search/issues?page=2"}})
+    first_page.json.return_value = {"items": [issue_payload(1), issue_payload(2)]}
+    second_page = Mock(links={})
+    second_page.json.return_value = {"items": [issue_payload(3)]}
+    client.session.get.side_effect = [first_page, second_page]
+
+    issues = client.get_recent_issues_search(
+        mock_repo, limit=3, required_labels=["bug"], skip_label="titled"
+    )
 
-def test_add_issue_comment_error():
-    mock_github = Mock()
-    mock_issue = Mock()
-    mock_issue.create_comment.side_effect = Exception("API error")
+    assert [issue.number for issue in issues] == [1, 2, 3]
+    first_call, second_call = client.session.get.call_args_list
+    params = first_call.kwargs["params"]
+    assert params["q"].startswith("repo:owner/repo is:issue is:open created:>=")
+    assert params["q"].endswith('label:"bug" -label:"titled"')
+    assert params["per_page"] == 3
+    assert second_call.args == ("https://api.github.com/search/issues?page=2",)
+    assert second_call.kwargs["params"] is None
+
+
+def test_get_recent_issues_updated_since():
+    updated_since = datetime.datetime.now() - datetime.timedelta(hours=1)
+    client = GitHubClient("valid-token")
+    client.session = Mock()
+    client.session.get.side_effect = lambda url, params, timeout: rest_page(
+        {"items": []} if "/search/" in url else []
+    )
 
-    with patch("src.core.github_client.Github", return_value=mock_github):
-        client = GitHubClient("valid-token")
+    client.get_recent_issues(owner_repo(), updated_since=updated_since)
+    client.get_recent_issues_search(owner_repo(), updated_since=updated_since)
 
-        with pytest.raises(Exception, match="API error"):
-            client.add_issue_comment(mock_issue, "Test comment")
+    listing, search = client.session.get.call_args_list
+    assert listing.kwargs["params"]["since"] == updated_since.strftime("%Y-%m-%dT%H:%M:%SZ")
+    query = search.kwargs["params"]["q"]
+    assert f"updated:>={updated_since.strftime('%Y-%m-%dT%H:%M:%SZ')}" in query
 
+    # A cursor older than the scan window doesn't widen it.
+    client.get_recent_issues(
+        owner_repo(), days_to_scan=1, updated_since=datetime.datetime(2000, 1, 1)
+    )
+    assert not client.session.get.call_args.kwargs["params"]["since"].startswith("2000")
 
-def test_add_issue_label_success():
-    mock_github = Mock()
-    mock_issue = Mock()
 
-    with patch("src.core.github_client.Github", return_value=mock_github):
-        client = GitHubClient("valid-token")
-        result = client.add_issue_label(mock_issue, "enhancement")
+def test_iter_recent_issues_has_a_discovery_span():
+    client = rest_client(rest_page([issue_payload(1)]))
+    tracer = Tracer()
+    set_tracer(tracer)
+    try:
+        with span("run"):
+            assert [issue.number for issue in client.iter_recent_issues(owner_repo())] == [1]
+    finally:
+        set_tracer(None)
 
-        assert result is True
-        mock_issue.add_to_labels.assert_called_once_with("enhancement")
+    spans = {s.name: s for s in tracer.spans}
+    discovery = spans["github.iter_recent_issues"]
+    assert discovery.parent_id == spans["run"].span_id
+    assert discovery.attributes == {"github.repository": "owner/repo"}
 
 
-def test_add_issue_label_error():
-    mock_github = Mock()
-    mock_issue = Mock()
-    mock_issue.add_to_labels.side_effect = Exception("API error")
+def test_get_recent_issues_search_stops_at_limit():
+    mock_repo = Mock()
+    mock_repo.full_name = "owner/repo"
+    client = GitHubClient("valid-token")
+    client.session = Mock()
+    page = Mock(links={"next": {"url": "https://api.github.com/search/issues?page=2"}})
+    page.json.return_value = {"items": [issue_payload(1), issue_payload(2)]}
+    client.session.get.return_value = page
+
+    issues = client.get_recent_issues_search(mock_repo, limit=2)
+
+    assert [issue.number for issue in issues] == [1, 2]
+    assert client.session.get.call_count == 1
+
+
+def test_get_recent_issues_stops_at_first_old_issue():
+    client = rest_client(
+        rest_page(
+            [issue_payload(1), issue_payload(2, days_ago=10)],
+            next_url="https://api.github.com/repos/owner/repo/issues?page=2",
+        ),
+        AssertionError("fetched a page after the first old issue"),
+    )
 
-    with patch("src.core.github_client.Github", return_value=mock_github):
-        client = GitHubClient("valid-token")
-        result = client.add_issue_label(mock_issue, "enhancement")
+    issues = client.get_recent_issues(owner_repo(), days_to_scan=5)
 
-        assert result is False
+    assert [issue.number for issue in issues] == [1]
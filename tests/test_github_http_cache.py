@@ -0,0 +1,154 @@
+import io
+import os
+import time
+from unittest.mock import patch
+
+import requests
+
+from src.core.github_client import GitHubClient
+from src.core.github_http_cache import (
+    ConditionalRequestAdapter,
+    GitHubResponseCache,
+    is_cacheable,
+)
+from src.core.github_rate_limit import GitHubRateLimiter
+
+ISSUES_URL = "https://api.github.com/repos/owner/repo/issues?state=open&page=2"
+
+
+def make_response(status=200, headers=None, body=b"[]"):
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    response._content = body
+    response.raw = io.BytesIO(body)
+    response.connection = None
+    response.url = ISSUES_URL
+    return response
+
+
+def prepare(url=ISSUES_URL, method="GET", token="token-a"):  # noqa: S107
+    return requests.Request(method, url, headers={"Authorization": f"Bearer {token}"}).prepare()
+
+
+def test_is_cacheable():
+    assert is_cacheable(prepare())
+    assert is_cacheable(prepare("https://api.github.com:443/repos/owner/repo/issues/12"))
+    assert not is_cacheable(prepare("https://api.github.com/repos/owner/repo/issues/12/comments"))
+    assert not is_cacheable(prepare("https://api.github.com/repos/owner/repo"))
+    assert not is_cacheable(prepare(method="POST"))
+
+
+def test_make_key_ignores_token():
+    # Every Actions job gets a new token; the cache has to outlive it.
+    assert GitHubResponseCache.make_key(prepare()) == GitHubResponseCache.make_key(
+        prepare(token="token-b")  # noqa: S106
+    )
+    assert GitHubResponseCache.make_key(prepare()) != GitHubResponseCache.make_key(
+        prepare("https://api.github.com/repos/owner/other/issues")
+    )
+
+
+def test_not_modified_response_is_served_from_cache(tmp_path):
+    cache = GitHubResponseCache(str(tmp_path))
+    adapter = ConditionalRequestAdapter(GitHubRateLimiter(), cache)
+    first = make_response(
+        headers={
+            "ETag": 'W/"abc"',
+            "Link": '<https://api.github.com/repos/owner/repo/issues?page=3>; rel="next"',
+            "Content-Type": "application/json",
+        },
+        body=b'[{"number": 1}]',
+    )
+    not_modified = make_response(
+        304, {"x-ratelimit-remaining": "4999", "Content-Length": "0"}, body=b""
+    )
+
+    with patch("requests.adapters.HTTPAdapter.send", side_effect=[first, not_modified]) as send:
+        assert adapter.send(prepare()).json() == [{"number": 1}]
+        response = adapter.send(prepare())
+
+    assert "If-None-Match" not in send.call_args_list[0].args[0].headers
+    assert send.call_args_list[1].args[0].headers["If-None-Match"] == 'W/"abc"'
+    assert response.status_code == 200
+    assert response.json() == [{"number": 1}]
+    assert response.links["next"]["url"].endswith("page=3")
+    assert response.headers["x-ratelimit-remaining"] == "4999"
+    assert "Content-Length" not in response.headers
+    assert (cache.not_modified, cache.fetched) == (1, 1)
+    assert cache.summary() == "GitHub response cache: 1 not modified, 1 fetched"
+
+
+def test_changed_response_replaces_entry(tmp_path):
+    cache = GitHubResponseCache(str(tmp_path))
+    adapter = ConditionalRequestAdapter(GitHubRateLimiter(), cache)
+    responses = [
+        make_response(headers={"Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}, body=b"[1]"),
+        make_response(headers={"ETag": '"v2"'}, body=b"[2]"),
+        make_response(304),
+    ]
+
+    with patch("requests.adapters.HTTPAdapter.send", side_effect=responses) as send:
+        adapter.send(prepare())
+        assert adapter.send(prepare()).json() == [2]
+        assert adapter.send(prepare()).json() == [2]
+
+    second_request = send.call_args_list[1].args[0]
+    assert second_request.headers["If-Modified-Since"] == "Mon, 01 Jan 2024 00:00:00 GMT"
+    assert send.call_args_list[2].args[0].headers["If-None-Match"] == '"v2"'
+
+
+def test_uncacheable_requests_are_passed_through(tmp_path):
+    cache = GitHubResponseCache(str(tmp_path))
+    adapter = ConditionalRequestAdapter(GitHubRateLimiter(), cache)
+
+    with patch(
+        "requests.adapters.HTTPAdapter.send", return_value=make_response(headers={"ETag": '"x"'})
+    ):
+        adapter.send(prepare("https://api.github.com/repos/owner/repo"))
+        adapter.send(prepare(ISSUES_URL.replace("page=2", "page=9")))
+
+    # Only the issue listing was stored.
+    assert len(os.listdir(tmp_path)) == 1
+    assert cache.fetched == 1
+
+
+def test_responses_without_validators_are_not_stored(tmp_path):
+    cache = GitHubResponseCache(str(tmp_path))
+    adapter = ConditionalRequestAdapter(GitHubRateLimiter(), cache)
+
+    with patch("requests.adapters.HTTPAdapter.send", return_value=make_response()):
+        adapter.send(prepare())
+
+    assert os.listdir(tmp_path) == []
+
+
+def test_prune_removes_stale_entries(tmp_path):
+    cache = GitHubResponseCache(str(tmp_path), ttl_seconds=60)
+    fresh = tmp_path / "fresh.json"
+    stale = tmp_path / "stale.json"
+    leftover = tmp_path / "partial.tmp"
+    for path in (fresh, stale, leftover):
+        path.write_text("{}")
+    old = time.time() - 120
+    os.utime(stale, (old, old))
+
+    assert cache.prune() == 2
+    assert os.listdir(tmp_path) == ["fresh.json"]
+
+
+def test_pygithub_reads_are_revalidated(tmp_path):
+    client = GitHubClient("valid-token", http_cache=GitHubResponseCache(str(tmp_path)))
+    body = b'{"number": 7, "title": "Crash", "url": "https://api.github.com/repos/o/r/issues/7"}'
+    responses = [
+        make_response(headers={"ETag": '"v1"'}, body=body),
+        make_response(304),
+    ]
+
+    with patch("requests.adapters.HTTPAdapter.send", side_effect=responses) as send:
+        repo = client.client.get_repo("o/r", lazy=True)
+        assert repo.get_issue(7).title == "Crash"
+        assert repo.get_issue(7).title == "Crash"
+
+    assert send.call_args.args[0].headers["If-None-Match"] == '"v1"'
+    assert client.http_cache.not_modified == 1
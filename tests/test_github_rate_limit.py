@@ -0,0 +1,210 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import requests
+
+from src.core.async_github_client import AsyncGitHubClient
+from src.core.github_client import GitHubClient
+from src.core.github_rate_limit import (
+    GitHubRateLimiter,
+    RateLimitedAdapter,
+    WritePacer,
+    rate_limit_resource,
+)
+
+NOW = 1_700_000_000
+
+
+def rate_headers(remaining, limit=5000, reset=NOW + 3600, resource="core"):
+    return {
+        "x-ratelimit-remaining": str(remaining),
+        "x-ratelimit-limit": str(limit),
+        "x-ratelimit-reset": str(reset),
+        "x-ratelimit-resource": resource,
+    }
+
+
+def make_response(status=200, headers=None, body=b"{}"):
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    response._content = body
+    return response
+
+
+def make_limiter(**kwargs):
+    return GitHubRateLimiter(clock=lambda: NOW, **kwargs)
+
+
+def test_rate_limit_resource():
+    assert rate_limit_resource("https://api.github.com/graphql") == "graphql"
+    assert rate_limit_resource("/search/issues") == "search"
+    assert rate_limit_resource("https://api.github.com/repos/o/r/issues") == "core"
+
+
+def test_reserve_without_known_budget():
+    limiter = make_limiter()
+    assert limiter.reserve() == 0
+
+
+def test_reserve_with_plenty_of_budget():
+    limiter = make_limiter()
+    limiter.update(rate_headers(4000))
+    assert [limiter.reserve() for _ in range(3)] == [0, 0, 0]
+
+
+def test_reserve_paces_low_budget():
+    limiter = make_limiter()
+    limiter.update(rate_headers(100, reset=NOW + 100))
+
+    assert limiter.reserve() == 0
+    assert limiter.reserve() == 1
+    assert limiter.reserve() > 1
+
+
+def test_reserve_waits_for_reset_when_exhausted():
+    limiter = make_limiter()
+    limiter.update(rate_headers(0, reset=NOW + 30))
+    assert limiter.reserve() == 31
+    # Other resources have their own budget.
+    assert limiter.reserve("graphql") == 0
+
+
+def test_update_keeps_lowest_remaining_for_same_window():
+    limiter = make_limiter()
+    limiter.update(rate_headers(10))
+    limiter.update(rate_headers(12))
+    assert limiter._budget("core").remaining == 10
+    limiter.update(rate_headers(5000, reset=NOW + 7200))
+    assert limiter._budget("core").remaining == 5000
+
+
+def test_update_ignores_missing_headers():
+    limiter = make_limiter()
+    limiter.update({})
+    assert limiter._budget("core").remaining is None
+
+
+def test_retry_delay_retry_after():
+    limiter = make_limiter()
+    assert limiter.retry_delay(429, {"retry-after": "5"}) == 5
+    assert limiter.blocked_until == NOW + 5
+    assert limiter.reserve() == 5
+
+
+def test_retry_delay_primary_limit():
+    limiter = make_limiter()
+    assert limiter.retry_delay(403, rate_headers(0, reset=NOW + 20)) == 21
+
+
+def test_retry_delay_secondary_limit_backs_off_exponentially():
+    limiter = make_limiter()
+    body = '{"message": "You have exceeded a secondary rate limit"}'
+    assert limiter.retry_delay(403, {}, body, attempt=0) == 60
+    assert limiter.retry_delay(403, {}, body, attempt=2) == 240
+
+
+def test_retry_delay_not_rate_limited():
+    limiter = make_limiter()
+    assert limiter.retry_delay(200, {}) is None
+    assert limiter.retry_delay(404, {}) is None
+    assert limiter.retry_delay(403, {}, '{"message": "Resource not accessible"}') is None
+
+
+def test_retry_delay_gives_up():
+    limiter = make_limiter(max_retries=2, max_wait=100)
+    assert limiter.retry_delay(429, {"retry-after": "5"}, attempt=2) is None
+    assert limiter.retry_delay(429, {"retry-after": "500"}) is None
+    assert limiter.blocked_until == 0
+
+
+def test_write_pacer_min_interval():
+    pacer = WritePacer(min_interval=1.0, clock=lambda: NOW)
+
+    assert [pacer.reserve() for _ in range(3)] == [0, 1.0, 2.0]
+
+
+def test_write_pacer_per_minute_cap():
+    now = [NOW]
+    pacer = WritePacer(min_interval=0, per_minute=2, clock=lambda: now[0])
+
+    assert [pacer.reserve() for _ in range(3)] == [0, 0, 60]
+    now[0] += 30
+    # Writes keep their order, so the fourth doesn't start before the third.
+    assert pacer.reserve() == 30
+    now[0] += 100
+    assert pacer.reserve() == 0
+
+
+def test_write_pacer_disabled():
+    pacer = WritePacer(min_interval=0, per_minute=0, clock=lambda: NOW)
+
+    assert [pacer.reserve() for _ in range(100)] == [0] * 100
+
+
+def test_adapter_retries_rate_limited_response():
+    limiter = make_limiter()
+    adapter = RateLimitedAdapter(limiter)
+    request = requests.Request("GET", "https://api.github.com/repos/o/r").prepare()
+    responses = [
+        make_response(429, {"retry-after": "2"}),
+        make_response(200, rate_headers(4999)),
+    ]
+
+    with (
+        patch("requests.adapters.HTTPAdapter.send", side_effect=responses) as mock_send,
+        patch("src.core.github_rate_limit.time.sleep") as mock_sleep,
+    ):
+        response = adapter.send(request)
+
+    assert response.status_code == 200
+    assert mock_send.call_count == 2
+    mock_sleep.assert_called_once_with(2)
+    assert limiter._budget("core").remaining == 4999
+
+
+def test_adapter_returns_non_rate_limited_error():
+    adapter = RateLimitedAdapter(make_limiter())
+    request = requests.Request("GET", "https://api.github.com/repos/o/r").prepare()
+
+    with patch("requests.adapters.HTTPAdapter.send", return_value=make_response(404)):
+        assert adapter.send(request).status_code == 404
+
+
+def test_pygithub_requests_go_through_rate_limiter():
+    client = GitHubClient("valid-token")
+    responses = [
+        make_response(429, {"retry-after": "1"}),
+        make_response(200, rate_headers(4000), b'{"full_name": "owner/repo"}'),
+    ]
+
+    with (
+        patch("requests.adapters.HTTPAdapter.send", side_effect=responses) as mock_send,
+        patch("src.core.github_rate_limit.time.sleep"),
+    ):
+        repo = client.get_repository("owner/repo")
+
+    assert repo.full_name == "owner/repo"
+    request = mock_send.call_args.args[0]
+    assert request.url == "https://api.github.com:443/repos/owner/repo"
+    assert request.headers["Authorization"] == "token valid-token"
+    assert client.rate_limiter._budget("core").remaining == 4000
+
+
+def test_async_client_retries_rate_limited_response():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            return httpx.Response(403, headers=rate_headers(0, reset=NOW + 3))
+        return httpx.Response(200, json={"full_name": "owner/repo"})
+
+    client = AsyncGitHubClient(
+        "valid-token", transport=httpx.MockTransport(handler), rate_limiter=make_limiter()
+    )
+    with patch("src.core.async_github_client.asyncio.sleep", new_callable=AsyncMock) as sleep:
+        assert asyncio.run(client.get_repository("owner/repo")) == {"full_name": "owner/repo"}
+    assert len(calls) == 2
+    sleep.assert_awaited_once_with(4)
@@ -0,0 +1,299 @@
+import asyncio
+import threading
+import time
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from src.core import tracing
+from src.core.concurrency import grouped_stdout
+from src.core.hedging import (
+    DEFAULT_HEDGE_DELAY,
+    AsyncHedgedAIClient,
+    HedgedAIClient,
+    HedgeStats,
+)
+from src.core.llm_rate_limit import (
+    AsyncRateLimitedAIClient,
+    ProviderRateLimiter,
+    RateLimitedAIClient,
+)
+from src.core.run_report import RunReport, record_usage, set_run_report
+
+
+def make_client(model_name, response=None, delay=0.0, error=None):
+    def generate(prompt, *args):
+        time.sleep(delay)
+        if error:
+            raise error
+        return response
+
+    client = Mock(model_name=model_name)
+    client.generate_content.side_effect = generate
+    client.generate_title.side_effect = generate
+    return client
+
+
+def make_async_client(model_name, response=None, delay=0.0, error=None):
+    async def generate(prompt, *args):
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        return response
+
+    client = AsyncMock(model_name=model_name)
+    client.generate_content.side_effect = generate
+    client.generate_title.side_effect = generate
+    return client
+
+
+def hedged(primary, secondary, stats=None, delay=0.05, cls=HedgedAIClient):
+    return cls(primary, secondary, "gemini", "deepseek", stats or HedgeStats(), delay=delay)
+
+
+def test_percentile_needs_enough_samples():
+    stats = HedgeStats([1.0, 2.0])
+    assert stats.percentile(0.95) is None
+    stats = HedgeStats([float(i) for i in range(1, 21)])
+    assert stats.percentile(0.95) == 20.0
+    assert stats.percentile(0.5) == 11.0
+
+
+def test_hedge_delay():
+    assert hedged(Mock(), Mock(), delay=1.5).hedge_delay() == 1.5
+    assert hedged(Mock(), Mock(), delay=0).hedge_delay() == DEFAULT_HEDGE_DELAY
+    stats = HedgeStats([0.5] * 10)
+    assert hedged(Mock(), Mock(), stats, delay=0).hedge_delay() == 0.5
+
+
+def test_stats_load_and_save(tmp_path):
+    path = tmp_path / "cache" / "latencies.json"
+    assert list(HedgeStats.load(path, "gemini:model").latencies) == []
+
+    HedgeStats([1.25, 2.5]).save(str(path), "gemini:model")
+    HedgeStats([3.0]).save(str(path), "openai:model")
+
+    assert list(HedgeStats.load(path, "gemini:model").latencies) == [1.25, 2.5]
+    assert list(HedgeStats.load(path, "openai:model").latencies) == [3.0]
+
+
+def test_fast_primary_is_not_hedged():
+    primary = make_client("gemini-2.0-flash", "Primary title")
+    secondary = make_client("deepseek-chat", "Secondary title")
+    client = hedged(primary, secondary)
+
+    assert client.model_name == "gemini-2.0-flash"
+    assert client.generate_content("prompt") == "Primary title"
+    secondary.generate_content.assert_not_called()
+    assert (client.stats.requests, client.stats.hedged) == (1, 0)
+    assert len(client.stats.latencies) == 1
+
+
+def test_slow_primary_is_hedged(capsys):
+    primary = make_client("gemini-2.0-flash", "Primary title", delay=0.5)
+    secondary = make_client("deepseek-chat", ("Secondary title", None))
+    client = hedged(primary, secondary)
+
+    assert client.generate_title("prompt", 64) == ("Secondary title", None)
+    secondary.generate_title.assert_called_once_with("prompt", 64)
+    assert (client.stats.hedged, client.stats.secondary_wins) == (1, 1)
+    output = capsys.readouterr().out
+    assert "No answer from gemini after 0.1s, hedging with deepseek" in output
+    assert "Hedging: 1 of 1 requests hedged (100%), 1 answered first" in client.stats.summary()
+
+
+def test_primary_can_still_win_after_hedging():
+    primary = make_client("gemini-2.0-flash", "Primary title", delay=0.1)
+    secondary = make_client("deepseek-chat", "Secondary title", delay=1)
+    client = hedged(primary, secondary)
+
+    assert client.generate_content("prompt") == "Primary title"
+    assert (client.stats.hedged, client.stats.secondary_wins) == (1, 0)
+
+
+def test_failed_secondary_waits_for_primary():
+    primary = make_client("gemini-2.0-flash", "Primary title", delay=0.2)
+    secondary = make_client("deepseek-chat", error=RuntimeError("boom"))
+    client = hedged(primary, secondary)
+
+    assert client.generate_content("prompt") == "Primary title"
+
+
+def test_both_failing_raises_primary_error():
+    primary = make_client("gemini-2.0-flash", delay=0.1, error=RuntimeError("primary"))
+    secondary = make_client("deepseek-chat", error=RuntimeError("secondary"))
+    client = hedged(primary, secondary)
+
+    with pytest.raises(RuntimeError, match="primary"):
+        client.generate_content("prompt")
+    assert client.stats.latencies == type(client.stats.latencies)()
+
+
+def test_abandoned_primary_runs_on_daemon_thread():
+    primary = make_client("gemini-2.0-flash", "Primary title", delay=5)
+    client = hedged(primary, make_client("deepseek-chat", "Secondary title"))
+
+    assert client.generate_content("prompt") == "Secondary title"
+    assert all(t.daemon for t in threading.enumerate() if t is not threading.main_thread())
+
+
+def reporting_client(model_name, response, delay=0.0):
+    def generate(prompt):
+        print(f"{model_name} answering")
+        time.sleep(delay)
+        record_usage(model_name, 10, 2)
+        return response
+
+    client = Mock(model_name=model_name)
+    client.generate_content.side_effect = generate
+    return client
+
+
+def test_abandoned_request_output_is_dropped(capsys):
+    primary = reporting_client("gemini-2.0-flash", "Primary title", delay=0.3)
+    client = hedged(primary, reporting_client("deepseek-chat", "Secondary title"))
+    stdout = grouped_stdout()
+
+    stdout.start()
+    assert client.generate_content("prompt") == "Secondary title"
+    issue_output = stdout.take()
+    client.settle()
+
+    # The winner's output stays with the issue; the loser's isn't written anywhere.
+    assert "deepseek-chat answering" in issue_output
+    assert "gemini-2.0-flash answering" not in issue_output + capsys.readouterr().out
+
+
+def test_settle_reports_abandoned_request_usage(capsys):
+    report = RunReport()
+    set_run_report(report)
+    try:
+        primary = reporting_client("gemini-2.0-flash", "Primary title", delay=0.3)
+        client = hedged(primary, reporting_client("deepseek-chat", "Secondary title"))
+        assert client.generate_content("prompt") == "Secondary title"
+        client.settle()
+    finally:
+        set_run_report(None)
+
+    assert set(report.tokens) == {"gemini-2.0-flash", "deepseek-chat"}
+    assert "Waiting for 1 abandoned model request(s) to finish" in capsys.readouterr().out
+    client.settle()
+    assert capsys.readouterr().out == ""
+
+
+def test_settle_gives_up_after_timeout(capsys):
+    primary = reporting_client("gemini-2.0-flash", "Primary title", delay=5)
+    client = hedged(primary, reporting_client("deepseek-chat", "Secondary title"))
+    client.generate_content("prompt")
+
+    client.settle(timeout=0.01)
+
+    assert "1 abandoned model request(s) still running" in capsys.readouterr().out
+
+
+def test_rate_limit_wait_does_not_trigger_hedge():
+    limiter = ProviderRateLimiter("gemini")
+    limiter.reserve = Mock(return_value=0.3)
+    primary = RateLimitedAIClient(make_client("gemini-2.0-flash", "Primary title"), limiter)
+    secondary = make_client("deepseek-chat", "Secondary title")
+    client = hedged(primary, secondary)
+
+    assert client.generate_content("prompt") == "Primary title"
+    secondary.generate_content.assert_not_called()
+    # The recorded latency doesn't include the wait for the rate limiter either.
+    assert client.stats.latencies[0] < 0.3
+
+
+def test_hedged_request_keeps_caller_context():
+    def generate(prompt):
+        with tracing.span("llm.generate_content"):
+            return "Primary title"
+
+    primary = Mock(model_name="gemini-2.0-flash")
+    primary.generate_content.side_effect = generate
+    client = hedged(primary, make_client("deepseek-chat", "Secondary title"))
+    tracer = tracing.Tracer()
+    tracing.set_tracer(tracer)
+    try:
+        with tracing.span("process_issue"):
+            client.generate_content("prompt")
+    finally:
+        tracing.set_tracer(None)
+
+    request, parent = tracer.spans
+    assert request.parent_id == parent.span_id
+
+
+def test_warm_up_warms_both_providers():
+    primary, secondary = Mock(model_name="a"), Mock(model_name="b")
+    hedged(primary, secondary).warm_up()
+    primary.warm_up.assert_called_once()
+    secondary.warm_up.assert_called_once()
+
+
+def test_async_fast_primary_is_not_hedged():
+    primary = make_async_client("gemini-2.0-flash", "Primary title")
+    secondary = make_async_client("deepseek-chat", "Secondary title")
+    client = hedged(primary, secondary, cls=AsyncHedgedAIClient)
+
+    assert asyncio.run(client.generate_content("prompt")) == "Primary title"
+    secondary.generate_content.assert_not_called()
+    assert len(client.stats.latencies) == 1
+
+
+def test_async_slow_primary_is_cancelled():
+    cancelled = []
+
+    async def slow(prompt, *args):
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(prompt)
+            raise
+
+    primary = make_async_client("gemini-2.0-flash")
+    primary.generate_title.side_effect = slow
+    secondary = make_async_client("deepseek-chat", ("Secondary title", None))
+    client = hedged(primary, secondary, cls=AsyncHedgedAIClient)
+
+    async def main():
+        result = await client.generate_title("prompt", 64)
+        await asyncio.sleep(0)
+        return result
+
+    assert asyncio.run(main()) == ("Secondary title", None)
+    assert cancelled == ["prompt"]
+    assert (client.stats.hedged, client.stats.secondary_wins) == (1, 1)
+
+
+def test_async_both_failing_raises_primary_error():
+    primary = make_async_client("gemini-2.0-flash", delay=0.1, error=RuntimeError("primary"))
+    secondary = make_async_client("deepseek-chat", error=RuntimeError("secondary"))
+    client = hedged(primary, secondary, cls=AsyncHedgedAIClient)
+
+    with pytest.raises(RuntimeError, match="primary"):
+        asyncio.run(client.generate_content("prompt"))
+
+
+def test_async_rate_limit_wait_does_not_trigger_hedge():
+    limiter = ProviderRateLimiter("gemini")
+    limiter.reserve = Mock(return_value=0.3)
+    primary = AsyncRateLimitedAIClient(
+        make_async_client("gemini-2.0-flash", "Primary title"), limiter
+    )
+    secondary = make_async_client("deepseek-chat", "Secondary title")
+    client = hedged(primary, secondary, cls=AsyncHedgedAIClient)
+
+    assert asyncio.run(client.generate_content("prompt")) == "Primary title"
+    secondary.generate_content.assert_not_called()
+
+
+def test_async_warm_up_and_aclose_reach_both_providers():
+    primary, secondary = AsyncMock(model_name="a"), AsyncMock(model_name="b")
+    client = hedged(primary, secondary, cls=AsyncHedgedAIClient)
+    asyncio.run(client.warm_up())
+    asyncio.run(client.aclose())
+    primary.warm_up.assert_awaited_once()
+    secondary.warm_up.assert_awaited_once()
+    primary.aclose.assert_awaited_once()
+    secondary.aclose.assert_awaited_once()
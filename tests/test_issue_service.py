@@ -1,4 +1,6 @@
-from unittest.mock import Mock, patch
+import asyncio
+import json
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 
@@ -21,9 +23,7 @@ def test_process_issue_already_labeled(processor):
     mock_issue.number = 1
     mock_issue.title = "Original title"
     mock_issue.body = issue_body
-    mock_label = Mock()
-    mock_label.name = processor.skip_label
-    mock_issue.labels = [mock_label]
+    mock_issue.label_names = (processor.skip_label,)
 
     result = processor.process_issue(mock_issue)
 
@@ -35,7 +35,7 @@ def test_process_issue_title_already_optimal(processor):
     mock_issue.number = 1
     mock_issue.title = "Original title"
     mock_issue.body = issue_body
-    mock_issue.labels = []
+    mock_issue.label_names = ()
 
     processor.ai_client.generate_content.return_value = "Original title"
 
@@ -53,12 +53,35 @@ def test_process_issue_title_already_optimal(processor):
     processor.ai_client.generate_content.assert_called_once_with(expected_prompt)
 
 
+def test_process_issue_remembers_optimal_title():
+    verdicts = Mock()
+    verdicts.is_optimal.return_value = False
+    processor = IssueProcessor(
+        Mock(), Mock(), "{original_title} {issue_body}", "titled", verdicts=verdicts
+    )
+    mock_issue = Mock(number=1, title="Original title", body=issue_body, label_names=())
+    processor.ai_client.generate_content.return_value = "Original title"
+
+    processor.process_issue(mock_issue)
+
+    verdicts.record.assert_called_once_with(mock_issue)
+    processor.github_client.add_issue_label.assert_not_called()
+
+    verdicts.is_optimal.return_value = True
+    processor.ai_client.generate_content.reset_mock()
+    result = processor.process_issue(mock_issue)
+
+    assert result["skipped"] is True
+    assert result["reason"] == "Title already optimal"
+    processor.ai_client.generate_content.assert_not_called()
+
+
 def test_short_body(processor):
     mock_issue = Mock()
     mock_issue.number = 1
     mock_issue.title = "Original title"
     mock_issue.body = "Hello"
-    mock_issue.labels = []
+    mock_issue.label_names = ()
 
     processor.ai_client.generate_content.return_value = "Original title"
 
@@ -81,7 +104,7 @@ def test_process_issue_auto_update(processor):
     mock_issue.number = 1
     mock_issue.title = "Original title"
     mock_issue.body = issue_body
-    mock_issue.labels = []
+    mock_issue.label_names = ()
 
     processor.ai_client.generate_content.return_value = "Improved title"
 
@@ -109,7 +132,7 @@ def test_process_issue_suggestion_only(processor):
     mock_issue.number = 1
     mock_issue.title = "Original title"
     mock_issue.body = issue_body
-    mock_issue.labels = []
+    mock_issue.label_names = ()
 
     processor.ai_client.generate_content.return_value = "Improved title"
 
@@ -132,7 +155,7 @@ def test_process_issue_error(processor):
     mock_issue.number = 1
     mock_issue.title = "Original title"
     mock_issue.body = issue_body
-    mock_issue.labels = []
+    mock_issue.label_names = ()
 
     processor.ai_client.generate_content.side_effect = Exception("API error")
 
@@ -142,6 +165,53 @@ def test_process_issue_error(processor):
     assert result["error"] == "API error"
 
 
+@pytest.fixture
+def async_processor():
+    prompt = "Test prompt for {original_title} and {issue_body}"
+    return IssueProcessor(AsyncMock(), AsyncMock(), prompt, "titled")
+
+
+def test_process_issue_async_auto_update(async_processor):
+    mock_issue = Mock()
+    mock_issue.number = 1
+    mock_issue.title = "Original title"
+    mock_issue.body = issue_body
+    mock_issue.label_names = ()
+
+    async_processor.ai_client.generate_content.return_value = "Improved title"
+
+    result = asyncio.run(async_processor.process_issue_async(mock_issue, auto_update=True))
+
+    assert result["improved_title"] == "Improved title"
+    assert result["updated"] is True
+    async_processor.ai_client.generate_content.assert_awaited_once_with(
+        async_processor.prompt.format(original_title="Original title", issue_body=issue_body)
+    )
+    async_processor.github_client.update_issue_title.assert_awaited_once_with(
+        mock_issue, "Improved title"
+    )
+    async_processor.github_client.add_issue_comment.assert_awaited_once()
+    async_processor.github_client.add_issue_label.assert_awaited_once_with(mock_issue, "titled")
+
+
+def test_process_issue_async_skip_and_error(async_processor):
+    mock_issue = Mock()
+    mock_issue.number = 1
+    mock_issue.title = "Original title"
+    mock_issue.body = "Hello"
+    mock_issue.label_names = ()
+
+    result = asyncio.run(async_processor.process_issue_async(mock_issue))
+    assert result["reason"] == "Issue body too short"
+
+    mock_issue.body = issue_body
+    async_processor.ai_client.generate_content.side_effect = Exception("API error")
+
+    result = asyncio.run(async_processor.process_issue_async(mock_issue))
+    assert result == {"issue_number": 1, "error": "API error"}
+    async_processor.github_client.add_issue_comment.assert_not_awaited()
+
+
 def test_generate_improved_title(processor):
     mock_issue = Mock()
     mock_issue.title = "Original title"
@@ -163,7 +233,7 @@ def test_quite(processor):
     mock_issue.number = 1
     mock_issue.title = "Original title"
     mock_issue.body = issue_body
-    mock_issue.labels = []
+    mock_issue.label_names = ()
 
     processor.ai_client.generate_content.return_value = "Improved title"
 
@@ -191,7 +261,7 @@ def test_strip_chars(processor):
     mock_issue.number = 1
     mock_issue.title = "Original title"
     mock_issue.body = issue_body
-    mock_issue.labels = []
+    mock_issue.label_names = ()
 
     processor.ai_client.generate_content.return_value = "Improved titleHAHAHA"
 
@@ -237,13 +307,8 @@ def test_required_labels_filtering_should_process(required_labels):
     issue.title = "Original Issue Title"
     issue.body = issue_body
 
-    # Create mock labels with name attributes that will match required_labels
-    bug_label = MagicMock()
-    bug_label.name = "bug"
-    feature_label = MagicMock()
-    feature_label.name = "feature"
-
-    issue.labels = [bug_label, feature_label]
+    # Label names that will match required_labels
+    issue.label_names = ("bug", "feature")
 
     # Patch the generate_improved_title method to avoid actual AI calls
     with patch.object(issue_processor, "generate_improved_title", return_value="Improved Title"):
@@ -277,13 +342,8 @@ def test_required_labels_filtering_will_skip():
     issue.title = "Another Issue Title"
     issue.body = "Another issue body" * 30
 
-    # Create mock labels with name attributes that won't match required_labels
-    feature_label = MagicMock()
-    feature_label.name = "feature"
-    doc_label = MagicMock()
-    doc_label.name = "documentation"
-
-    issue.labels = [feature_label, doc_label]
+    # Label names that won't match required_labels
+    issue.label_names = ("feature", "documentation")
 
     # Process the issue
     result = issue_processor.process_issue(issue)
@@ -295,3 +355,239 @@ def test_required_labels_filtering_will_skip():
     assert result["updated"] is False
     assert result["skipped"] is True
     assert "No matching labels found" in result["reason"]
+
+
+def make_issue(number, body=issue_body):
+    issue = Mock()
+    issue.number = number
+    issue.title = f"Title {number}"
+    issue.body = body
+    issue.label_names = ()
+    return issue
+
+
+def test_make_batches_respects_size_and_token_budget(processor):
+    issues = [make_issue(n) for n in range(1, 6)]
+    assert [len(batch) for batch in processor.make_batches(issues, 2, 100000)] == [2, 2, 1]
+
+    huge = make_issue(6, body="x" * 40000)
+    batches = processor.make_batches([issues[0], huge, issues[1]], 10, 2000)
+    assert [[issue.number for issue in batch] for batch in batches] == [[1], [6], [2]]
+
+
+def test_make_batches_counts_the_sent_serialization(processor):
+    issues = [make_issue(n, body="Crash") for n in range(1, 41)]
+    # The indentation of the sent JSON alone makes all issues overflow this budget.
+    limit = processor.count_tokens(processor.render_batch_prompt(issues)) - 1
+
+    batches = processor.make_batches(issues, batch_size=40, max_batch_tokens=limit)
+
+    assert len(batches) == 2
+    for batch in batches:
+        assert processor.count_tokens(processor.render_batch_prompt(batch)) <= limit
+
+
+def test_render_batch_prompt_json_matches_json_dumps(processor):
+    issues = [make_issue(1, body="Ünïcode\n  indented"), make_issue(2)]
+    items = [{"issue_number": i.number, "title": i.title, "body": i.body} for i in issues]
+
+    prompt = processor.render_batch_prompt(issues)
+
+    assert json.dumps(items, ensure_ascii=False, indent=2) in prompt
+
+
+def test_render_batch_prompt(processor):
+    prompt = processor.render_batch_prompt([make_issue(1), make_issue(2)])
+
+    assert prompt.startswith("Test prompt for (see the `title` field of each issue below)")
+    assert '"issue_number": 2' in prompt
+    assert '{"issue_number": <number>, "title":' in prompt
+
+
+def test_parse_batch_response():
+    issues = [make_issue(1), make_issue(2), make_issue(3)]
+    response = (
+        "```json\n"
+        '[{"issue_number": 1, "title": "T1"}, {"issue_number": "2", "title": "T2"}, '
+        '{"issue_number": 9, "title": "T9"}, {"issue_number": 3}, "junk"]\n'
+        "```"
+    )
+
+    assert IssueProcessor.parse_batch_response(response, issues) == {1: "T1", 2: "T2"}
+    assert IssueProcessor.parse_batch_response("No JSON here", issues) == {}
+    assert IssueProcessor.parse_batch_response("[not json]", issues) == {}
+
+
+def test_process_issues_batched_with_fallback(processor):
+    issues = [make_issue(1), make_issue(2, body="short"), make_issue(3), make_issue(4)]
+
+    def generate(prompt):
+        if "JSON array" in prompt:
+            return '[{"issue_number": 1, "title": "T1"}, {"issue_number": 3, "title": "Title 3"}]'
+        return "T4 single"
+
+    processor.ai_client.generate_content.side_effect = generate
+
+    results = processor.process_issues_batched(issues, batch_size=5, max_batch_tokens=100000)
+
+    assert [r["issue_number"] for r in results] == [1, 2, 3, 4]
+    assert results[0]["improved_title"] == "T1"
+    assert results[1]["reason"] == "Issue body too short"
+    assert results[2]["improved_title"] is None
+    assert results[3]["improved_title"] == "T4 single"
+    # One batch request plus a single-issue fallback for #4.
+    assert processor.ai_client.generate_content.call_count == 2
+    assert processor.github_client.add_issue_label.call_count == 2
+
+
+def test_process_issues_batched_request_error(processor):
+    issues = [make_issue(1), make_issue(2)]
+    processor.ai_client.generate_content.side_effect = [
+        Exception("Batch error"),
+        "T1",
+        Exception("API error"),
+    ]
+
+    results = processor.process_issues_batched(issues, batch_size=5, max_batch_tokens=100000)
+
+    assert results[0]["improved_title"] == "T1"
+    assert results[1] == {"issue_number": 2, "error": "API error"}
+
+
+def test_process_issues_batched_write_error(processor):
+    issues = [make_issue(1), make_issue(2)]
+    processor.ai_client.generate_content.return_value = (
+        '[{"issue_number": 1, "title": "T1"}, {"issue_number": 2, "title": "T2"}]'
+    )
+    processor.github_client.add_issue_comment.side_effect = [Exception("API error"), None]
+
+    results = processor.process_issues_batched(
+        issues, batch_size=5, max_batch_tokens=100000, max_workers=2
+    )
+
+    assert results[0] == {"issue_number": 1, "error": "API error"}
+    assert results[1]["improved_title"] == "T2"
+
+
+def test_process_issues_batched_async_with_fallback(async_processor):
+    issues = [make_issue(1), make_issue(2), make_issue(3)]
+    async_processor.ai_client.generate_content.side_effect = [
+        '[{"issue_number": 1, "title": "T1"}, {"issue_number": 2, "title": "T2"}]',
+        "T3 single",
+    ]
+    async_processor.github_client.add_issue_comment.side_effect = [
+        Exception("API error"),
+        None,
+        None,
+    ]
+
+    results = asyncio.run(
+        async_processor.process_issues_batched_async(issues, batch_size=5, max_batch_tokens=100000)
+    )
+
+    assert results[0] == {"issue_number": 1, "error": "API error"}
+    assert results[1]["improved_title"] == "T2"
+    assert results[2]["improved_title"] == "T3 single"
+
+
+def test_process_issues_batched_async_request_error(async_processor):
+    issues = [make_issue(1), make_issue(2)]
+    async_processor.ai_client.generate_content.side_effect = [Exception("Batch error"), "T1", "T2"]
+
+    results = asyncio.run(
+        async_processor.process_issues_batched_async(issues, batch_size=5, max_batch_tokens=100000)
+    )
+
+    assert [r["improved_title"] for r in results] == ["T1", "T2"]
+
+
+def test_process_batch_of_one(processor):
+    processor.ai_client.generate_content.return_value = "Improved title"
+
+    results = processor.process_batch([make_issue(1)])
+
+    assert results[0]["improved_title"] == "Improved title"
+    processor.ai_client.generate_content.assert_called_once_with(
+        processor.render_prompt("Title 1", issue_body)
+    )
+
+
+def test_process_issue_truncates_long_body(processor):
+    processor.max_body_tokens = 50
+    processor.ai_client.generate_content.return_value = "Improved title"
+    issue = make_issue(1)
+    issue.body = "\n".join(f"line {i} " + "x" * 40 for i in range(100))
+
+    result = processor.process_issue(issue)
+
+    prompt = processor.ai_client.generate_content.call_args[0][0]
+    assert "line 0 " in prompt
+    assert "line 99 " in prompt
+    assert "lines omitted" in prompt
+    assert result["body_tokens"]["original"] > 1000
+    assert result["body_tokens"]["sent"] <= 50
+    assert processor.body_tokens == {}
+
+
+def test_process_issue_short_body_not_truncated(processor):
+    processor.max_body_tokens = 1000
+    processor.ai_client.generate_content.return_value = "Improved title"
+
+    result = processor.process_issue(make_issue(1))
+
+    processor.ai_client.generate_content.assert_called_once_with(
+        processor.render_prompt("Title 1", issue_body)
+    )
+    assert "body_tokens" not in result
+
+
+def test_make_batches_uses_truncated_bodies(processor):
+    processor.max_body_tokens = 100
+    issues = [make_issue(i) for i in range(1, 4)]
+    for issue in issues:
+        issue.body = "word " * 2000
+
+    batches = processor.make_batches(issues, batch_size=3, max_batch_tokens=1000)
+
+    assert [len(batch) for batch in batches] == [3]
+    # Only the token counts are kept, not the truncated text.
+    assert all(len(tokens) == 2 for tokens in processor.body_tokens.values())
+    assert len(processor.body_tokens) == 3
+
+
+def test_process_issue_streaming(processor, capsys):
+    processor.stream = True
+    processor.max_output_tokens = 64
+    stats = {"time_to_title": 0.25, "output_tokens": 3, "tokens_saved": 61}
+    processor.ai_client.generate_title.return_value = ("Improved title", stats)
+
+    result = processor.process_issue(make_issue(1))
+
+    processor.ai_client.generate_title.assert_called_once_with(
+        processor.render_prompt("Title 1", issue_body), 64
+    )
+    processor.ai_client.generate_content.assert_not_called()
+    assert result["improved_title"] == "Improved title"
+    assert result["generation"] == stats
+    assert "title after 0.25s, ~3 output tokens, up to 61 saved" in capsys.readouterr().out
+
+
+def test_process_issue_streaming_cached(processor):
+    processor.stream = True
+    processor.ai_client.generate_title.return_value = ("Improved title", None)
+
+    result = processor.process_issue(make_issue(1))
+
+    assert result["improved_title"] == "Improved title"
+    assert "generation" not in result
+
+
+def test_process_issue_async_streaming(async_processor):
+    async_processor.stream = True
+    stats = {"time_to_title": 0.1, "output_tokens": 3, "tokens_saved": 0}
+    async_processor.ai_client.generate_title.return_value = ("Improved title", stats)
+
+    result = asyncio.run(async_processor.process_issue_async(make_issue(1)))
+
+    async_processor.ai_client.generate_content.assert_not_awaited()
+    assert result["generation"] == stats
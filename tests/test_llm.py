@@ -1,8 +1,27 @@
-from unittest.mock import Mock, patch
+import asyncio
+import subprocess
+import sys
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 
-from src.core.llm import DeepseekAIClient, GeminiAIClient, OpenAIClient, create_ai_client
+from src.core.llm import (
+    AIClient,
+    AsyncAIClient,
+    AsyncDeepseekAIClient,
+    AsyncGeminiAIClient,
+    AsyncOpenAIClient,
+    DeepseekAIClient,
+    GeminiAIClient,
+    OpenAIClient,
+    ProviderSpec,
+    async_read_title_line,
+    create_ai_client,
+    create_async_ai_client,
+    read_title_line,
+    set_http_pool_size,
+    shared_http_client,
+)
 
 
 def test_gemini_init_with_api_key():
@@ -50,7 +69,9 @@ def test_openai_init_with_api_key():
     with patch("openai.OpenAI") as mock_openai:
         client = OpenAIClient("valid-key", "gpt-4")
 
-        mock_openai.assert_called_once_with(api_key="valid-key")
+        mock_openai.assert_called_once_with(
+            api_key="valid-key", max_retries=0, http_client=client.http_client
+        )
         assert client.model_name == "gpt-4"
 
 
@@ -90,7 +111,10 @@ def test_deepseek_init_with_api_key():
         client = DeepseekAIClient("valid-key", "deepseek-chat")
 
         mock_openai.assert_called_once_with(
-            api_key="valid-key", base_url="https://api.deepseek.com/v1"
+            api_key="valid-key",
+            base_url="https://api.deepseek.com/v1",
+            max_retries=0,
+            http_client=client.http_client,
         )
         assert client.model_name == "deepseek-chat"
 
@@ -161,3 +185,420 @@ def test_create_ai_client_default_model():
 def test_create_ai_client_unsupported():
     with pytest.raises(ValueError, match="Unsupported AI provider: invalid"):
         create_ai_client("invalid", "api-key")
+
+
+def test_async_gemini_generate_content():
+    mock_response = Mock()
+    mock_response.text = "Generated response "
+
+    mock_model = Mock()
+    mock_model.generate_content_async = AsyncMock(return_value=mock_response)
+
+    with patch("google.generativeai.configure"):
+        with patch("google.generativeai.GenerativeModel", return_value=mock_model):
+            client = AsyncGeminiAIClient("valid-key", "gemini-2.0-flash")
+            result = asyncio.run(client.generate_content("Test prompt"))
+
+            assert result == "Generated response"
+            mock_model.generate_content_async.assert_awaited_once_with("Test prompt")
+
+
+def test_async_gemini_generate_content_error():
+    mock_model = Mock()
+    mock_model.generate_content_async = AsyncMock(side_effect=Exception("API error"))
+
+    with patch("google.generativeai.configure"):
+        with patch("google.generativeai.GenerativeModel", return_value=mock_model):
+            client = AsyncGeminiAIClient("valid-key", "gemini-2.0-flash")
+
+            with pytest.raises(Exception, match="API error"):
+                asyncio.run(client.generate_content("Test prompt"))
+
+
+@pytest.mark.parametrize(
+    "client_cls, expected_kwargs",
+    [
+        (AsyncOpenAIClient, {"api_key": "valid-key", "max_retries": 0}),
+        (
+            AsyncDeepseekAIClient,
+            {
+                "api_key": "valid-key",
+                "base_url": "https://api.deepseek.com/v1",
+                "max_retries": 0,
+            },
+        ),
+    ],
+)
+def test_async_openai_compatible_generate_content(client_cls, expected_kwargs):
+    mock_response = Mock()
+    mock_response.choices = [Mock(message=Mock(content="Generated response"))]
+
+    mock_client = Mock()
+    mock_client.chat.completions.create = AsyncMock(return_value=mock_response)
+
+    with patch("openai.AsyncOpenAI", return_value=mock_client) as mock_async_openai:
+        client = client_cls("valid-key", "model")
+        result = asyncio.run(client.generate_content("Test prompt"))
+
+        assert result == "Generated response"
+        mock_async_openai.assert_called_once_with(**expected_kwargs, http_client=client.http_client)
+        mock_client.chat.completions.create.assert_awaited_once()
+
+
+@pytest.mark.parametrize("client_cls", [AsyncOpenAIClient, AsyncDeepseekAIClient])
+def test_async_openai_compatible_generate_content_error(client_cls):
+    mock_client = Mock()
+    mock_client.chat.completions.create = AsyncMock(side_effect=Exception("API error"))
+
+    with patch("openai.AsyncOpenAI", return_value=mock_client):
+        client = client_cls("valid-key", "model")
+
+        with pytest.raises(Exception, match="API error"):
+            asyncio.run(client.generate_content("Test prompt"))
+
+
+@pytest.mark.parametrize(
+    "client_cls, message",
+    [
+        (AsyncGeminiAIClient, "Gemini API key not provided"),
+        (AsyncOpenAIClient, "OpenAI API key not provided"),
+        (AsyncDeepseekAIClient, "Deepseek API key not provided"),
+    ],
+)
+def test_async_init_without_api_key(client_cls, message):
+    with pytest.raises(ValueError, match=message):
+        client_cls("", "model")
+
+
+def test_create_async_ai_client():
+    with patch("src.core.llm.AsyncGeminiAIClient") as mock_gemini:
+        create_async_ai_client("gemini", "api-key")
+        mock_gemini.assert_called_once_with("api-key", "gemini-2.0-flash")
+
+    with patch("src.core.llm.AsyncOpenAIClient") as mock_openai:
+        create_async_ai_client("openai", "api-key", "model-name")
+        mock_openai.assert_called_once_with("api-key", "model-name")
+
+    with patch("src.core.llm.AsyncDeepseekAIClient") as mock_deepseek:
+        create_async_ai_client("deepseek", "api-key")
+        mock_deepseek.assert_called_once_with("api-key", "deepseek-chat")
+
+    with pytest.raises(ValueError, match="Unsupported AI provider: invalid"):
+        create_async_ai_client("invalid", "api-key")
+
+
+def test_create_ai_client_fallback_chain():
+    wrap = Mock(side_effect=lambda provider, client: client)
+    with (
+        patch("src.core.llm.GeminiAIClient") as mock_gemini,
+        patch("src.core.llm.DeepseekAIClient") as mock_deepseek,
+    ):
+        client = create_ai_client(
+            [("gemini", "gemini-key", None), ("deepseek", "deepseek-key", "deepseek-reasoner")],
+            wrap=wrap,
+        )
+
+    assert type(client).__name__ == "FallbackAIClient"
+    mock_gemini.assert_called_once_with("gemini-key", "gemini-2.0-flash")
+    mock_deepseek.assert_called_once_with("deepseek-key", "deepseek-reasoner")
+    assert [(name, wrapped) for name, wrapped, _ in client.clients] == [
+        ("gemini", mock_gemini.return_value),
+        ("deepseek", mock_deepseek.return_value),
+    ]
+    assert [call.args[0] for call in wrap.call_args_list] == ["gemini", "deepseek"]
+
+
+def test_create_async_ai_client_fallback_chain():
+    with (
+        patch("src.core.llm.AsyncGeminiAIClient") as mock_gemini,
+        patch("src.core.llm.AsyncOpenAIClient") as mock_openai,
+    ):
+        client = create_async_ai_client([("gemini", "key", None), ("openai", "key", None)])
+
+    assert type(client).__name__ == "AsyncFallbackAIClient"
+    assert [wrapped for _, wrapped, _ in client.clients] == [
+        mock_gemini.return_value,
+        mock_openai.return_value,
+    ]
+
+
+class PluginClient:
+    def __init__(self, api_key, model_name):
+        self.api_key = api_key
+        self.model_name = model_name
+
+
+def test_create_ai_client_from_entry_point():
+    entry_point = Mock()
+    entry_point.name = "Plugin"
+    entry_point.load.return_value = ProviderSpec(
+        f"{__name__}:PluginClient", default_model="plugin-model"
+    )
+
+    with (
+        patch.dict("src.core.llm._providers"),
+        patch("src.core.llm._entry_points_loaded", False),
+        patch("src.core.llm.entry_points", return_value=[entry_point]) as mock_entry_points,
+    ):
+        client = create_ai_client("plugin", "api-key")
+
+        assert isinstance(client, PluginClient)
+        assert client.model_name == "plugin-model"
+        mock_entry_points.assert_called_once_with(group="issue_title_ai.providers")
+        with pytest.raises(ValueError, match="doesn't support async execution"):
+            create_async_ai_client("plugin", "api-key")
+
+
+def test_builtin_provider_does_not_scan_entry_points():
+    with (
+        patch("src.core.llm._entry_points_loaded", False),
+        patch("src.core.llm.entry_points") as mock_entry_points,
+        patch("src.core.llm.GeminiAIClient"),
+    ):
+        create_ai_client("gemini", "api-key")
+
+    mock_entry_points.assert_not_called()
+
+
+def test_import_does_not_load_provider_sdks():
+    code = (
+        "import sys, src.core.llm; "
+        "assert 'openai' not in sys.modules and 'google.generativeai' not in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)  # noqa: S603
+
+
+def test_openai_compatible_clients_share_http_client():
+    with patch("openai.OpenAI"):
+        openai_client = OpenAIClient("valid-key", "gpt-4")
+        deepseek_client = DeepseekAIClient("valid-key", "deepseek-chat")
+
+    assert openai_client.http_client is shared_http_client()
+    assert deepseek_client.http_client is openai_client.http_client
+
+
+def test_http_pool_is_sized_for_max_concurrency():
+    set_http_pool_size(4)
+    try:
+        with patch("openai.AsyncOpenAI"):
+            client = AsyncOpenAIClient("valid-key", "gpt-4")
+    finally:
+        set_http_pool_size(1)
+
+    # Room for every worker's request and its hedged twin, all kept alive between requests.
+    pool = client.http_client._transport._pool
+    assert pool._max_connections == pool._max_keepalive_connections == 8
+    asyncio.run(client.aclose())
+
+
+def test_openai_warm_up():
+    with patch("openai.OpenAI") as mock_openai:
+        mock_openai.return_value.base_url = "https://api.deepseek.com/v1/"
+        client = DeepseekAIClient("valid-key", "deepseek-chat")
+
+    with patch.object(client.http_client, "head") as mock_head:
+        client.warm_up()
+        mock_head.assert_called_once_with("https://api.deepseek.com/v1/")
+
+        mock_head.side_effect = Exception("connection refused")
+        client.warm_up()
+
+
+def test_async_openai_warm_up():
+    with patch("openai.AsyncOpenAI") as mock_openai:
+        mock_openai.return_value.base_url = "https://api.openai.com/v1/"
+        client = AsyncOpenAIClient("valid-key", "gpt-4")
+
+    with patch.object(client.http_client, "head", new_callable=AsyncMock) as mock_head:
+        asyncio.run(client.warm_up())
+        mock_head.assert_awaited_once_with("https://api.openai.com/v1/")
+
+        mock_head.side_effect = Exception("connection refused")
+        asyncio.run(client.warm_up())
+
+
+def test_async_openai_aclose_closes_http_client():
+    with patch("openai.AsyncOpenAI"):
+        client = AsyncOpenAIClient("valid-key", "gpt-4")
+
+    asyncio.run(client.aclose())
+
+    assert client.http_client.is_closed
+
+
+def test_gemini_warm_up_is_noop():
+    with patch("google.generativeai.configure"), patch("google.generativeai.GenerativeModel"):
+        assert GeminiAIClient("valid-key", "gemini-2.0-flash").warm_up() is None
+
+
+def stream_chunk(content):
+    return Mock(choices=[Mock(delta=Mock(content=content))])
+
+
+class FakeStream:
+    def __init__(self, contents):
+        self.chunks = [stream_chunk(content) for content in contents]
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.closed = True
+
+    def __iter__(self):
+        return iter(self.chunks)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        self.closed = True
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            yield chunk
+
+
+def test_read_title_line():
+    assert read_title_line(["Fix ", "crash\nBecause ", "..."]) == (
+        "Fix crash",
+        "Fix crash\nBecause ",
+        True,
+    )
+    assert read_title_line(["\n\n  Title", " only"]) == ("Title only", "\n\n  Title only", False)
+    assert read_title_line([]) == ("", "", False)
+
+
+def test_async_read_title_line():
+    async def chunks():
+        for chunk in ["Title\n", "never read"]:
+            yield chunk
+
+    assert asyncio.run(async_read_title_line(chunks())) == ("Title", "Title\n", True)
+
+
+class ChunkedClient(AIClient):
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.read = 0
+        self.closed = False
+
+    def generate_content(self, prompt):
+        return "".join(self.chunks)
+
+    def stream_content(self, prompt, max_output_tokens=None):
+        try:
+            for chunk in self.chunks:
+                self.read += 1
+                yield chunk
+        finally:
+            self.closed = True
+
+
+def test_generate_title_stops_after_first_line():
+    client = ChunkedClient(["Better ", "title\n", "Explanation", " that is never read"])
+
+    title, stats = client.generate_title("prompt", max_output_tokens=64)
+
+    assert title == "Better title"
+    assert client.read == 2
+    assert client.closed
+    assert stats["output_tokens"] == 3
+    assert stats["tokens_saved"] == 61
+    assert stats["time_to_title"] >= 0
+
+
+def test_generate_title_without_streaming_support():
+    class PlainClient(AIClient):
+        def generate_content(self, prompt):
+            return "Title"
+
+    title, stats = PlainClient().generate_title("prompt", max_output_tokens=64)
+    assert title == "Title"
+    assert stats["tokens_saved"] == 0
+
+
+def test_async_generate_title_without_streaming_support():
+    class PlainClient(AsyncAIClient):
+        async def generate_content(self, prompt):
+            return "Title\nExplanation"
+
+    title, stats = asyncio.run(PlainClient().generate_title("prompt"))
+    assert title == "Title"
+    assert stats["tokens_saved"] == 0
+
+
+def test_openai_stream_content_closes_stream_early():
+    stream = FakeStream(["Better", " title\n", "Explanation"])
+    mock_client = Mock()
+    mock_client.chat.completions.create.return_value = stream
+
+    with patch("openai.OpenAI", return_value=mock_client):
+        client = OpenAIClient("valid-key", "gpt-4")
+        title, _ = client.generate_title("Test prompt", max_output_tokens=32)
+
+    assert title == "Better title"
+    assert stream.closed
+    kwargs = mock_client.chat.completions.create.call_args.kwargs
+    assert kwargs["stream"] is True
+    assert kwargs["max_tokens"] == 32
+
+
+def test_openai_stream_content_error():
+    mock_client = Mock()
+    mock_client.chat.completions.create.side_effect = Exception("API error")
+
+    with patch("openai.OpenAI", return_value=mock_client):
+        client = OpenAIClient("valid-key", "gpt-4")
+        with pytest.raises(Exception, match="API error"):
+            client.generate_title("Test prompt")
+    assert "max_tokens" not in mock_client.chat.completions.create.call_args.kwargs
+
+
+def test_async_openai_stream_content_closes_stream_early():
+    stream = FakeStream(["Better title\n", "Explanation"])
+    mock_client = Mock()
+    mock_client.chat.completions.create = AsyncMock(return_value=stream)
+
+    with patch("openai.AsyncOpenAI", return_value=mock_client):
+        client = AsyncDeepseekAIClient("valid-key", "deepseek-chat")
+        title, stats = asyncio.run(client.generate_title("Test prompt", max_output_tokens=32))
+
+    assert title == "Better title"
+    assert stream.closed
+    assert stats["tokens_saved"] == 29
+
+
+def test_gemini_stream_content():
+    mock_model = Mock()
+    mock_model.generate_content.return_value = iter([Mock(text="Title\n"), Mock(text="More")])
+
+    with patch("google.generativeai.configure"):
+        with patch("google.generativeai.GenerativeModel", return_value=mock_model):
+            client = GeminiAIClient("valid-key", "gemini-2.0-flash")
+            title, _ = client.generate_title("Test prompt", max_output_tokens=16)
+
+    assert title == "Title"
+    mock_model.generate_content.assert_called_once_with(
+        "Test prompt", stream=True, generation_config={"max_output_tokens": 16}
+    )
+
+
+def test_async_gemini_stream_content():
+    async def chunks():
+        for text in ["Title\n", "More"]:
+            yield Mock(text=text)
+
+    mock_model = Mock()
+    mock_model.generate_content_async = AsyncMock(return_value=chunks())
+
+    with patch("google.generativeai.configure"):
+        with patch("google.generativeai.GenerativeModel", return_value=mock_model):
+            client = AsyncGeminiAIClient("valid-key", "gemini-2.0-flash")
+            title, _ = asyncio.run(client.generate_title("Test prompt"))
+
+    assert title == "Title"
+    mock_model.generate_content_async.assert_awaited_once_with(
+        "Test prompt", stream=True, generation_config=None
+    )
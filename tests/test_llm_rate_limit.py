@@ -0,0 +1,203 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from src.core.llm_rate_limit import (
+    AsyncRateLimitedAIClient,
+    ProviderRateLimiter,
+    RateLimitedAIClient,
+    TokenBucket,
+    error_status,
+    is_retryable,
+    retry_after,
+)
+from src.core.run_report import RunReport, set_run_report
+
+
+class StatusError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+        self.response = Mock(headers=headers or {})
+
+
+class APIConnectionError(Exception):
+    pass
+
+
+class APITimeoutError(APIConnectionError):
+    pass
+
+
+def make_clock(start=0.0):
+    clock = Mock(return_value=start)
+    return clock
+
+
+def test_token_bucket_allows_burst_then_waits():
+    clock = make_clock()
+    bucket = TokenBucket(60, clock=clock)
+
+    assert [bucket.reserve() for _ in range(60)] == [0] * 60
+    assert bucket.reserve() == pytest.approx(1)
+    assert bucket.reserve() == pytest.approx(2)
+
+    clock.return_value = 10.0
+    assert bucket.reserve() == 0
+
+
+def test_token_bucket_caps_oversized_reservation():
+    bucket = TokenBucket(100, clock=make_clock())
+    assert bucket.reserve(1000) == 0
+    assert bucket.reserve(100) == pytest.approx(60)
+
+
+def test_error_status():
+    assert error_status(StatusError(429)) == 429
+    google_error = Exception("unavailable")
+    google_error.code = 503
+    assert error_status(google_error) == 503
+    assert error_status(Exception("plain")) is None
+
+
+def test_is_retryable():
+    assert is_retryable(StatusError(429))
+    assert is_retryable(StatusError(500))
+    assert is_retryable(StatusError(503))
+    assert not is_retryable(StatusError(400))
+    assert not is_retryable(StatusError(401))
+    assert is_retryable(APITimeoutError("timeout"))
+    assert is_retryable(ConnectionError("reset"))
+    assert not is_retryable(ValueError("bad"))
+
+
+def test_retry_after():
+    assert retry_after(StatusError(429, {"retry-after": "7"})) == 7
+    assert retry_after(StatusError(429)) is None
+    assert retry_after(Exception("plain")) is None
+
+
+def test_reserve_uses_both_budgets():
+    limiter = ProviderRateLimiter("openai", requests_per_minute=1, tokens_per_minute=1000)
+    assert limiter.reserve("short prompt") == 0
+    assert limiter.reserve("short prompt") > 0
+
+
+def test_reserve_unlimited():
+    limiter = ProviderRateLimiter("openai")
+    assert limiter.requests is None
+    assert limiter.tokens is None
+    assert limiter.reserve("prompt") == 0
+
+
+def test_backoff_is_jittered_and_bounded():
+    limiter = ProviderRateLimiter("openai", max_retries=3, base_delay=2, max_delay=5)
+
+    with patch("src.core.llm_rate_limit.random.uniform", side_effect=lambda a, b: b) as uniform:
+        assert limiter.backoff(StatusError(500), 0) == 2
+        assert limiter.backoff(StatusError(500), 2) == 5
+        assert limiter.backoff(StatusError(429, {"retry-after": "30"}), 0) == 30
+    assert uniform.call_count == 3
+
+    assert limiter.backoff(StatusError(500), 3) is None
+    assert limiter.backoff(StatusError(400), 0) is None
+
+
+def test_backoff_respects_retry_budget():
+    report = RunReport()
+    set_run_report(report)
+    try:
+        limiter = ProviderRateLimiter("openai", retry_budget=1)
+        assert limiter.backoff(StatusError(500), 0) is not None
+        assert limiter.backoff(StatusError(500), 0) is None
+    finally:
+        set_run_report(None)
+    assert report.retries == {"openai": 1}
+
+
+def test_rate_limited_client_retries():
+    ai_client = Mock(model_name="gpt-4")
+    ai_client.generate_content.side_effect = [StatusError(429), StatusError(503), "Title"]
+    client = RateLimitedAIClient(ai_client, ProviderRateLimiter("openai"))
+
+    with patch("src.core.llm_rate_limit.time.sleep") as mock_sleep:
+        assert client.generate_content("prompt") == "Title"
+
+    assert client.model_name == "gpt-4"
+    assert ai_client.generate_content.call_count == 3
+    assert mock_sleep.call_count == 2
+
+
+def test_rate_limited_client_gives_up():
+    ai_client = Mock(model_name="gpt-4")
+    ai_client.generate_content.side_effect = StatusError(500)
+    client = RateLimitedAIClient(ai_client, ProviderRateLimiter("openai", max_retries=2))
+
+    with patch("src.core.llm_rate_limit.time.sleep"), pytest.raises(StatusError):
+        client.generate_content("prompt")
+    assert ai_client.generate_content.call_count == 3
+
+
+def test_rate_limited_client_does_not_retry_client_errors():
+    ai_client = Mock(model_name="gpt-4")
+    ai_client.generate_content.side_effect = StatusError(400)
+    client = RateLimitedAIClient(ai_client, ProviderRateLimiter("openai"))
+
+    with pytest.raises(StatusError):
+        client.generate_content("prompt")
+    assert ai_client.generate_content.call_count == 1
+
+
+def test_rate_limited_client_waits_for_budget():
+    ai_client = Mock(model_name="gpt-4")
+    ai_client.generate_content.return_value = "Title"
+    limiter = ProviderRateLimiter("openai")
+    limiter.reserve = Mock(return_value=1.5)
+    client = RateLimitedAIClient(ai_client, limiter)
+
+    with patch("src.core.llm_rate_limit.time.sleep") as mock_sleep:
+        client.generate_content("prompt")
+    mock_sleep.assert_called_once_with(1.5)
+
+
+def test_async_rate_limited_client_retries():
+    ai_client = Mock(model_name="gpt-4")
+    ai_client.generate_content = AsyncMock(side_effect=[APIConnectionError("reset"), "Title"])
+    limiter = ProviderRateLimiter("openai")
+    limiter.reserve = Mock(side_effect=[0, 0.5])
+    client = AsyncRateLimitedAIClient(ai_client, limiter)
+
+    with patch("src.core.llm_rate_limit.asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+        assert asyncio.run(client.generate_content("prompt")) == "Title"
+    assert mock_sleep.await_count == 2
+    assert ai_client.generate_content.await_count == 2
+
+
+def test_rate_limited_clients_forward_warm_up():
+    ai_client = Mock(model_name="gpt-4")
+    RateLimitedAIClient(ai_client, ProviderRateLimiter("openai")).warm_up()
+    ai_client.warm_up.assert_called_once()
+
+    async_client = AsyncMock(model_name="gpt-4")
+    asyncio.run(AsyncRateLimitedAIClient(async_client, ProviderRateLimiter("openai")).warm_up())
+    async_client.warm_up.assert_awaited_once()
+
+
+def test_rate_limited_client_retries_generate_title():
+    ai_client = Mock(model_name="gpt-4")
+    ai_client.generate_title.side_effect = [StatusError(429), ("Title", {})]
+    client = RateLimitedAIClient(ai_client, ProviderRateLimiter("openai"))
+
+    with patch("src.core.llm_rate_limit.time.sleep"):
+        assert client.generate_title("prompt", 64) == ("Title", {})
+    ai_client.generate_title.assert_called_with("prompt", 64)
+
+
+def test_async_rate_limited_client_generate_title():
+    ai_client = AsyncMock(model_name="gpt-4")
+    ai_client.generate_title.return_value = ("Title", {})
+    client = AsyncRateLimitedAIClient(ai_client, ProviderRateLimiter("openai"))
+
+    assert asyncio.run(client.generate_title("prompt", 64)) == ("Title", {})
+    ai_client.generate_title.assert_awaited_once_with("prompt", 64)
@@ -1,9 +1,22 @@
-from unittest.mock import Mock, patch
+import asyncio
+import json
+from unittest.mock import ANY, AsyncMock, Mock, PropertyMock, patch
 
 import pytest
 
-from src.main import open_issue_event, run, scan_issue_event
-from tests.common import RegexStr
+from src.core.run_report import RunReport
+from src.core.tracing import Tracer, span
+from src.main import (
+    build_rate_limiter,
+    export_trace,
+    open_issue_event,
+    run,
+    run_async,
+    scan_issue_event,
+    scan_issue_event_async,
+    write_run_report,
+)
+from tests.common import RegexStr, async_iter
 
 issue_body = "Issue description" * 30
 
@@ -15,9 +28,9 @@ def mock_issue():
     issue.number = 1
     issue.title = "Original title"
     issue.body = issue_body
-    issue.labels = []
+    issue.label_names = ()
     issue.created_at = None
-    issue.pull_request = None
+    issue.is_pr = False
     return issue
 
 
@@ -49,6 +62,32 @@ def mock_config():
     config.apply_to_closed = False
     config.event_data = None
     config.description_min_skip = 40
+    config.max_concurrency = 1
+    config.execution_mode = "sync"
+    config.cache_dir = None
+    config.discovery = "rest"
+    config.batch_size = 1
+    config.batch_max_tokens = 8000
+    config.max_body_tokens = None
+    config.requests_per_minute = 0
+    config.tokens_per_minute = 0
+    config.max_retries = 3
+    config.retry_budget = 20
+    config.stream = False
+    config.max_output_tokens = 64
+    config.hedge = False
+    config.fallback_providers = []
+    config.state_file = ""
+    config.github_cache_dir = ""
+    config.write_back = "rest"
+    config.write_batch_size = 25
+    config.write_interval_ms = 0
+    config.writes_per_minute = 0
+    config.report_file = ""
+    config.step_summary = True
+    config.step_summary_path = None
+    config.output_path = None
+    config.trace_file = ""
     return config
 
 
@@ -67,11 +106,11 @@ def mock_github_client():
 
 def test_open_issue_event(mock_config, mock_ai_client, mock_github_client, mock_repo, mock_issue):
     mock_config.issue_number = 1
-    mock_repo.get_issue.return_value = mock_issue
+    mock_github_client.get_issue.return_value = mock_issue
 
     results = open_issue_event(mock_config, mock_repo, mock_ai_client, mock_github_client)
 
-    mock_repo.get_issue.assert_called_once_with(1)
+    mock_github_client.get_issue.assert_called_once_with(mock_repo, 1)
     assert len(results) == 1
     assert results[0]["improved_title"] == "Improved title"
     assert results[0]["issue_number"] == 1
@@ -81,7 +120,7 @@ def test_open_issue_event_with_editing(
     mock_config, mock_ai_client, mock_github_client, mock_repo, mock_issue
 ):
     mock_config.issue_number = 1
-    mock_repo.get_issue.return_value = mock_issue
+    mock_github_client.get_issue.return_value = mock_issue
 
     # Setup event_data to simulate a title edit
     mock_config.event_data = {
@@ -92,19 +131,19 @@ def test_open_issue_event_with_editing(
     }
 
     # Add the 'titled' label to the mock issue to match the event_data
-    mock_issue.labels = [{"name": "titled"}]
+    mock_issue.label_names = ("titled",)
 
     results = open_issue_event(mock_config, mock_repo, mock_ai_client, mock_github_client)
 
     # Should have called get_issue
-    mock_repo.get_issue.assert_called_once_with(1)
+    mock_github_client.get_issue.assert_called_once_with(mock_repo, 1)
 
     # Since the issue has the 'titled' label and was edited, block_user_title_edit should have
     # returned True and no results should be returned
     assert len(results) == 0
 
     # Verify that the issue was edited back to its previous title
-    mock_issue.edit.assert_called_once_with(title="Previous title")
+    mock_github_client.update_issue_title.assert_called_once_with(mock_issue, "Previous title")
 
     # Verify that a comment was added explaining the title change was not allowed
     mock_github_client.add_issue_comment.assert_called_once_with(
@@ -114,20 +153,20 @@ def test_open_issue_event_with_editing(
 
 def test_open_issue_event_error(mock_config, mock_ai_client, mock_github_client, mock_repo):
     mock_config.issue_number = 1
-    mock_repo.get_issue.side_effect = Exception("Issue not found")
+    mock_github_client.get_issue.side_effect = Exception("Issue not found")
 
     results = open_issue_event(mock_config, mock_repo, mock_ai_client, mock_github_client)
 
-    mock_repo.get_issue.assert_called_once_with(1)
+    mock_github_client.get_issue.assert_called_once_with(mock_repo, 1)
     assert len(results) == 0
 
 
 def test_scan_issue_event_no_issues(mock_config, mock_ai_client, mock_github_client, mock_repo):
-    mock_github_client.get_recent_issues.return_value = []
+    mock_github_client.iter_recent_issues.return_value = []
 
     results = scan_issue_event(mock_config, mock_repo, mock_ai_client, mock_github_client)
 
-    mock_github_client.get_recent_issues.assert_called_once_with(
+    mock_github_client.iter_recent_issues.assert_called_once_with(
         repo=mock_repo,
         days_to_scan=mock_config.days_to_scan,
         limit=mock_config.max_issues,
@@ -140,11 +179,11 @@ def test_scan_issue_event_no_issues(mock_config, mock_ai_client, mock_github_cli
 def test_scan_issue_event_with_issues(
     mock_config, mock_ai_client, mock_github_client, mock_repo, mock_issue
 ):
-    mock_github_client.get_recent_issues.return_value = [mock_issue]
+    mock_github_client.iter_recent_issues.return_value = [mock_issue]
 
     results = scan_issue_event(mock_config, mock_repo, mock_ai_client, mock_github_client)
 
-    mock_github_client.get_recent_issues.assert_called_once_with(
+    mock_github_client.iter_recent_issues.assert_called_once_with(
         repo=mock_repo,
         days_to_scan=mock_config.days_to_scan,
         limit=mock_config.max_issues,
@@ -155,6 +194,179 @@ def test_scan_issue_event_with_issues(
     assert results[0]["issue_number"] == 1
 
 
+def test_scan_issue_event_graphql_discovery(
+    mock_config, mock_ai_client, mock_github_client, mock_repo, mock_issue
+):
+    mock_config.discovery = "graphql"
+    mock_github_client.iter_recent_issues_graphql.return_value = [mock_issue]
+
+    results = scan_issue_event(mock_config, mock_repo, mock_ai_client, mock_github_client)
+
+    mock_github_client.iter_recent_issues.assert_not_called()
+    mock_github_client.iter_recent_issues_graphql.assert_called_once_with(
+        repo=mock_repo,
+        days_to_scan=mock_config.days_to_scan,
+        limit=mock_config.max_issues,
+        required_labels=[],
+        apply_to_closed=False,
+    )
+    assert results[0]["issue_number"] == 1
+
+
+def test_scan_issue_event_search_discovery(
+    mock_config, mock_ai_client, mock_github_client, mock_repo, mock_issue
+):
+    mock_config.discovery = "search"
+    mock_github_client.iter_recent_issues_search.return_value = [mock_issue]
+
+    scan_issue_event(mock_config, mock_repo, mock_ai_client, mock_github_client)
+
+    mock_github_client.iter_recent_issues_search.assert_called_once_with(
+        repo=mock_repo,
+        days_to_scan=mock_config.days_to_scan,
+        limit=mock_config.max_issues,
+        required_labels=[],
+        apply_to_closed=False,
+        skip_label="titled",
+    )
+
+
+def make_issue(number):
+    issue = Mock()
+    issue.number = number
+    issue.title = f"Title {number}"
+    issue.body = issue_body
+    issue.label_names = ()
+    return issue
+
+
+def test_scan_issue_event_concurrent_keeps_order(
+    mock_config, mock_ai_client, mock_github_client, mock_repo
+):
+    mock_config.max_concurrency = 4
+    issues = [make_issue(number) for number in range(1, 9)]
+    mock_github_client.iter_recent_issues.return_value = issues
+
+    results = scan_issue_event(mock_config, mock_repo, mock_ai_client, mock_github_client)
+
+    assert [r["issue_number"] for r in results] == list(range(1, 9))
+    assert mock_ai_client.generate_content.call_count == 8
+
+
+def test_scan_issue_event_worker_error(mock_config, mock_ai_client, mock_github_client, mock_repo):
+    mock_config.max_concurrency = 2
+    broken_issue = make_issue(2)
+    type(broken_issue).label_names = PropertyMock(side_effect=Exception("boom"))
+    issues = [make_issue(1), broken_issue, make_issue(3)]
+    mock_github_client.iter_recent_issues.return_value = issues
+
+    results = scan_issue_event(mock_config, mock_repo, mock_ai_client, mock_github_client)
+
+    assert [r["issue_number"] for r in results] == [1, 2, 3]
+    assert results[1] == {"issue_number": 2, "error": "boom"}
+    assert results[0]["improved_title"] == "Improved title"
+    assert results[2]["improved_title"] == "Improved title"
+
+
+def test_scan_issue_event_batched(mock_config, mock_ai_client, mock_github_client, mock_repo):
+    mock_config.batch_size = 3
+    mock_config.max_concurrency = 2
+    issues = [make_issue(number) for number in range(1, 6)]
+    mock_github_client.iter_recent_issues.return_value = issues
+    mock_ai_client.generate_content.side_effect = lambda prompt: (
+        '[{"issue_number": 1, "title": "T1"}, {"issue_number": 2, "title": "T2"}, '
+        '{"issue_number": 3, "title": "T3"}]'
+        if '"issue_number": 1' in prompt
+        else '[{"issue_number": 4, "title": "T4"}, {"issue_number": 5, "title": "T5"}]'
+    )
+
+    results = scan_issue_event(mock_config, mock_repo, mock_ai_client, mock_github_client)
+
+    assert [r["improved_title"] for r in results] == ["T1", "T2", "T3", "T4", "T5"]
+    assert mock_ai_client.generate_content.call_count == 2
+
+
+def test_scan_issue_event_async_batched(mock_config, mock_repo):
+    mock_config.batch_size = 10
+    ai_client = AsyncMock()
+    ai_client.generate_content.return_value = (
+        '[{"issue_number": 1, "title": "T1"}, {"issue_number": 2, "title": "T2"}]'
+    )
+    github_client = AsyncMock()
+    github_client.iter_recent_issues = Mock(return_value=async_iter([make_issue(1), make_issue(2)]))
+
+    results = asyncio.run(scan_issue_event_async(mock_config, mock_repo, ai_client, github_client))
+
+    assert [r["improved_title"] for r in results] == ["T1", "T2"]
+    ai_client.generate_content.assert_awaited_once()
+
+
+def test_scan_issue_event_async(mock_config, mock_repo):
+    mock_config.max_concurrency = 3
+    ai_client = AsyncMock()
+    ai_client.generate_content.return_value = "Improved title"
+    github_client = AsyncMock()
+    github_client.iter_recent_issues = Mock(
+        return_value=async_iter([make_issue(n) for n in range(1, 6)])
+    )
+    github_client.update_issue_title.side_effect = Exception("boom")
+
+    results = asyncio.run(scan_issue_event_async(mock_config, mock_repo, ai_client, github_client))
+
+    assert [r["issue_number"] for r in results] == [1, 2, 3, 4, 5]
+    assert all(r["improved_title"] == "Improved title" for r in results)
+    assert github_client.add_issue_label.await_count == 5
+
+
+def test_scan_issue_event_async_no_issues(mock_config, mock_repo):
+    github_client = AsyncMock()
+    github_client.iter_recent_issues = Mock(return_value=async_iter([]))
+
+    results = asyncio.run(
+        scan_issue_event_async(mock_config, mock_repo, AsyncMock(), github_client)
+    )
+
+    assert results == []
+
+
+@patch("src.main.AsyncGitHubClient")
+@patch("src.main.create_async_ai_client")
+def test_run_async(mock_create_async_ai, mock_async_github_cls, mock_config, mock_repo):
+    ai_client = AsyncMock()
+    mock_create_async_ai.return_value = ai_client
+    github_client = AsyncMock()
+    github_client.get_repository.return_value = mock_repo
+    github_client.iter_recent_issues = Mock(return_value=async_iter([]))
+    mock_async_github_cls.return_value = github_client
+
+    results = asyncio.run(run_async(mock_config))
+
+    assert results == []
+    mock_async_github_cls.assert_called_once_with(
+        mock_config.github_token,
+        base_url=mock_config.github_api_url,
+        graphql_url=mock_config.github_graphql_url,
+    )
+    github_client.get_repository.assert_awaited_once_with(mock_config.repo_name)
+    github_client.aclose.assert_awaited_once()
+    ai_client.warm_up.assert_awaited_once()
+    # The model client is wrapped in a rate limiter, which closes it too.
+    ai_client.aclose.assert_awaited_once()
+
+
+@patch("src.main.Config")
+@patch("src.main.run_async", new_callable=AsyncMock)
+@patch("src.main.create_ai_client")
+def test_run_async_mode(mock_create_ai, mock_run_async, mock_config_cls, mock_config):
+    mock_config_cls.return_value = mock_config
+    mock_config.execution_mode = "async"
+
+    run()
+
+    mock_run_async.assert_awaited_once_with(mock_config, None, None)
+    mock_create_ai.assert_not_called()
+
+
 @patch("src.main.Config")
 @patch("src.main.create_ai_client")
 @patch("src.main.GitHubClient")
@@ -185,11 +397,180 @@ def test_run_issue_event(
         api_key=mock_config.get_api_key(),
         model_name=mock_config.model_name,
     )
-    mock_github_client_cls.assert_called_once_with(mock_config.github_token)
-    mock_github_client.get_repository.assert_called_once_with(mock_config.repo_name)
-    mock_open_issue.assert_called_once_with(
-        mock_config, mock_repo, mock_ai_client, mock_github_client
+    mock_github_client_cls.assert_called_once_with(
+        mock_config.github_token,
+        http_cache=None,
+        base_url=mock_config.github_api_url,
+        graphql_url=mock_config.github_graphql_url,
     )
+    mock_github_client.get_repository.assert_called_once_with(mock_config.repo_name)
+    mock_open_issue.assert_called_once_with(mock_config, mock_repo, ANY, mock_github_client)
+    mock_ai_client.warm_up.assert_called_once()
+    ai_client = mock_open_issue.call_args.args[2]
+    assert type(ai_client).__name__ == "RateLimitedAIClient"
+    assert ai_client.ai_client is mock_ai_client
+
+
+@patch("src.main.Config")
+@patch("src.main.create_ai_client")
+@patch("src.main.GitHubClient")
+@patch("src.main.scan_issue_event")
+def test_run_with_response_cache(
+    mock_scan_issue,
+    mock_github_client_cls,
+    mock_create_ai,
+    mock_config_cls,
+    mock_config,
+    mock_ai_client,
+    tmp_path,
+    capsys,
+):
+    mock_config_cls.return_value = mock_config
+    mock_config.cache_dir = str(tmp_path)
+    mock_config.cache_ttl_days = 1
+    mock_config.cache_max_entries = 10
+    mock_config.report_file = str(tmp_path / "report.json")
+    mock_create_ai.return_value = mock_ai_client
+
+    run()
+
+    ai_client = mock_scan_issue.call_args.args[2]
+    assert type(ai_client).__name__ == "CachedAIClient"
+    assert ai_client.ai_client.ai_client is mock_ai_client
+    assert "LLM response cache: 0 hits, 0 misses" in capsys.readouterr().out
+    report = json.loads((tmp_path / "report.json").read_text())
+    assert report["caches"] == {"llm": {"hits": 0, "misses": 0}}
+
+
+@patch("src.main.Config")
+@patch("src.main.create_ai_client")
+@patch("src.main.GitHubClient")
+@patch("src.main.scan_issue_event")
+def test_run_with_hedging(
+    mock_scan_issue,
+    mock_github_client_cls,
+    mock_create_ai,
+    mock_config_cls,
+    mock_config,
+    tmp_path,
+    capsys,
+):
+    mock_config_cls.return_value = mock_config
+    mock_config.hedge = True
+    mock_config.hedge_provider = "deepseek"
+    mock_config.hedge_delay_ms = 0
+    mock_config.cache_dir = str(tmp_path)
+    mock_config.cache_ttl_days = 1
+    mock_config.cache_max_entries = 10
+    primary, secondary = Mock(model_name="gemini-2.0-flash"), Mock(model_name="deepseek-chat")
+    mock_create_ai.side_effect = [primary, secondary]
+
+    run()
+
+    ai_client = mock_scan_issue.call_args.args[2]
+    assert type(ai_client).__name__ == "HedgedAIClient"
+    # Each provider has its own cache, so answers are cached under the provider that gave them.
+    assert (ai_client.primary.provider, ai_client.secondary.provider) == ("gemini", "deepseek")
+    assert ai_client.primary.ai_client.ai_client is primary
+    assert ai_client.secondary.ai_client.ai_client is secondary
+    assert ai_client.secondary.ai_client.limiter.provider == "deepseek"
+    mock_create_ai.assert_called_with(provider="deepseek", api_key=mock_config.get_api_key())
+    assert "Hedging: 0 of 0 requests hedged" in capsys.readouterr().out
+    assert json.loads((tmp_path / "latencies.json").read_text()) == {"gemini:gemini-2.0-flash": []}
+
+
+@patch("src.main.Config")
+@patch("src.main.GitHubClient")
+@patch("src.main.scan_issue_event")
+def test_run_with_fallback_providers(
+    mock_scan_issue, mock_github_client_cls, mock_config_cls, mock_config
+):
+    mock_config_cls.return_value = mock_config
+    mock_config.fallback_providers = [("deepseek", None)]
+    mock_config.provider_chain.return_value = [
+        ("gemini", "gemini-key", None),
+        ("deepseek", "deepseek-key", None),
+    ]
+
+    with (
+        patch("core.llm.GeminiAIClient") as mock_gemini,
+        patch("core.llm.DeepseekAIClient") as mock_deepseek,
+    ):
+        run()
+
+    ai_client = mock_scan_issue.call_args.args[2]
+    assert type(ai_client).__name__ == "FallbackAIClient"
+    (gemini, gemini_client, _), (deepseek, deepseek_client, _) = ai_client.clients
+    assert (gemini, deepseek) == ("gemini", "deepseek")
+    assert type(gemini_client).__name__ == "RateLimitedAIClient"
+    assert gemini_client.ai_client is mock_gemini.return_value
+    assert deepseek_client.ai_client is mock_deepseek.return_value
+    assert deepseek_client.limiter.provider == "deepseek"
+
+
+@patch("src.main.Config")
+@patch("src.main.create_ai_client")
+@patch("src.main.GitHubClient")
+@patch("src.main.scan_issue_event")
+def test_run_with_scan_state(
+    mock_scan_issue, mock_github_client_cls, mock_create_ai, mock_config_cls, mock_config, tmp_path
+):
+    mock_config_cls.return_value = mock_config
+    mock_config.state_file = str(tmp_path / "state.json")
+    mock_config.scan_overlap_minutes = 10
+    mock_config.full_rescan = False
+    mock_scan_issue.return_value = [{"issue_number": 4}, {"issue_number": 9}]
+
+    run()
+    assert mock_scan_issue.call_args.args[4] is None
+    cursor = json.loads((tmp_path / "state.json").read_text())["owner/repo"]
+    assert cursor["number"] == 9
+
+    mock_scan_issue.return_value = [{"issue_number": 10, "error": "boom"}]
+    run()
+    updated_since = mock_scan_issue.call_args.args[4]
+    assert updated_since.strftime("%Y-%m-%dT%H:%M:%SZ") < cursor["updated_at"]
+    # A failed issue keeps the cursor where it was, so the next run retries it.
+    assert json.loads((tmp_path / "state.json").read_text())["owner/repo"] == cursor
+
+    mock_config.full_rescan = True
+    run()
+    assert mock_scan_issue.call_args.args[4] is None
+
+
+def test_scan_issue_event_passes_updated_since(
+    mock_config, mock_ai_client, mock_github_client, mock_repo
+):
+    mock_github_client.iter_recent_issues.return_value = []
+    updated_since = Mock()
+
+    scan_issue_event(mock_config, mock_repo, mock_ai_client, mock_github_client, updated_since)
+
+    assert mock_github_client.iter_recent_issues.call_args.kwargs["updated_since"] is updated_since
+
+
+@patch("src.main.Config")
+@patch("src.main.create_ai_client")
+@patch("src.main.GitHubClient")
+@patch("src.main.scan_issue_event")
+def test_run_with_github_cache(
+    mock_scan_issue,
+    mock_github_client_cls,
+    mock_create_ai,
+    mock_config_cls,
+    mock_config,
+    tmp_path,
+    capsys,
+):
+    mock_config_cls.return_value = mock_config
+    mock_config.github_cache_dir = str(tmp_path)
+
+    run()
+
+    http_cache = mock_github_client_cls.call_args.kwargs["http_cache"]
+    assert type(http_cache).__name__ == "GitHubResponseCache"
+    assert http_cache.directory == str(tmp_path)
+    assert "GitHub response cache: 0 not modified, 0 fetched" in capsys.readouterr().out
 
 
 @patch("src.main.Config")
@@ -201,3 +582,99 @@ def test_run_error(mock_config_cls, mock_config):
         run()
 
     assert excinfo.value.code == 1
+
+
+def test_scan_issue_event_remembers_optimal_titles(
+    mock_config, mock_ai_client, mock_github_client, mock_repo, mock_issue, tmp_path
+):
+    mock_config.state_file = str(tmp_path / "state.json")
+    mock_github_client.iter_recent_issues.return_value = [mock_issue]
+    mock_ai_client.generate_content.return_value = mock_issue.title
+
+    scan_issue_event(mock_config, mock_repo, mock_ai_client, mock_github_client)
+    results = scan_issue_event(mock_config, mock_repo, mock_ai_client, mock_github_client)
+
+    assert results[0]["reason"] == "Title already optimal"
+    mock_ai_client.generate_content.assert_called_once()
+
+    mock_issue.body = issue_body + " More details."
+    scan_issue_event(mock_config, mock_repo, mock_ai_client, mock_github_client)
+    assert mock_ai_client.generate_content.call_count == 2
+
+
+def test_scan_issue_event_with_graphql_write_back(
+    mock_config, mock_ai_client, mock_github_client, mock_repo, mock_issue
+):
+    mock_config.write_back = "graphql"
+    mock_issue.node_id = "I_1"
+    mock_github_client.iter_recent_issues.return_value = [mock_issue]
+    mock_github_client.get_label_id.return_value = "LA_1"
+    mock_github_client.graphql.return_value = {"data": {}}
+
+    results = scan_issue_event(mock_config, mock_repo, mock_ai_client, mock_github_client)
+
+    assert results[0]["improved_title"] == "Improved title"
+    # Suggestion comment and skip label, one mutation each instead of REST writes.
+    assert mock_github_client.graphql.call_count == 2
+    mock_github_client.add_issue_comment.assert_not_called()
+    mock_github_client.add_issue_label.assert_not_called()
+
+
+def test_write_run_report(mock_config, tmp_path, capsys):
+    mock_config.report_file = str(tmp_path / "report.json")
+    mock_config.step_summary_path = str(tmp_path / "summary.md")
+    mock_config.output_path = str(tmp_path / "output")
+    report = RunReport()
+    report.record("discovery", 0.5)
+
+    write_run_report(mock_config, report, [{"issue_number": 1, "improved_title": "New"}])
+
+    assert json.loads((tmp_path / "report.json").read_text())["issues"]["improved"] == 1
+    assert "| discovery | 1 |" in (tmp_path / "summary.md").read_text()
+    assert "issues-improved=1" in (tmp_path / "output").read_text()
+    assert "Run report written to" in capsys.readouterr().out
+
+    mock_config.step_summary = False
+    write_run_report(mock_config, report, [])
+    assert (tmp_path / "summary.md").read_text().count("### Issue Title AI run") == 1
+
+
+def test_build_rate_limiter(mock_config):
+    mock_config.retry_budget = 5
+
+    limiter = build_rate_limiter(mock_config, "deepseek")
+
+    assert limiter.provider == "deepseek"
+    assert (limiter.max_retries, limiter.retry_budget) == (3, 5)
+
+
+def test_export_trace(mock_config, tmp_path, capsys):
+    mock_config.trace_file = str(tmp_path / "trace.json")
+    tracer = Tracer()
+    with tracer.span("run", {}):
+        pass
+
+    export_trace(mock_config, tracer)
+
+    spans = json.loads((tmp_path / "trace.json").read_text())["resourceSpans"][0]["scopeSpans"]
+    assert [s["name"] for s in spans[0]["spans"]] == ["run"]
+    assert "Trace with 1 spans written to" in capsys.readouterr().out
+
+    export_trace(mock_config, None)
+    assert capsys.readouterr().out == ""
+
+
+def test_scan_issue_event_listing_error_keeps_earlier_writes(
+    mock_config, mock_ai_client, mock_github_client, mock_repo
+):
+    def listing(**kwargs):
+        yield make_issue(1)
+        raise Exception("page 2 failed")
+
+    mock_github_client.iter_recent_issues.side_effect = listing
+
+    with pytest.raises(Exception, match="page 2 failed"):
+        scan_issue_event(mock_config, mock_repo, mock_ai_client, mock_github_client)
+
+    mock_ai_client.generate_content.assert_called_once()
+    mock_github_client.add_issue_label.assert_called_once()
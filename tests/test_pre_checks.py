@@ -28,9 +28,7 @@ def mock_github_client():
 @pytest.fixture
 def mock_issue():
     """Create a mock GitHub issue."""
-    issue = Mock()
-    issue.edit = Mock()
-    return issue
+    return Mock()
 
 
 def test_block_user_title_edit_success(mock_event_data, mock_github_client, mock_issue):
@@ -46,7 +44,7 @@ def test_block_user_title_edit_success(mock_event_data, mock_github_client, mock
     )
 
     # Assert title was reverted back to the original
-    mock_issue.edit.assert_called_once_with(title="Original Title")
+    mock_github_client.update_issue_title.assert_called_once_with(mock_issue, "Original Title")
 
 
 def test_block_user_title_edit_not_edited_action(mock_event_data, mock_github_client, mock_issue):
@@ -57,7 +55,7 @@ def test_block_user_title_edit_not_edited_action(mock_event_data, mock_github_cl
 
     assert result is False
     mock_github_client.add_issue_comment.assert_not_called()
-    mock_issue.edit.assert_not_called()
+    mock_github_client.update_issue_title.assert_not_called()
 
 
 def test_block_user_title_edit_not_user(mock_event_data, mock_github_client, mock_issue):
@@ -68,7 +66,7 @@ def test_block_user_title_edit_not_user(mock_event_data, mock_github_client, moc
 
     assert result is False
     mock_github_client.add_issue_comment.assert_not_called()
-    mock_issue.edit.assert_not_called()
+    mock_github_client.update_issue_title.assert_not_called()
 
 
 def test_block_user_title_edit_no_previous_title(mock_event_data, mock_github_client, mock_issue):
@@ -79,7 +77,7 @@ def test_block_user_title_edit_no_previous_title(mock_event_data, mock_github_cl
 
     assert result is False
     mock_github_client.add_issue_comment.assert_not_called()
-    mock_issue.edit.assert_not_called()
+    mock_github_client.update_issue_title.assert_not_called()
 
 
 def test_block_user_title_edit_no_skip_label(mock_event_data, mock_github_client, mock_issue):
@@ -90,4 +88,4 @@ def test_block_user_title_edit_no_skip_label(mock_event_data, mock_github_client
 
     assert result is False
     mock_github_client.add_issue_comment.assert_not_called()
-    mock_issue.edit.assert_not_called()
+    mock_github_client.update_issue_title.assert_not_called()
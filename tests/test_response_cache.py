@@ -0,0 +1,185 @@
+import asyncio
+import os
+import time
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from src.core.fallback import FallbackAIClient
+from src.core.hedging import HedgedAIClient, HedgeStats
+from src.core.response_cache import AsyncCachedAIClient, CachedAIClient, ResponseCache
+
+
+def test_make_key_depends_on_provider_model_and_prompt():
+    key = ResponseCache.make_key("gemini", "gemini-2.0-flash", "prompt")
+
+    assert key == ResponseCache.make_key("gemini", "gemini-2.0-flash", "prompt")
+    assert key != ResponseCache.make_key("openai", "gemini-2.0-flash", "prompt")
+    assert key != ResponseCache.make_key("gemini", "gemini-1.5-pro", "prompt")
+    assert key != ResponseCache.make_key("gemini", "gemini-2.0-flash", "prompt ")
+
+
+def test_get_and_set(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    key = cache.make_key("gemini", "model", "prompt")
+
+    assert cache.get(key) is None
+    cache.set(key, "Improved title")
+
+    assert ResponseCache(str(tmp_path)).get(key) == "Improved title"
+    assert cache.get(key) == "Improved title"
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.summary() == "LLM response cache: 1 hits, 1 misses"
+
+
+def test_expired_entry_is_a_miss(tmp_path):
+    cache = ResponseCache(str(tmp_path), ttl_seconds=60)
+    key = cache.make_key("gemini", "model", "prompt")
+    cache.set(key, "Improved title")
+
+    with open(cache._path(key), "w") as file:
+        file.write(f'{{"created_at": {time.time() - 120}, "response": "Improved title"}}')
+
+    assert cache.get(key) is None
+    assert not os.path.exists(cache._path(key))
+
+
+def test_corrupt_entry_is_a_miss(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    key = cache.make_key("gemini", "model", "prompt")
+    os.makedirs(os.path.dirname(cache._path(key)))
+    with open(cache._path(key), "w") as file:
+        file.write("{not json")
+
+    assert cache.get(key) is None
+
+
+def test_prune_keeps_most_recently_used(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_entries=2)
+    keys = [cache.make_key("gemini", "model", str(i)) for i in range(4)]
+    for age, key in enumerate(keys, 1):
+        cache.set(key, key)
+        mtime = time.time() - 100 * age
+        os.utime(cache._path(key), (mtime, mtime))
+
+    # Reading the oldest entry makes it the most recently used one.
+    assert cache.get(keys[3]) == keys[3]
+
+    assert cache.prune() == 2
+    assert [cache.get(key) for key in keys] == [keys[0], None, None, keys[3]]
+
+
+def test_prune_removes_expired(tmp_path):
+    cache = ResponseCache(str(tmp_path), ttl_seconds=60)
+    key = cache.make_key("gemini", "model", "prompt")
+    cache.set(key, "Improved title")
+    old = time.time() - 120
+    os.utime(cache._path(key), (old, old))
+
+    assert cache.prune() == 1
+
+
+def test_cached_ai_client(tmp_path):
+    ai_client = Mock()
+    ai_client.model_name = "model"
+    ai_client.generate_content.return_value = "Improved title"
+    client = CachedAIClient(ai_client, ResponseCache(str(tmp_path)), "gemini")
+
+    assert client.generate_content("prompt") == "Improved title"
+    assert client.generate_content("prompt") == "Improved title"
+    assert client.generate_content("other prompt") == "Improved title"
+
+    assert ai_client.generate_content.call_count == 2
+    assert (client.cache.hits, client.cache.misses) == (1, 2)
+
+
+def test_cached_ai_client_does_not_cache_errors(tmp_path):
+    ai_client = Mock()
+    ai_client.model_name = "model"
+    ai_client.generate_content.side_effect = [Exception("API error"), "Improved title"]
+    client = CachedAIClient(ai_client, ResponseCache(str(tmp_path)), "gemini")
+
+    with pytest.raises(Exception, match="API error"):
+        client.generate_content("prompt")
+    assert client.generate_content("prompt") == "Improved title"
+
+
+def test_fallback_answers_are_cached_under_their_provider(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    gemini = Mock(model_name="gemini-2.0-flash")
+    gemini.generate_content.side_effect = Exception("API error")
+    deepseek = Mock(model_name="deepseek-chat")
+    deepseek.generate_content.return_value = "Fallback title"
+    client = FallbackAIClient(
+        [
+            ("gemini", CachedAIClient(gemini, cache, "gemini")),
+            ("deepseek", CachedAIClient(deepseek, cache, "deepseek")),
+        ]
+    )
+
+    assert client.generate_content("prompt") == "Fallback title"
+
+    assert cache.get(cache.make_key("gemini", "gemini-2.0-flash", "prompt")) is None
+    assert cache.get(cache.make_key("deepseek", "deepseek-chat", "prompt")) == "Fallback title"
+
+
+def test_cache_hits_are_not_hedge_latencies(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    cache.set(cache.make_key("gemini", "gemini-2.0-flash", "prompt"), "Cached title")
+    primary = CachedAIClient(Mock(model_name="gemini-2.0-flash"), cache, "gemini")
+    secondary = CachedAIClient(Mock(model_name="deepseek-chat"), cache, "deepseek")
+    client = HedgedAIClient(primary, secondary, "gemini", "deepseek", HedgeStats(), delay=1)
+
+    assert client.generate_content("prompt") == "Cached title"
+    assert client.stats.requests == 1
+    assert not client.stats.latencies
+
+
+def test_async_cached_ai_client(tmp_path):
+    ai_client = AsyncMock()
+    ai_client.model_name = "model"
+    ai_client.generate_content.return_value = "Improved title"
+    client = AsyncCachedAIClient(ai_client, ResponseCache(str(tmp_path)), "openai")
+
+    async def generate_twice():
+        return [await client.generate_content("prompt"), await client.generate_content("prompt")]
+
+    assert asyncio.run(generate_twice()) == ["Improved title", "Improved title"]
+    ai_client.generate_content.assert_awaited_once_with("prompt")
+
+
+def test_cached_ai_clients_forward_warm_up(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    ai_client = Mock(model_name="gpt-4")
+    CachedAIClient(ai_client, cache, "openai").warm_up()
+    ai_client.warm_up.assert_called_once()
+
+    async_client = AsyncMock(model_name="gpt-4")
+    asyncio.run(AsyncCachedAIClient(async_client, cache, "openai").warm_up())
+    async_client.warm_up.assert_awaited_once()
+
+
+def test_cached_ai_client_generate_title(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    ai_client = Mock(model_name="gpt-4")
+    ai_client.generate_title.return_value = ("Title", {"time_to_title": 0.1})
+    client = CachedAIClient(ai_client, cache, "openai")
+
+    assert client.generate_title("prompt", 64) == ("Title", {"time_to_title": 0.1})
+    assert client.generate_title("prompt", 64) == ("Title", None)
+    ai_client.generate_title.assert_called_once_with("prompt", 64)
+
+    # A full response cached by a non-streaming run yields its first line.
+    cache.set(cache.make_key("openai", "gpt-4", "other"), "Other title\nExplanation")
+    assert client.generate_title("other") == ("Other title", None)
+
+
+def test_async_cached_ai_client_generate_title(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    ai_client = AsyncMock(model_name="gpt-4")
+    ai_client.generate_title.return_value = ("Title", None)
+    client = AsyncCachedAIClient(ai_client, cache, "openai")
+
+    assert asyncio.run(client.generate_title("prompt")) == ("Title", None)
+    assert asyncio.run(client.generate_title("prompt")) == ("Title", None)
+    ai_client.generate_title.assert_awaited_once_with("prompt", None)
@@ -0,0 +1,188 @@
+import asyncio
+import json
+from unittest.mock import Mock, patch
+
+import pytest
+
+from src.core import run_report
+from src.core.issue_service import IssueProcessor
+from src.core.llm import OpenAIClient, record_response_usage
+from src.core.run_report import (
+    RunReport,
+    record_usage,
+    set_run_report,
+    timed,
+    timed_aiteration,
+    timed_iteration,
+)
+from tests.common import async_iter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def report():
+    report = RunReport()
+    set_run_report(report)
+    yield report
+    set_run_report(None)
+
+
+def test_stage_timings_add_up_per_issue():
+    clock = FakeClock()
+    report = RunReport(clock=clock)
+    for number, seconds in ((1, 1.0), (2, 3.0), (1, 0.5)):
+        with report.timed("llm", number):
+            clock.now += seconds
+    with report.timed("discovery"):
+        clock.now += 2.0
+    report.record("discovery", 4.0)
+
+    stages = report.stage_summary()
+
+    assert stages["llm"] == {"count": 2, "total_s": 4.5, "p50_s": 3.0, "p95_s": 3.0, "max_s": 3.0}
+    assert stages["discovery"]["count"] == 2
+    assert report.per_issue() == {"1": {"llm": 1.5}, "2": {"llm": 3.0}}
+
+
+def test_report_files(tmp_path):
+    clock = FakeClock()
+    report = RunReport(clock=clock)
+    report.record("llm", 0.25, 7)
+    report.add_usage("OpenAI", 100, 10)
+    report.add_usage("OpenAI", 50, 5)
+    report.add_usage("Gemini", 20, 2, estimated=True)
+    report.add_retry("openai")
+    report.add_retry("openai")
+    report.add_cache("llm", 4, 1)
+    report.add_cache("github", 2, 3)
+    clock.now = 3.0
+    report.finish(
+        [
+            {"issue_number": 7, "improved_title": "New", "updated": True},
+            {"issue_number": 8, "skipped": True},
+            {"issue_number": 9, "error": "boom"},
+        ]
+    )
+
+    report.write_json(str(tmp_path / "reports" / "run.json"))
+    report.write_step_summary(str(tmp_path / "summary.md"))
+    report.write_outputs(str(tmp_path / "output"))
+
+    data = json.loads((tmp_path / "reports" / "run.json").read_text())
+    assert data["duration_s"] == 3.0
+    assert data["issues"] == {
+        "processed": 3,
+        "improved": 1,
+        "updated": 1,
+        "skipped": 1,
+        "failed": 1,
+    }
+    assert data["tokens"]["OpenAI"] == {
+        "requests": 2,
+        "prompt_tokens": 150,
+        "completion_tokens": 15,
+        "estimated": False,
+    }
+    assert data["per_issue"] == {"7": {"llm": 0.25}}
+    assert data["retries"] == {"openai": 2}
+    summary = (tmp_path / "summary.md").read_text()
+    assert "2 model requests retried (openai: 2)." in summary
+    assert data["caches"] == {"github": {"hits": 2, "misses": 3}, "llm": {"hits": 4, "misses": 1}}
+    assert "| llm | 4 | 1 |" in summary
+    assert "| llm | 1 | 0.250 | 0.250 | 0.250 | 0.250 |" in summary
+    assert "| Gemini (estimated) | 1 | 20 | 2 |" in summary
+    outputs = (tmp_path / "output").read_text().splitlines()
+    assert "prompt-tokens=170" in outputs
+    assert "llm-p95-seconds=0.25" in outputs
+    assert "issues-failed=1" in outputs
+    assert "llm-retries=2" in outputs
+    assert "llm-cache-hits=4" in outputs
+    assert "github-cache-misses=3" in outputs
+
+
+def test_timed_iteration_leaves_out_the_consumer():
+    clock = FakeClock()
+    report = RunReport(clock=clock)
+    set_run_report(report)
+
+    def listing():
+        for page in range(2):
+            clock.now += 1.0
+            yield page
+
+    async def consume_async():
+        async for _ in timed_aiteration("discovery", async_iter([1, 2])):
+            clock.now += 5.0
+
+    try:
+        for _ in timed_iteration("discovery", listing()):
+            clock.now += 10.0
+        asyncio.run(consume_async())
+    finally:
+        set_run_report(None)
+
+    assert report.stage_summary()["discovery"]["count"] == 2
+    assert report.stage_summary()["discovery"]["total_s"] == 2.0
+
+
+def test_helpers_without_report():
+    set_run_report(None)
+    with timed("llm", 1):
+        pass
+    record_usage("OpenAI", 1, 1)
+    assert list(timed_iteration("discovery", [1, 2])) == [1, 2]
+    assert run_report._report is None
+
+
+def test_record_response_usage(report):
+    client = Mock(display_name="OpenAI")
+    record_response_usage(client, "prompt", Mock(prompt_tokens=12, completion_tokens=3), "Title")
+    gemini = Mock(display_name="Gemini")
+    record_response_usage(gemini, "x" * 400, None, "A title")
+
+    assert report.tokens["OpenAI"]["prompt_tokens"] == 12
+    assert report.tokens["Gemini"]["estimated"] is True
+    assert report.tokens["Gemini"]["prompt_tokens"] > 0
+
+
+def test_openai_client_records_usage(report):
+    response = Mock()
+    response.choices = [Mock(message=Mock(content="Generated response"))]
+    response.usage = Mock(prompt_tokens=40, completion_tokens=4)
+    openai_client = Mock()
+    openai_client.chat.completions.create.return_value = response
+
+    with patch("openai.OpenAI", return_value=openai_client):
+        OpenAIClient("valid-key", "gpt-4").generate_content("Test prompt")
+
+    assert report.tokens["OpenAI"] == {
+        "requests": 1,
+        "prompt_tokens": 40,
+        "completion_tokens": 4,
+        "estimated": False,
+    }
+
+
+def test_process_issue_records_stages(report):
+    github_client = Mock()
+    ai_client = Mock()
+    ai_client.generate_content.return_value = "Improved title"
+    processor = IssueProcessor(ai_client, github_client, "{original_title} {issue_body}", "titled")
+    issue = Mock(number=3, title="Old title", body="body " * 20, label_names=())
+
+    processor.process_issue(issue, auto_update=True)
+
+    assert set(report.per_issue()["3"]) == {
+        "prompt",
+        "llm",
+        "write:update_issue_title",
+        "write:add_issue_comment",
+        "write:add_issue_label",
+    }
@@ -0,0 +1,102 @@
+import datetime
+import json
+from types import SimpleNamespace
+
+from src.core.scan_state import ScanState, VerdictStore, utc_now
+
+SCANNED_AT = datetime.datetime(2024, 5, 1, 12, 0, 0)
+
+
+def test_since_without_state_file(tmp_path):
+    assert ScanState(str(tmp_path / "state.json")).since("owner/repo") is None
+
+
+def test_advance_and_since(tmp_path, capsys):
+    path = tmp_path / "state" / "state.json"
+    state = ScanState(str(path), overlap=datetime.timedelta(minutes=5))
+
+    state.advance("owner/repo", SCANNED_AT, [3, 7, 5])
+
+    assert json.loads(path.read_text()) == {
+        "owner/repo": {"updated_at": "2024-05-01T12:00:00Z", "number": 7}
+    }
+    assert state.since("owner/repo") == datetime.datetime(2024, 5, 1, 11, 55, 0)
+    assert "issues updated since 2024-05-01T12:00:00Z" in capsys.readouterr().out
+    assert state.since("other/repo") is None
+
+
+def test_advance_keeps_newest_number_and_other_repos(tmp_path):
+    state = ScanState(str(tmp_path / "state.json"))
+    state.advance("owner/repo", SCANNED_AT, [7])
+    state.advance("other/repo", SCANNED_AT, [])
+    state.advance("owner/repo", SCANNED_AT + datetime.timedelta(hours=1), [])
+
+    assert state.cursor("owner/repo") == {"updated_at": "2024-05-01T13:00:00Z", "number": 7}
+    assert state.cursor("other/repo") == {"updated_at": "2024-05-01T12:00:00Z", "number": None}
+    assert [p.name for p in tmp_path.iterdir()] == ["state.json"]
+
+
+def test_corrupt_state_file_means_full_scan(tmp_path, capsys):
+    path = tmp_path / "state.json"
+    path.write_text("{not json")
+
+    assert ScanState(str(path)).since("owner/repo") is None
+    assert "Error reading scan state" in capsys.readouterr().out
+
+
+def test_utc_now_is_naive():
+    assert utc_now().tzinfo is None
+
+
+def make_issue(number=1, title="Crash on start", body="Steps to reproduce"):
+    return SimpleNamespace(number=number, title=title, body=body)
+
+
+def test_verdicts_survive_until_the_issue_changes(tmp_path):
+    path = str(tmp_path / "state.json")
+    store = VerdictStore(path, "owner/repo", "prompt")
+    store.record(make_issue())
+    store.save()
+
+    reloaded = VerdictStore(path, "owner/repo", "prompt")
+    assert reloaded.is_optimal(make_issue())
+    assert not reloaded.is_optimal(make_issue(title="Crash on startup"))
+    assert not reloaded.is_optimal(make_issue(body="Steps to reproduce, updated"))
+    assert not reloaded.is_optimal(make_issue(number=2))
+    assert not VerdictStore(path, "owner/repo", "new prompt").is_optimal(make_issue())
+    assert not VerdictStore(path, "other/repo", "prompt").is_optimal(make_issue())
+
+
+def test_verdicts_share_the_file_with_the_scan_cursor(tmp_path):
+    path = str(tmp_path / "state.json")
+    ScanState(path).advance("owner/repo", SCANNED_AT, [7])
+    store = VerdictStore(path, "owner/repo")
+    store.record(make_issue(number=7))
+    store.save()
+    ScanState(path).advance("owner/repo", SCANNED_AT + datetime.timedelta(hours=1), [8])
+
+    cursor = ScanState(path).cursor("owner/repo")
+    assert cursor["updated_at"] == "2024-05-01T13:00:00Z"
+    assert cursor["number"] == 8
+    assert list(cursor["verdicts"]) == ["7"]
+    assert VerdictStore(path, "owner/repo").is_optimal(make_issue(number=7))
+
+
+def test_verdict_save_drops_expired_entries(tmp_path):
+    path = tmp_path / "state.json"
+    path.write_text(
+        json.dumps(
+            {
+                "owner/repo": {
+                    "verdicts": {"3": {"fingerprint": "old", "checked_at": "2000-01-01T00:00:00Z"}}
+                }
+            }
+        )
+    )
+    store = VerdictStore(str(path), "owner/repo")
+    store.save()
+    assert "3" in json.loads(path.read_text())["owner/repo"]["verdicts"]
+
+    store.record(make_issue())
+    store.save()
+    assert list(json.loads(path.read_text())["owner/repo"]["verdicts"]) == ["1"]
@@ -69,6 +69,25 @@ def test_config_defaults():
         assert config.max_issues == 100  # Default
         assert config.skip_label == "titled"  # Default
         assert config.is_issue_event is False  # Default
+        assert config.max_concurrency == 1  # Default
+        assert config.execution_mode == "sync"  # Default
+        assert config.discovery == "rest"  # Default
+        assert config.batch_size == 1  # Default
+        assert config.batch_max_tokens == 8000  # Default
+        assert config.max_body_tokens is None  # Default
+        assert config.requests_per_minute == 0  # Default
+        assert config.tokens_per_minute == 0  # Default
+        assert config.max_retries == 3  # Default
+        assert config.retry_budget == 20  # Default
+        assert config.stream is False  # Default
+        assert config.max_output_tokens == 64  # Default
+        assert config.cache_dir == ""  # Default
+        assert config.cache_ttl_days == 30  # Default
+        assert config.cache_max_entries == 10000  # Default
+        assert config.github_cache_dir == ""  # Default
+        assert config.state_file == ""  # Default
+        assert config.scan_overlap_minutes == 10  # Default
+        assert config.full_rescan is False  # Default
 
 
 def test_detect_ai_provider_explicit():
@@ -203,6 +222,312 @@ def test_validate_missing_api_key():
                 config.validate()
 
 
+def test_validate_invalid_max_concurrency():
+    with patch.dict(
+        os.environ,
+        {
+            "INPUT_GITHUB-TOKEN": "test-token",
+            "GITHUB_REPOSITORY": "owner/repo",
+            "INPUT_GEMINI-API-KEY": "test-gemini-key",
+            "INPUT_MAX-CONCURRENCY": "0",
+        },
+        clear=True,
+    ):
+        config = Config()
+        with pytest.raises(ValueError, match="max-concurrency must be at least 1"):
+            config.validate()
+
+
+def test_validate_invalid_execution_mode():
+    with patch.dict(
+        os.environ,
+        {
+            "INPUT_GITHUB-TOKEN": "test-token",
+            "GITHUB_REPOSITORY": "owner/repo",
+            "INPUT_GEMINI-API-KEY": "test-gemini-key",
+            "INPUT_EXECUTION-MODE": "parallel",
+        },
+        clear=True,
+    ):
+        config = Config()
+        with pytest.raises(ValueError, match="Unsupported execution-mode: parallel"):
+            config.validate()
+
+
+def test_validate_invalid_discovery():
+    with patch.dict(
+        os.environ,
+        {
+            "INPUT_GITHUB-TOKEN": "test-token",
+            "GITHUB_REPOSITORY": "owner/repo",
+            "INPUT_GEMINI-API-KEY": "test-gemini-key",
+            "INPUT_DISCOVERY": "soap",
+        },
+        clear=True,
+    ):
+        config = Config()
+        with pytest.raises(ValueError, match="Unsupported discovery: soap"):
+            config.validate()
+
+
+def test_write_back_settings():
+    with patch.dict(
+        os.environ,
+        {
+            "INPUT_GITHUB-TOKEN": "test-token",
+            "GITHUB_REPOSITORY": "owner/repo",
+            "INPUT_GEMINI-API-KEY": "test-gemini-key",
+        },
+        clear=True,
+    ):
+        config = Config()
+        assert config.write_back == "rest"
+        assert config.write_batch_size == 25
+        assert config.write_interval_ms == 1000
+        assert config.writes_per_minute == 0
+
+        os.environ["INPUT_WRITE-BACK"] = "GraphQL"
+        os.environ["INPUT_WRITE-BATCH-SIZE"] = "0"
+        config = Config()
+        assert config.write_back == "graphql"
+        with pytest.raises(ValueError, match="write-batch-size must be at least 1"):
+            config.validate()
+
+        os.environ["INPUT_WRITE-BATCH-SIZE"] = "10"
+        os.environ["INPUT_WRITES-PER-MINUTE"] = "-1"
+        with pytest.raises(ValueError, match="writes-per-minute must not be negative"):
+            Config().validate()
+
+        os.environ["INPUT_WRITES-PER-MINUTE"] = "30"
+        os.environ["INPUT_WRITE-BACK"] = "bulk"
+        os.environ["INPUT_WRITE-BATCH-SIZE"] = "10"
+        with pytest.raises(
+            ValueError, match="Unsupported write-back: bulk, please use one of rest, graphql"
+        ):
+            Config().validate()
+
+
+def test_validate_invalid_batch_size():
+    with patch.dict(
+        os.environ,
+        {
+            "INPUT_GITHUB-TOKEN": "test-token",
+            "GITHUB_REPOSITORY": "owner/repo",
+            "INPUT_GEMINI-API-KEY": "test-gemini-key",
+            "INPUT_BATCH-SIZE": "0",
+        },
+        clear=True,
+    ):
+        config = Config()
+        with pytest.raises(ValueError, match="batch-size must be at least 1"):
+            config.validate()
+
+
+def test_detect_ai_provider_plugin():
+    with patch.dict(
+        os.environ,
+        {
+            "INPUT_AI-PROVIDER": "mistral",
+            "INPUT_API-KEY": "test-plugin-key",
+        },
+        clear=True,
+    ):
+        config = Config()
+        assert config.ai_provider == "mistral"
+        assert config.get_api_key() == "test-plugin-key"
+
+
+def test_rate_limit_settings():
+    with patch.dict(
+        os.environ,
+        {
+            "INPUT_GEMINI-API-KEY": "test-gemini-key",
+            "INPUT_REQUESTS-PER-MINUTE": "60",
+            "INPUT_TOKENS-PER-MINUTE": "100000",
+            "INPUT_MAX-RETRIES": "5",
+            "INPUT_RETRY-BUDGET": "50",
+        },
+        clear=True,
+    ):
+        config = Config()
+        assert config.requests_per_minute == 60
+        assert config.tokens_per_minute == 100000
+        assert config.max_retries == 5
+        assert config.retry_budget == 50
+
+
+def test_validate_negative_requests_per_minute():
+    with patch.dict(
+        os.environ,
+        {
+            "INPUT_GITHUB-TOKEN": "test-token",
+            "GITHUB_REPOSITORY": "owner/repo",
+            "INPUT_GEMINI-API-KEY": "test-gemini-key",
+            "INPUT_REQUESTS-PER-MINUTE": "-1",
+        },
+        clear=True,
+    ):
+        config = Config()
+        with pytest.raises(ValueError, match="requests-per-minute must not be negative"):
+            config.validate()
+
+
+def test_validate_invalid_max_output_tokens():
+    with patch.dict(
+        os.environ,
+        {
+            "INPUT_GITHUB-TOKEN": "test-token",
+            "GITHUB_REPOSITORY": "owner/repo",
+            "INPUT_GEMINI-API-KEY": "test-gemini-key",
+            "INPUT_STREAM": "true",
+            "INPUT_MAX-OUTPUT-TOKENS": "0",
+        },
+        clear=True,
+    ):
+        config = Config()
+        assert config.stream is True
+        with pytest.raises(ValueError, match="max-output-tokens must be at least 1"):
+            config.validate()
+
+
+def test_max_body_tokens():
+    with patch.dict(
+        os.environ,
+        {
+            "INPUT_GEMINI-API-KEY": "test-gemini-key",
+            "INPUT_MAX-BODY-TOKENS": "0",
+        },
+        clear=True,
+    ):
+        config = Config()
+        assert config.max_body_tokens == 0
+
+
+def test_validate_negative_max_body_tokens():
+    with patch.dict(
+        os.environ,
+        {
+            "INPUT_GITHUB-TOKEN": "test-token",
+            "GITHUB_REPOSITORY": "owner/repo",
+            "INPUT_GEMINI-API-KEY": "test-gemini-key",
+            "INPUT_MAX-BODY-TOKENS": "-1",
+        },
+        clear=True,
+    ):
+        config = Config()
+        with pytest.raises(ValueError, match="max-body-tokens must not be negative"):
+            config.validate()
+
+
+def test_fallback_providers():
+    with patch.dict(
+        os.environ,
+        {
+            "INPUT_GEMINI-API-KEY": "test-gemini-key",
+            "INPUT_OPENAI-API-KEY": "test-openai-key",
+            "INPUT_FALLBACK-PROVIDERS": "openai:gpt-4o-mini, Gemini:gemini-1.5-flash,",
+        },
+        clear=True,
+    ):
+        config = Config()
+        assert config.fallback_providers == [
+            ("openai", "gpt-4o-mini"),
+            ("gemini", "gemini-1.5-flash"),
+        ]
+        assert config.provider_chain() == [
+            ("gemini", "test-gemini-key", None),
+            ("openai", "test-openai-key", "gpt-4o-mini"),
+            ("gemini", "test-gemini-key", "gemini-1.5-flash"),
+        ]
+
+
+def test_validate_fallback_provider_without_key():
+    with patch.dict(
+        os.environ,
+        {
+            "INPUT_GITHUB-TOKEN": "test-token",
+            "GITHUB_REPOSITORY": "owner/repo",
+            "INPUT_GEMINI-API-KEY": "test-gemini-key",
+            "INPUT_FALLBACK-PROVIDERS": "deepseek",
+        },
+        clear=True,
+    ):
+        config = Config()
+        assert config.fallback_providers == [("deepseek", None)]
+        with pytest.raises(ValueError, match="API key not found for fallback provider deepseek"):
+            config.validate()
+
+
+def test_scan_state_settings():
+    with patch.dict(
+        os.environ,
+        {
+            "INPUT_GEMINI-API-KEY": "test-gemini-key",
+            "INPUT_STATE-FILE": ".issue-title-ai-state.json",
+            "INPUT_SCAN-OVERLAP-MINUTES": "30",
+            "INPUT_FULL-RESCAN": "true",
+        },
+        clear=True,
+    ):
+        config = Config()
+        assert config.state_file == ".issue-title-ai-state.json"
+        assert config.scan_overlap_minutes == 30
+        assert config.full_rescan is True
+
+
+def test_hedge_picks_second_configured_provider():
+    with patch.dict(
+        os.environ,
+        {
+            "INPUT_GEMINI-API-KEY": "test-gemini-key",
+            "INPUT_DEEPSEEK-API-KEY": "test-deepseek-key",
+            "INPUT_HEDGE": "true",
+            "INPUT_HEDGE-DELAY-MS": "1500",
+        },
+        clear=True,
+    ):
+        config = Config()
+        assert config.ai_provider == "gemini"
+        assert config.hedge_provider == "deepseek"
+        assert config.hedge_delay_ms == 1500
+        assert config.get_api_key("deepseek") == "test-deepseek-key"
+
+
+def test_validate_hedge_without_second_provider():
+    with patch.dict(
+        os.environ,
+        {
+            "INPUT_GITHUB-TOKEN": "test-token",
+            "GITHUB_REPOSITORY": "owner/repo",
+            "INPUT_GEMINI-API-KEY": "test-gemini-key",
+            "INPUT_HEDGE": "true",
+        },
+        clear=True,
+    ):
+        config = Config()
+        assert config.hedge_provider is None
+        with pytest.raises(ValueError, match="hedge needs the API key of a second provider"):
+            config.validate()
+
+
+def test_validate_hedge_provider_without_key():
+    with patch.dict(
+        os.environ,
+        {
+            "INPUT_GITHUB-TOKEN": "test-token",
+            "GITHUB_REPOSITORY": "owner/repo",
+            "INPUT_GEMINI-API-KEY": "test-gemini-key",
+            "INPUT_DEEPSEEK-API-KEY": "test-deepseek-key",
+            "INPUT_HEDGE": "true",
+            "INPUT_HEDGE-PROVIDER": "openai",
+        },
+        clear=True,
+    ):
+        config = Config()
+        with pytest.raises(ValueError, match="API key not found for openai"):
+            config.validate()
+
+
 def test_event_data_parsing_error():
     with patch.dict(
         os.environ,
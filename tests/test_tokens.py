@@ -0,0 +1,89 @@
+from unittest.mock import patch
+
+from src.core import tokens
+from src.core.tokens import (
+    estimate_tokens,
+    get_token_counter,
+    resolve_max_body_tokens,
+    truncate_body,
+)
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abc") == 1
+    assert estimate_tokens("a" * 400) == 100
+
+
+def test_resolve_max_body_tokens():
+    assert resolve_max_body_tokens("gemini") == 8000
+    assert resolve_max_body_tokens("openai") == 4000
+    assert resolve_max_body_tokens("unknown") is None
+    assert resolve_max_body_tokens("openai", 123) == 123
+    assert resolve_max_body_tokens("openai", 0) is None
+
+
+def test_get_token_counter_without_tiktoken():
+    with patch.object(tokens, "tiktoken", None):
+        assert get_token_counter("openai", "gpt-4") is estimate_tokens
+    assert get_token_counter("gemini", "gemini-2.0-flash") is estimate_tokens
+
+
+def test_truncate_body_within_budget():
+    body = "A short body"
+    assert truncate_body(body, 100) == (body, 3, 3)
+    assert truncate_body(body, None) == (body, 3, 3)
+
+
+def test_truncate_body_keeps_start_end_and_headings():
+    lines = ["### Description", "First line of the report"]
+    lines += [f"filler line {i} " + "x" * 60 for i in range(200)]
+    lines += ["### Steps to reproduce"]
+    lines += [f"step {i} " + "y" * 60 for i in range(200)]
+    lines += ["Last line of the report"]
+    body = "\n".join(lines)
+
+    text, original_tokens, kept_tokens = truncate_body(body, 200)
+
+    assert original_tokens > 200
+    assert kept_tokens <= 200
+    assert text.startswith("### Description\nFirst line of the report")
+    assert text.endswith("Last line of the report")
+    assert "\n### Steps to reproduce\n" in text
+    assert "lines omitted ...]" in text
+
+
+def test_truncate_body_single_huge_line():
+    body = "start " + "a" * 10000 + " end"
+
+    text, original_tokens, kept_tokens = truncate_body(body, 100)
+
+    assert kept_tokens <= 100
+    assert text.startswith("start ")
+    assert text.endswith(" end")
+    assert "[...]" in text
+
+
+def test_truncate_body_stays_within_budget():
+    def count(text):
+        return len(text) // 4
+
+    # Counted line by line this fits, but joined with the markers it came out 3 tokens over.
+    body = "\n".join(["x" * 40] * 3)
+
+    text, _, kept_tokens = truncate_body(body, 20, count)
+
+    assert kept_tokens == count(text) <= 20
+
+
+def test_truncate_body_keeps_a_margin_when_estimating():
+    body = "word " * 1000
+
+    estimated = truncate_body(body, 1000)[2]
+    counted = truncate_body(body, 1000, lambda text: len(text) // 4)[2]
+
+    # The same counts, but an exact counter may use the whole budget.
+    assert estimated < counted <= 1000
+    assert estimated <= 900
+    # A body estimated just under the budget is truncated as well.
+    assert truncate_body("word " * 152, 200)[1:] != (190, 190)
@@ -0,0 +1,156 @@
+import asyncio
+import json
+from unittest.mock import Mock
+
+import pytest
+
+from src.core.concurrency import aprefetch, map_bounded, prefetch
+from src.core.issue_service import IssueProcessor
+from src.core.tracing import (
+    NOOP_SPAN,
+    Tracer,
+    http_attributes,
+    set_span_attributes,
+    set_tracer,
+    span,
+    traced,
+)
+
+
+@pytest.fixture
+def tracer():
+    tracer = Tracer()
+    set_tracer(tracer)
+    yield tracer
+    set_tracer(None)
+
+
+class Client:
+    @traced("client.call", lambda self, value: {"value": value})
+    def call(self, value):
+        set_span_attributes({"doubled": value * 2})
+        return value * 2
+
+    @traced("client.acall")
+    async def acall(self, value):
+        return value + 1
+
+    @traced("client.pages")
+    def pages(self, count):
+        for value in range(count):
+            yield self.call(value)
+
+    @traced("client.apages")
+    async def apages(self, count):
+        for value in range(count):
+            yield await self.acall(value)
+
+
+def test_tracing_off_is_a_no_op():
+    set_tracer(None)
+    with span("anything", {"a": 1}) as current:
+        set_span_attributes({"b": 2})
+    assert current is NOOP_SPAN
+    assert Client().call(2) == 4
+
+
+def test_spans_nest_and_record_errors(tracer):
+    with span("run", {"github.repository": "owner/repo"}):
+        assert Client().call(3) == 6
+        assert asyncio.run(Client().acall(1)) == 2
+        with pytest.raises(ValueError), span("failing"):
+            raise ValueError("boom")
+
+    spans = {s.name: s for s in tracer.spans}
+    run = spans["run"]
+    assert run.parent_id is None
+    assert {spans[name].parent_id for name in ("client.call", "client.acall", "failing")} == {
+        run.span_id
+    }
+    assert {s.trace_id for s in tracer.spans} == {run.trace_id}
+    assert spans["client.call"].attributes == {"value": 3, "doubled": 6}
+    assert spans["failing"].error == "ValueError: boom"
+
+
+def test_export_otlp_json(tracer, tmp_path):
+    with span("run"), span("HTTP GET", {"http.status_code": 200, "cached": False, "ratio": 0.5}):
+        pass
+
+    count = tracer.export(str(tmp_path / "traces" / "trace.json"))
+
+    data = json.loads((tmp_path / "traces" / "trace.json").read_text())
+    resource_spans = data["resourceSpans"][0]
+    assert resource_spans["resource"]["attributes"] == [
+        {"key": "service.name", "value": {"stringValue": "issue-title-ai"}}
+    ]
+    spans = resource_spans["scopeSpans"][0]["spans"]
+    assert count == len(spans) == 2
+    run, request = spans
+    assert run["kind"] == 1 and "parentSpanId" not in run
+    assert request["kind"] == 3
+    assert request["parentSpanId"] == run["spanId"]
+    assert int(request["endTimeUnixNano"]) >= int(request["startTimeUnixNano"])
+    assert request["attributes"] == [
+        {"key": "http.status_code", "value": {"intValue": "200"}},
+        {"key": "cached", "value": {"boolValue": False}},
+        {"key": "ratio", "value": {"doubleValue": 0.5}},
+    ]
+    assert request["status"] == {"code": 1}
+
+
+def test_http_attributes():
+    response = Mock(status_code=200, headers={"Content-Length": "42"})
+    assert http_attributes(response) == {
+        "http.status_code": 200,
+        "http.response_content_length": 42,
+    }
+
+
+def test_generator_span_covers_its_iteration(tracer):
+    client = Client()
+
+    async def consume_async():
+        return [value async for value in aprefetch(client.apages(2), 1)]
+
+    with span("run"):
+        consumed = [client.call(value) for value in prefetch(client.pages(3), 1)]
+        assert asyncio.run(consume_async()) == [1, 2]
+
+    spans = {s.name: s for s in tracer.spans}
+    run, pages = spans["run"], spans["client.pages"]
+    assert consumed == [0, 4, 8]
+    assert pages.parent_id == spans["client.apages"].parent_id == run.span_id
+    calls = [s for s in tracer.spans if s.name == "client.call"]
+    # The producer's calls nest under the generator, the consumer's stay under ``run``.
+    assert sorted(s.parent_id == pages.span_id for s in calls) == [False] * 3 + [True] * 3
+    assert all(
+        s.parent_id == spans["client.apages"].span_id
+        for s in tracer.spans
+        if s.name == "client.acall"
+    )
+
+
+def test_worker_threads_inherit_the_current_span(tracer):
+    with span("run"):
+        map_bounded(lambda n: Client().call(n), [1, 2, 3], max_workers=3)
+
+    run = next(s for s in tracer.spans if s.name == "run")
+    calls = [s for s in tracer.spans if s.name == "client.call"]
+    assert len(calls) == 3
+    assert all(s.parent_id == run.span_id for s in calls)
+
+
+def test_process_issue_span(tracer):
+    ai_client = Mock()
+    ai_client.generate_content.return_value = "Better title"
+    processor = IssueProcessor(ai_client, Mock(), "{original_title} {issue_body}", "titled")
+    issue = Mock(number=9, title="Title", body="é" * 50, label_names=())
+
+    processor.process_issue(issue)
+
+    process_span = next(s for s in tracer.spans if s.name == "process_issue")
+    assert process_span.attributes == {
+        "issue.number": 9,
+        "issue.title_bytes": 5,
+        "issue.body_bytes": 100,
+    }
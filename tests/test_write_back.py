@@ -0,0 +1,283 @@
+import asyncio
+import threading
+from unittest.mock import AsyncMock, Mock
+
+from src.core.github_queries import build_write_mutation, failed_writes
+from src.core.github_rate_limit import WritePacer
+from src.core.issue_record import IssueRecord
+from src.core.run_report import RunReport
+from src.core.write_back import AsyncGraphQLWriteBack, AsyncWriteLane, GraphQLWriteBack, WriteLane
+
+
+def make_record(number):
+    return IssueRecord(
+        number, f"Title {number}", "body", [], None, f"https://x/{number}", node_id=f"I_{number}"
+    )
+
+
+def make_writes(number, auto_update=True):
+    writes = [("add_issue_comment", (f"comment {number}",), f"Commented on #{number}")]
+    if auto_update:
+        writes.insert(0, ("update_issue_title", (f"New title {number}",), None))
+    writes.append(("add_issue_label", ("titled",), f"Labeled #{number}"))
+    return writes
+
+
+def ok(*_args, **_kwargs):
+    return {"data": {}}
+
+
+def test_build_write_mutation():
+    document, variables = build_write_mutation(
+        [("update_issue_title", "I_1", "New"), ("add_issue_label", "I_2", "LA_1")]
+    )
+
+    assert "mutation WriteBack($id0: ID!, $value0: String!, $id1: ID!, $value1: ID!)" in document
+    assert "w0: updateIssue(input: {id: $id0, title: $value0}) { clientMutationId }" in document
+    assert "w1: addLabelsToLabelable(input: {labelableId: $id1, labelIds: [$value1]})" in document
+    assert variables == {"id0": "I_1", "value0": "New", "id1": "I_2", "value1": "LA_1"}
+
+
+def test_failed_writes():
+    assert failed_writes({"data": {}}, 2) == {}
+    payload = {"errors": [{"message": "locked", "path": ["w1"]}]}
+    assert failed_writes(payload, 2) == {1: "locked"}
+    assert failed_writes({"errors": [{"message": "bad query"}]}, 2) == {
+        0: "bad query",
+        1: "bad query",
+    }
+
+
+def test_flush_sends_one_request_per_round_and_batch(capsys):
+    github_client = Mock()
+    github_client.get_label_id.return_value = "LA_1"
+    github_client.graphql.side_effect = ok
+    write_back = GraphQLWriteBack(github_client, "owner/repo", batch_size=2)
+    results = {}
+    for number in (1, 2, 3):
+        results[number] = {"issue_number": number}
+        write_back.add(make_record(number), make_writes(number), results[number])
+    write_back.add(make_record(4), [], {"issue_number": 4})
+
+    write_back.flush()
+
+    github_client.get_label_id.assert_called_once_with("owner/repo", "titled")
+    # Three rounds (title, comment, label) of two requests each, instead of nine REST calls.
+    assert github_client.graphql.call_count == 6
+    first_document, first_variables = github_client.graphql.call_args_list[0].args
+    assert first_document.count("updateIssue") == 2
+    assert first_variables["value1"] == "New title 2"
+    assert github_client.graphql.call_args_list[-2].args[1]["value0"] == "LA_1"
+    assert all("error" not in result for result in results.values())
+    out = capsys.readouterr().out
+    assert "Commented on #3" in out
+    assert "Write-back: 9 writes sent in 6 GraphQL requests" in out
+
+    write_back.flush()
+    assert github_client.graphql.call_count == 6
+
+
+def test_flush_reports_partial_failures_per_issue(capsys):
+    github_client = Mock()
+    github_client.get_label_id.return_value = "LA_1"
+    github_client.graphql.side_effect = [
+        {"data": {"w0": None}, "errors": [{"message": "locked", "path": ["w0"]}]},
+        {"data": {}, "errors": [{"message": "label gone", "path": ["w0"]}]},
+    ]
+    write_back = GraphQLWriteBack(github_client, "owner/repo")
+    failed = {"issue_number": 1}
+    labeled = {"issue_number": 2}
+    write_back.add(make_record(1), make_writes(1), failed)
+    write_back.add(make_record(2), make_writes(2, auto_update=False), labeled)
+
+    write_back.flush()
+
+    # The locked issue gets no comment and no label, so the next run retries it.
+    assert failed["error"] == "locked"
+    second_document = github_client.graphql.call_args_list[1].args[0]
+    assert second_document.count("addComment") == 0
+    assert "error" not in labeled
+    out = capsys.readouterr().out
+    assert "Warning: Error processing issue #1: locked" in out
+    assert "Error adding label to issue #2: label gone" in out
+
+
+def planned_result(number, auto_update=True):
+    return {
+        "issue_number": number,
+        "original_title": f"Title {number}",
+        "improved_title": f"New title {number}",
+        "updated": auto_update,
+    }
+
+
+def test_failed_graphql_write_is_not_counted_as_improved():
+    github_client = Mock()
+    github_client.get_label_id.return_value = "LA_1"
+    github_client.graphql.side_effect = [
+        {"data": {"w0": None}, "errors": [{"message": "locked", "path": ["w0"]}]},
+        ok(),
+        ok(),
+    ]
+    write_back = GraphQLWriteBack(github_client, "owner/repo")
+    report = RunReport()
+    for number in (1, 2):
+        report.results.append(planned_result(number))
+        write_back.add(make_record(number), make_writes(number), report.results[-1])
+
+    write_back.flush()
+
+    assert report.results[0]["updated"] is False
+    counts = report.issue_counts()
+    assert (counts["improved"], counts["updated"], counts["failed"]) == (1, 1, 1)
+    assert report.outputs()["issues-improved"] == 1
+
+
+def test_failed_rest_write_is_not_counted_as_improved():
+    github_client = Mock()
+    github_client.add_issue_comment.side_effect = [Exception("Forbidden"), None]
+    lane = WriteLane(github_client, WritePacer(min_interval=0))
+    report = RunReport()
+    for number in (1, 2):
+        report.results.append(planned_result(number))
+        lane.add(make_record(number), make_writes(number), report.results[-1])
+
+    lane.flush()
+
+    # The title edit went through, so the failed issue still counts as updated.
+    counts = report.issue_counts()
+    assert (counts["improved"], counts["updated"], counts["failed"]) == (1, 2, 1)
+
+
+def test_flush_request_error_fails_the_batch():
+    github_client = Mock()
+    github_client.get_label_id.return_value = "LA_1"
+    github_client.graphql.side_effect = Exception("502 Bad Gateway")
+    write_back = GraphQLWriteBack(github_client, "owner/repo")
+    result = {"issue_number": 1}
+    write_back.add(make_record(1), make_writes(1), result)
+
+    write_back.flush()
+
+    assert result["error"] == "502 Bad Gateway"
+    assert github_client.graphql.call_count == 1
+
+
+def test_flush_falls_back_to_rest():
+    github_client = Mock()
+    github_client.add_issue_comment.side_effect = Exception("Not Found")
+    write_back = GraphQLWriteBack(github_client, "owner/repo")
+    issue = Mock(number=5, node_id=None)
+    result = {"issue_number": 5}
+    write_back.add(issue, make_writes(5), result)
+
+    write_back.flush()
+
+    github_client.graphql.assert_not_called()
+    github_client.update_issue_title.assert_called_once_with(issue, "New title 5")
+    github_client.add_issue_label.assert_not_called()
+    assert result["error"] == "Not Found"
+
+
+def test_flush_label_resolution_error_uses_rest(capsys):
+    github_client = Mock()
+    github_client.get_label_id.side_effect = Exception("forbidden")
+    write_back = GraphQLWriteBack(github_client, "owner/repo")
+    issue = make_record(1)
+    write_back.add(issue, make_writes(1, auto_update=False), {"issue_number": 1})
+
+    write_back.flush()
+
+    github_client.graphql.assert_not_called()
+    github_client.add_issue_label.assert_called_once_with(issue, "titled")
+    assert "writing back over REST: forbidden" in capsys.readouterr().out
+
+
+def test_async_flush():
+    github_client = Mock()
+    github_client.get_label_id = AsyncMock(return_value="LA_1")
+    github_client.graphql = AsyncMock(side_effect=ok)
+    github_client.update_issue_title = AsyncMock()
+    github_client.add_issue_comment = AsyncMock()
+    github_client.add_issue_label = AsyncMock()
+    write_back = AsyncGraphQLWriteBack(github_client, "owner/repo")
+    write_back.add(make_record(1), make_writes(1), {"issue_number": 1})
+    issue = Mock(number=2, node_id=None)
+    write_back.add(issue, make_writes(2, auto_update=False), {"issue_number": 2})
+
+    asyncio.run(write_back.flush())
+
+    assert github_client.graphql.await_count == 3
+    github_client.add_issue_comment.assert_awaited_once_with(issue, "comment 2")
+    github_client.update_issue_title.assert_not_awaited()
+
+
+def test_write_lane_sends_writes_from_one_thread(capsys):
+    threads = set()
+    github_client = Mock()
+    github_client.update_issue_title.side_effect = lambda *args: threads.add(
+        threading.current_thread()
+    )
+    github_client.add_issue_comment.side_effect = [None, Exception("Forbidden")]
+    pacer = Mock(wraps=WritePacer(min_interval=0))
+    lane = WriteLane(github_client, pacer)
+    results = [{"issue_number": number} for number in (1, 2)]
+
+    workers = [
+        threading.Thread(target=lane.add, args=(make_record(n), make_writes(n), results[n - 1]))
+        for n in (1, 2)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    lane.add(make_record(3), [], {"issue_number": 3})
+    lane.flush()
+
+    assert len(threads) == 1 and threading.current_thread() not in threads
+    assert github_client.update_issue_title.call_count == 2
+    # The issue whose comment failed doesn't get the skip label.
+    assert github_client.add_issue_label.call_count == 1
+    assert pacer.wait.call_count == 5
+    assert [result.get("error") for result in results].count("Forbidden") == 1
+    assert "Warning: Error processing issue" in capsys.readouterr().out
+
+    lane.flush()
+    lane.add(make_record(4), make_writes(4), {"issue_number": 4})
+    lane.flush()
+    assert github_client.update_issue_title.call_count == 3
+
+
+def test_async_write_lane():
+    order = []
+    github_client = Mock()
+    github_client.update_issue_title = AsyncMock(
+        side_effect=lambda issue, title: order.append(title)
+    )
+    github_client.add_issue_comment = AsyncMock()
+    github_client.add_issue_label = AsyncMock()
+    lane = AsyncWriteLane(github_client, WritePacer(min_interval=0))
+
+    async def main():
+        await lane.flush()
+        for number in (1, 2):
+            lane.add(make_record(number), make_writes(number), {"issue_number": number})
+        await lane.flush()
+
+    asyncio.run(main())
+
+    assert order == ["New title 1", "New title 2"]
+    assert github_client.add_issue_label.await_count == 2
+
+
+def test_graphql_write_back_is_paced():
+    github_client = Mock()
+    github_client.get_label_id.return_value = "LA_1"
+    github_client.graphql.side_effect = ok
+    pacer = Mock()
+    write_back = GraphQLWriteBack(github_client, "owner/repo", pacer=pacer)
+    write_back.add(make_record(1), make_writes(1), {"issue_number": 1})
+
+    write_back.flush()
+
+    assert pacer.wait.call_count == github_client.graphql.call_count == 3